@@ -47,6 +47,9 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
 
     elevation_angle = indicators.get_elevation_angle(xd)
 
+    # aerodynamic model shared by all kites
+    kite_aero_fun = get_kite_aero_function(options, parameters)
+
     for n in kite_nodes:
 
         parent = parent_map[n]
@@ -69,71 +72,47 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
         else:
             ua = uw_infty - dq
 
-        # relative air speed
-        norm_ua_squared = cas.mtimes(ua.T, ua)
-        ua_norm = norm_ua_squared ** 0.5
-
-        # angle of attack and sideslip angle
-        alpha = indicators.get_alpha(ua, r)
-        beta = indicators.get_beta(ua, r)
-
         if int(options['surface_control']) == 0:
             delta = u['delta' + str(n) + str(parent)]
             omega = xd['omega' + str(n) + str(parent)]
-            [CF, CM] = stability_derivatives.stability_derivatives(
-                options, alpha, beta, ua, omega, delta, parameters)
         elif int(options['surface_control']) == 1:
             delta = xd['delta' + str(n) + str(parent)]
             omega = xd['omega' + str(n) + str(parent)]
-            [CF, CM] = stability_derivatives.stability_derivatives(options, alpha, beta, ua, omega, delta, parameters)
         else:
             raise ValueError('unsupported surface_control chosen: %i', options['surface_control'])
 
+        kite_aero = kite_aero_fun(ua = ua, rho_infty = rho_infty, r = xd['r' + str(n) + str(parent)], omega = omega,
+                                  delta = delta, parameters = parameters)
+
+        ua_norm = kite_aero['ua_norm']
+
         # body-_frameforcecomponents
         # notice that these are unusual because an apparent wind reference coordinate system is in use.
         # see below (get_coeffs_from_control_surfaces) for information
-        CA = CF[0]
-        CY = CF[1]
-        CN = CF[2]
-
-        Cl = CM[0]
-        Cm = CM[1]
-        Cn = CM[2]
-
-        dynamic_pressure = 1. / 2. * rho_infty * norm_ua_squared
-        planform_area = parameters['theta0','geometry','s_ref']
-        ftilde_aero = cas.mtimes(r, CF)
-        f_aero = dynamic_pressure * planform_area * ftilde_aero
+        CF = kite_aero['CF']
+        CM = kite_aero['CM']
 
-        ehat_drag = vect_op.normalize(ua)
-        f_drag = cas.mtimes(cas.mtimes(f_aero.T, ehat_drag), ehat_drag)
+        f_aero = kite_aero['f_aero']
+        f_drag = kite_aero['f_drag']
+        f_lift = kite_aero['f_lift']
+        f_side = kite_aero['f_side']
+        m_aero = kite_aero['m_aero']
 
-        ehat_lift = vect_op.normed_cross(ua, ehat_span)
-        f_lift = cas.mtimes(cas.mtimes(f_aero.T, ehat_lift), ehat_lift)
-
-        f_side = f_aero - f_drag - f_lift
-
-        drag_cross_lift = indicators.convert_from_body_to_wind_axes(alpha, beta, CF)
-        CD = drag_cross_lift[0]
-        CS = drag_cross_lift[1]
-        CL = drag_cross_lift[2]
-
-        b_ref = parameters['theta0','geometry','b_ref']
-        c_ref = parameters['theta0','geometry','c_ref']
-
-        reference_lengths = cas.diag(cas.vertcat(b_ref, c_ref, b_ref))
-        m_aero = dynamic_pressure * planform_area * cas.mtimes(reference_lengths, CM)
+        drag_cross_lift = kite_aero['drag_cross_lift']
 
         aero_coefficients = {}
-        aero_coefficients['CD'] = CD
-        aero_coefficients['CS'] = CS
-        aero_coefficients['CL'] = CL
-        aero_coefficients['CA'] = CA
-        aero_coefficients['CN'] = CN
-        aero_coefficients['CY'] = CY
-        aero_coefficients['Cl'] = Cl
-        aero_coefficients['Cm'] = Cm
-        aero_coefficients['Cn'] = Cn
+        aero_coefficients['CD'] = drag_cross_lift[0]
+        aero_coefficients['CS'] = drag_cross_lift[1]
+        aero_coefficients['CL'] = drag_cross_lift[2]
+        aero_coefficients['CA'] = CF[0]
+        aero_coefficients['CN'] = CF[2]
+        aero_coefficients['CY'] = CF[1]
+        aero_coefficients['Cl'] = CM[0]
+        aero_coefficients['Cm'] = CM[1]
+        aero_coefficients['Cn'] = CM[2]
+
+        CD = aero_coefficients['CD']
+        CL = aero_coefficients['CL']
 
         outputs = indicators.collect_kite_aerodynamics_outputs(options, atmos, ua, ua_norm, aero_coefficients, f_aero,
                                                                f_lift, f_drag, f_side, m_aero, ehat_chord, ehat_span, r, q, n, outputs, parameters)
@@ -144,3 +123,58 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
         outputs = indicators.collect_power_balance_outputs(variables, n, outputs, architecture)
 
     return outputs
+
+def get_kite_aero_function(options, parameters):
+    """Aerodynamic model of a single kite with control surfaces, built once and evaluated for every kite node
+
+    @param options model options
+    @param parameters model parameters
+    @return Function (ua, rho_infty, r, omega, delta, parameters) -> aerodynamic forces, moments and coefficients
+    """
+
+    ua = cas.SX.sym('ua', 3)
+    rho_infty = cas.SX.sym('rho_infty')
+    r_vec = cas.SX.sym('r', 9)
+    omega = cas.SX.sym('omega', 3)
+    delta = cas.SX.sym('delta', 3)
+
+    r = cas.reshape(r_vec, (3, 3))
+    ehat_span = r[:, 1]
+
+    # relative air speed
+    norm_ua_squared = cas.mtimes(ua.T, ua)
+    ua_norm = norm_ua_squared ** 0.5
+
+    # angle of attack and sideslip angle
+    alpha = indicators.get_alpha(ua, r)
+    beta = indicators.get_beta(ua, r)
+
+    [CF, CM] = stability_derivatives.stability_derivatives(options, alpha, beta, ua, omega, delta, parameters)
+
+    dynamic_pressure = 1. / 2. * rho_infty * norm_ua_squared
+    planform_area = parameters['theta0','geometry','s_ref']
+    ftilde_aero = cas.mtimes(r, CF)
+    f_aero = dynamic_pressure * planform_area * ftilde_aero
+
+    ehat_drag = vect_op.normalize(ua)
+    f_drag = cas.mtimes(cas.mtimes(f_aero.T, ehat_drag), ehat_drag)
+
+    ehat_lift = vect_op.normed_cross(ua, ehat_span)
+    f_lift = cas.mtimes(cas.mtimes(f_aero.T, ehat_lift), ehat_lift)
+
+    f_side = f_aero - f_drag - f_lift
+
+    drag_cross_lift = indicators.convert_from_body_to_wind_axes(alpha, beta, CF)
+
+    b_ref = parameters['theta0','geometry','b_ref']
+    c_ref = parameters['theta0','geometry','c_ref']
+
+    reference_lengths = cas.diag(cas.vertcat(b_ref, c_ref, b_ref))
+    m_aero = dynamic_pressure * planform_area * cas.mtimes(reference_lengths, CM)
+
+    kite_aero_fun = cas.Function('kite_aero', [ua, rho_infty, r_vec, omega, delta, parameters],
+                                 [ua_norm, CF, CM, drag_cross_lift, f_aero, f_drag, f_lift, f_side, m_aero],
+                                 ['ua', 'rho_infty', 'r', 'omega', 'delta', 'parameters'],
+                                 ['ua_norm', 'CF', 'CM', 'drag_cross_lift', 'f_aero', 'f_drag', 'f_lift', 'f_side', 'm_aero'])
+
+    return kite_aero_fun
@@ -47,6 +47,9 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
 
     elevation_angle = indicators.get_elevation_angle(xd)
 
+    # aerodynamic model shared by all kites
+    kite_aero_fun = get_kite_aero_function(parameters)
+
     for n in kite_nodes:
 
         parent = parent_map[n]
@@ -66,10 +69,6 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
         else:
             ua = uw_infty - dq
 
-        # relative air speed
-        ua_norm = vect_op.smooth_norm(ua, epsilon=1e-8)
-        # ua_norm = mtimes(ua.T, ua) ** 0.5
-
         # in kite body:
         if parent > 0:
             grandparent = parent_map[parent]
@@ -78,29 +77,22 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
             qparent = np.array([0., 0., 0.])
 
         ehat_r = (q - qparent) / vect_op.norm(q - qparent)
-        ehat_t = vect_op.normed_cross(ua, ehat_r)
-        ehat_s = vect_op.normed_cross(ehat_t, ua)
 
-        # roll angle
-        psi = coeff[1]
+        kite_aero = kite_aero_fun(ua = ua, rho_infty = rho_infty, ehat_r = ehat_r, coeff = coeff, parameters = parameters)
 
-        ehat_l = cas.cos(psi) * ehat_s + cas.sin(psi) * ehat_t
-        ehat_span = cas.cos(psi) * ehat_t - cas.sin(psi) * ehat_s
-        ehat_chord = ua/ua_norm
+        ua_norm = kite_aero['ua_norm']
+        r = cas.reshape(kite_aero['r'], (3, 3))
+        ehat_chord = r[:, 0]
+        ehat_span = r[:, 1]
 
-        # implicit direct cosine matrix (for plotting only)
-        r = cas.horzcat(ehat_chord, ehat_span, ehat_l)
+        CL = kite_aero['CL']
+        CD = kite_aero['CD']
 
-        # lift and drag coefficients
-        CL = coeff[0]
-        CD = parameters['theta0','aero','CD0'] + 0.02 * CL ** 2
-
-        # lift and drag force
-        f_lift = CL * 1. / 2. * rho_infty * cas.mtimes(ua.T, ua) * parameters['theta0','geometry','s_ref'] * ehat_l
-        f_drag = CD * 1. / 2. * rho_infty * ua_norm * parameters['theta0','geometry','s_ref'] * ua
+        f_lift = kite_aero['f_lift']
+        f_drag = kite_aero['f_drag']
         f_side = cas.DM(np.zeros((3, 1)))
 
-        f_aero = f_lift + f_drag
+        f_aero = kite_aero['f_aero']
         m_aero = cas.DM(np.zeros((3, 1)))
 
         CA = CD
@@ -123,3 +115,49 @@ def get_outputs(options, atmos, wind, variables, outputs, parameters, architectu
         outputs = indicators.collect_power_balance_outputs(variables, n, outputs, architecture)
 
     return outputs
+
+def get_kite_aero_function(parameters):
+    """Aerodynamic model of a single roll-controlled kite, built once and evaluated for every kite node
+
+    @param parameters model parameters
+    @return Function (ua, rho_infty, ehat_r, coeff, parameters) -> aerodynamic forces and coefficients
+    """
+
+    ua = cas.SX.sym('ua', 3)
+    rho_infty = cas.SX.sym('rho_infty')
+    ehat_r = cas.SX.sym('ehat_r', 3)
+    coeff = cas.SX.sym('coeff', 2)
+
+    # relative air speed
+    ua_norm = vect_op.smooth_norm(ua, epsilon=1e-8)
+    # ua_norm = mtimes(ua.T, ua) ** 0.5
+
+    ehat_t = vect_op.normed_cross(ua, ehat_r)
+    ehat_s = vect_op.normed_cross(ehat_t, ua)
+
+    # roll angle
+    psi = coeff[1]
+
+    ehat_l = cas.cos(psi) * ehat_s + cas.sin(psi) * ehat_t
+    ehat_span = cas.cos(psi) * ehat_t - cas.sin(psi) * ehat_s
+    ehat_chord = ua/ua_norm
+
+    # implicit direct cosine matrix (for plotting only)
+    r = cas.horzcat(ehat_chord, ehat_span, ehat_l)
+
+    # lift and drag coefficients
+    CL = coeff[0]
+    CD = parameters['theta0','aero','CD0'] + 0.02 * CL ** 2
+
+    # lift and drag force
+    f_lift = CL * 1. / 2. * rho_infty * cas.mtimes(ua.T, ua) * parameters['theta0','geometry','s_ref'] * ehat_l
+    f_drag = CD * 1. / 2. * rho_infty * ua_norm * parameters['theta0','geometry','s_ref'] * ua
+
+    f_aero = f_lift + f_drag
+
+    kite_aero_fun = cas.Function('kite_aero', [ua, rho_infty, ehat_r, coeff, parameters],
+                                 [ua_norm, cas.reshape(r, (9, 1)), CL, CD, f_lift, f_drag, f_aero],
+                                 ['ua', 'rho_infty', 'ehat_r', 'coeff', 'parameters'],
+                                 ['ua_norm', 'r', 'CL', 'CD', 'f_lift', 'f_drag', 'f_aero'])
+
+    return kite_aero_fun
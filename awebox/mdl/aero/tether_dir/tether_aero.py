@@ -36,14 +36,31 @@ import numpy as np
 
 import awebox.tools.vector_operations as vect_op
 
-def get_forces(model_options, variables, atmos, wind, n, cd_tether_fun, outputs, parameters, architecture):
+def get_forces(model_options, variables, atmos, wind, n, cd_tether_fun, outputs, parameters, architecture, drag_models = None, segment_drag_fun = None):
 
     if 'tether_aero' not in list(outputs.keys()):
         outputs['tether_aero'] = {}
 
-    [trivial_lower, trivial_upper] = get_trivial_forces(model_options, variables, atmos, wind, n, parameters,architecture)
-    [physical_lower, physical_upper] = get_physical_forces(model_options, variables, atmos, wind, n, cd_tether_fun, architecture)
-    [simple_lower, simple_upper] = get_simple_forces(model_options, variables, atmos, wind, n, cd_tether_fun, architecture)
+    # only build the drag models that enter the dynamics, unless specified otherwise
+    if drag_models is None:
+        drag_models = get_drag_model_names(model_options['tether']['tether_drag']['model_type'])
+
+    if 'trivial' in drag_models:
+        [trivial_lower, trivial_upper] = get_trivial_forces(model_options, variables, atmos, wind, n, parameters,architecture)
+        outputs['tether_aero']['trivial_upper' + str(n)] = trivial_upper
+        outputs['tether_aero']['trivial_lower' + str(n)] = trivial_lower
+
+    if 'physical' in drag_models:
+        if segment_drag_fun is None:
+            segment_drag_fun = get_segment_drag_function(atmos, wind, cd_tether_fun, parameters)
+        [physical_lower, physical_upper] = get_physical_forces(model_options, variables, wind, n, segment_drag_fun, parameters, architecture)
+        outputs['tether_aero']['physical_upper' + str(n)] = physical_upper
+        outputs['tether_aero']['physical_lower' + str(n)] = physical_lower
+
+    if 'simple' in drag_models:
+        [simple_lower, simple_upper] = get_simple_forces(model_options, variables, atmos, wind, n, cd_tether_fun, parameters, architecture)
+        outputs['tether_aero']['simple_upper' + str(n)] = simple_upper
+        outputs['tether_aero']['simple_lower' + str(n)] = simple_lower
 
     [diam, q_upper, q_lower, dq_upper, dq_lower, ua_upper, ua_lower] = get_upper_lower_q_and_dq(model_options,
                                                                                                   variables, wind, n, architecture)
@@ -51,17 +68,32 @@ def get_forces(model_options, variables, atmos, wind, n, cd_tether_fun, outputs,
     ua = (ua_upper + ua_lower)/2.
     reynolds = get_reynolds_number(atmos, ua, diam, q_upper, q_lower)
 
-
-    outputs['tether_aero']['physical_upper' + str(n)] = physical_upper
-    outputs['tether_aero']['physical_lower' + str(n)] = physical_lower
-    outputs['tether_aero']['simple_upper' + str(n)] = simple_upper
-    outputs['tether_aero']['simple_lower' + str(n)] = simple_lower
-    outputs['tether_aero']['trivial_upper' + str(n)] = trivial_upper
-    outputs['tether_aero']['trivial_lower' + str(n)] = trivial_lower
     outputs['tether_aero']['reynolds' + str(n)] = reynolds
 
     return outputs
 
+def get_drag_model_names(tether_drag_model):
+    """Drag models needed by a tether drag model type, including the trivial model used in the homotopy.
+
+    @param tether_drag_model tether drag model type, or 'all' for all drag models
+    @return list of drag model names
+    """
+
+    if tether_drag_model == 'equivalence':
+        drag_models = ['trivial', 'physical']
+    elif tether_drag_model == 'simple':
+        drag_models = ['trivial', 'simple']
+    elif tether_drag_model == 'trivial':
+        drag_models = ['trivial']
+    elif tether_drag_model == 'not_in_use':
+        drag_models = []
+    elif tether_drag_model == 'all':
+        drag_models = ['trivial', 'physical', 'simple']
+    else:
+        raise ValueError('tether drag model not supported.')
+
+    return drag_models
+
 def get_trivial_forces(model_options, variables, atmos, wind, n, parameters, architecture):
 
     [diam, q_upper, q_lower, dq_upper, dq_lower, ua_upper, ua_lower] = get_upper_lower_q_and_dq(model_options,
@@ -82,23 +114,23 @@ def get_trivial_forces(model_options, variables, atmos, wind, n, parameters, arc
 
     return [force_lower, force_upper]
 
-def get_simple_forces(model_options, variables, atmos, wind, n, cd_tether_fun, architecture):
+def get_simple_forces(model_options, variables, atmos, wind, n, cd_tether_fun, parameters, architecture):
 
     [diam, q_upper, q_lower, dq_upper, dq_lower, ua_upper, ua_lower] = get_upper_lower_q_and_dq(model_options,
                                                                                                   variables, wind, n,architecture)
 
-    drag = get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun)
+    drag = get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun, parameters)
 
     force_upper = drag/2.
     force_lower = drag/2.
 
     return [force_lower, force_upper]
 
-def get_physical_forces(model_options, variables, atmos, wind, n, cd_tether_fun, architecture):
+def get_physical_forces(model_options, variables, wind, n, segment_drag_fun, parameters, architecture):
 
     [diam, q_upper, q_lower, dq_upper, dq_lower, ua_upper, ua_lower] = get_upper_lower_q_and_dq(model_options, variables, wind, n,architecture)
 
-    [force_upper, force_lower] = get_equivalent_tether_drag_forces(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun)
+    [force_upper, force_lower] = get_equivalent_tether_drag_forces(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, segment_drag_fun, parameters)
 
     return [force_lower, force_upper]
 
@@ -149,7 +181,7 @@ def get_reynolds_number(atmos, ua, diam, q_upper, q_lower):
 
     return reynolds
 
-def get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun):
+def get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun, parameters):
 
     q_average = (q_upper + q_lower) / 2.
     zz = q_average[2]
@@ -170,7 +202,7 @@ def get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, c
     length_perp_to_wind = (length**2. - length_parallel_to_wind**2.)**0.5
 
     reynolds = get_reynolds_number(atmos, ua, diam, q_upper, q_lower)
-    cd = cd_tether_fun(reynolds)
+    cd = cd_tether_fun(reynolds, parameters)
 
     drag = cd * 0.5 * density * ua_norm * diam * length_perp_to_wind * ua
 
@@ -213,34 +245,53 @@ def from_body_to_earthfixed(body_vector, q_upper, q_lower):
 
     return earthfixed_vector
 
-def get_total_drag(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun):
+def get_segment_drag_function(atmos, wind, cd_tether_fun, parameters):
+    """Function of the drag force of one tether element, and of its moment about the tether center
 
-    elem = model_options['tether']['aero_elements']
-    q_average = (q_upper + q_lower) / 2.
+    @param cd_tether_fun tether drag coefficient as a function of the reynolds number and the model parameters
+    @param parameters model parameters
+    @return Function (diam, q_upper, q_lower, dq_upper, dq_lower, moment_arm, parameters) -> (force, moment)
+    """
+
+    diam = cas.SX.sym('diam')
+    q_upper = cas.SX.sym('q_upper', 3)
+    q_lower = cas.SX.sym('q_lower', 3)
+    dq_upper = cas.SX.sym('dq_upper', 3)
+    dq_lower = cas.SX.sym('dq_lower', 3)
+    moment_arm = cas.SX.sym('moment_arm', 3)
+
+    force = get_segment_force(diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun, parameters)
+    moment = vect_op.cross(moment_arm, force)
 
-    total_force = np.zeros((3, 1))
-    total_moment = np.zeros((3, 1))
+    segment_drag_fun = cas.Function('segment_drag', [diam, q_upper, q_lower, dq_upper, dq_lower, moment_arm, parameters],
+                                    [force, moment])
 
-    for idx in range(elem):
+    return segment_drag_fun
 
-        loc_s_upper = float(idx + 1) / float(elem)
-        loc_s_lower = float(idx) / float(elem)
+def get_total_drag(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, segment_drag_fun, parameters):
+
+    elem = model_options['tether']['aero_elements']
+    q_average = (q_upper + q_lower) / 2.
 
-        q_loc_upper = q_lower + loc_s_upper * (q_upper - q_lower)
-        q_loc_lower = q_lower + loc_s_lower * (q_upper - q_lower)
+    # element boundaries along the tether, one column per element
+    loc_s_upper = np.arange(1., elem + 1.).reshape((1, elem)) / float(elem)
+    loc_s_lower = np.arange(0., elem).reshape((1, elem)) / float(elem)
 
-        q_loc_average = (q_loc_lower + q_loc_upper)/2.
-        moment_arm = q_average - q_loc_average
+    q_loc_upper = cas.repmat(q_lower, 1, elem) + cas.mtimes(q_upper - q_lower, loc_s_upper)
+    q_loc_lower = cas.repmat(q_lower, 1, elem) + cas.mtimes(q_upper - q_lower, loc_s_lower)
 
-        dq_loc_upper = dq_lower + loc_s_upper * (dq_upper - dq_lower)
-        dq_loc_lower = dq_lower + loc_s_lower * (dq_upper - dq_lower)
+    q_loc_average = (q_loc_lower + q_loc_upper)/2.
+    moment_arm = cas.repmat(q_average, 1, elem) - q_loc_average
 
-        loc_force = get_segment_force(diam, q_loc_upper, q_loc_lower, dq_loc_upper, dq_loc_lower, atmos, wind, cd_tether_fun)
+    dq_loc_upper = cas.repmat(dq_lower, 1, elem) + cas.mtimes(dq_upper - dq_lower, loc_s_upper)
+    dq_loc_lower = cas.repmat(dq_lower, 1, elem) + cas.mtimes(dq_upper - dq_lower, loc_s_lower)
 
-        loc_moment = vect_op.cross(moment_arm, loc_force)
+    # all elements in one mapped call
+    [loc_force, loc_moment] = segment_drag_fun.map(elem)(diam, q_loc_upper, q_loc_lower, dq_loc_upper, dq_loc_lower,
+                                                          moment_arm, parameters)
 
-        total_force = total_force + loc_force
-        total_moment = total_moment + loc_moment
+    total_force = cas.sum2(loc_force)
+    total_moment = cas.sum2(loc_moment)
 
     return [total_force, total_moment]
 
@@ -272,11 +323,11 @@ def get_inverse_equivalence_matrix(tether_length):
     return Ainv
 
 
-def get_equivalent_tether_drag_forces(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun):
+def get_equivalent_tether_drag_forces(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, segment_drag_fun, parameters):
 
     tether = q_upper - q_lower
 
-    [total_force_earthfixed, total_moment_earthfixed] = get_total_drag(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, atmos, wind, cd_tether_fun)
+    [total_force_earthfixed, total_moment_earthfixed] = get_total_drag(model_options, diam, q_upper, q_lower, dq_upper, dq_lower, segment_drag_fun, parameters)
 
     total_force_body = from_earthfixed_to_body(total_force_earthfixed, q_upper, q_lower)
     total_moment_body = from_earthfixed_to_body(total_moment_earthfixed, q_upper, q_lower)
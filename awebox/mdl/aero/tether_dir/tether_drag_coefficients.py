@@ -43,6 +43,9 @@ def get_drag_coeff_equation(model_options, parameters):
     if model_options['tether']['cd_model'] == 'polyfit':
         drag_coeff = get_interpolation(reynolds, smoothing)
 
+    elif model_options['tether']['cd_model'] == 'spline':
+        drag_coeff = get_spline(reynolds, smoothing)
+
     elif model_options['tether']['cd_model'] == 'piecewise':
         drag_coeff = get_roshko_unitstep(reynolds, smoothing)
 
@@ -52,7 +55,8 @@ def get_drag_coeff_equation(model_options, parameters):
     else:
         raise ValueError('invalid tether drag coefficient model selected: %s',model_options['tether']['cd_model'])
 
-    cd_tether_fun = cas.Function('cd_tether_fun', [reynolds], [drag_coeff])
+    # the parameters are an input, since the constant drag coefficient is a model parameter
+    cd_tether_fun = cas.Function('cd_tether_fun', [reynolds, parameters], [drag_coeff])
 
     return cd_tether_fun
 
@@ -61,6 +65,7 @@ def plot_cd_vs_reynolds(num_fig, model_options):
     log_reynolds_list = np.arange(101.) * 7. / 100.
     cd_list_unitstep = []
     cd_list_poly = []
+    cd_list_spline = []
     cd_list_default = []
     reynolds_list = []
 
@@ -72,10 +77,12 @@ def plot_cd_vs_reynolds(num_fig, model_options):
 
         cd_list_unitstep = cas.vertcat(cd_list_unitstep, get_roshko_unitstep(reynolds, smoothing))
         cd_list_poly = cas.vertcat(cd_list_poly, get_interpolation(reynolds, smoothing))
+        cd_list_spline = cas.vertcat(cd_list_spline, get_spline(reynolds, smoothing))
         cd_list_default = cas.vertcat(cd_list_default, model_options['tether']['cd'])
 
     cd_list_unitstep = np.array(cd_list_unitstep)
     cd_list_poly = np.array(cd_list_poly)
+    cd_list_spline = np.array(cd_list_spline)
     cd_list_default = np.array(cd_list_default)
     reynolds_list = np.array(reynolds_list)
 
@@ -84,6 +91,7 @@ def plot_cd_vs_reynolds(num_fig, model_options):
     plt.figure(num_fig)
     plt.loglog(reynolds_list, cd_list_unitstep, 'r', label='roshko unitstep of linear fits')
     plt.loglog(reynolds_list, cd_list_poly, 'g', label='polyfit of roshko')
+    plt.loglog(reynolds_list, cd_list_spline, 'm', label='spline fit of roshko and achenbach')
     plt.loglog(achenbach_re, achenbach_cd, 'b*', label='achenbach datapoints')
     plt.loglog(reynolds_list, cd_list_default, 'k--', label='constant')
     plt.legend()
@@ -249,17 +257,70 @@ def make_poly_points(smoothing):
 
 def get_interpolation(reynolds, smoothing):
 
-    [reynolds_array, cd_array] = make_poly_points(smoothing)
+    if smoothing not in list(_polyfit_cache.keys()):
+
+        [reynolds_array, cd_array] = make_poly_points(smoothing)
+
+        log_re = np.log10(reynolds_array)
 
-    log_re = np.log10(reynolds_array)
+        cd_list = cd_array.T.tolist()[0]
+        log_re_list = log_re.T.tolist()[0]
 
-    cd_list = cd_array.T.tolist()[0]
-    log_re_list = log_re.T.tolist()[0]
+        max_dim = 10
 
-    max_dim = 10
+        _polyfit_cache[smoothing] = np.polyfit(log_re_list, cd_list, max_dim)
 
-    poly = np.polyfit(log_re_list, cd_list, max_dim)
+    poly = _polyfit_cache[smoothing]
 
     estimate = cas.polyval(poly, np.log10(reynolds))
 
     return estimate
+
+def make_spline_coefficients(smoothing):
+    """Least-squares fit of a cubic spline in log10(Re) to the achenbach datapoints,
+    completed by the roshko relationship outside of the range of the achenbach data.
+    The spline is stored in truncated power form, so that it can be evaluated on SX.
+    """
+
+    [achenbach_re, achenbach_cd] = get_achenbach_datapoints()
+    log_achenbach_re = np.log10(achenbach_re)
+
+    lb_log_re = 2.
+    ub_log_re = 7.
+    log_roshko_re = np.linspace(lb_log_re, ub_log_re, 201)
+    roshko_cd = get_roshko_unitstep(10.**log_roshko_re, smoothing)
+    outside = (log_roshko_re < np.min(log_achenbach_re)) | (log_roshko_re > np.max(log_achenbach_re))
+
+    log_re = np.concatenate([log_roshko_re[outside], log_achenbach_re])
+    cd = np.concatenate([roshko_cd[outside], achenbach_cd])
+
+    # knot spacing of half a decade smooths the scatter of the achenbach datapoints
+    knots = np.arange(lb_log_re + 0.5, ub_log_re, 0.5)
+    shifted = log_re - lb_log_re
+    basis = [np.ones(shifted.shape), shifted, shifted**2, shifted**3] + [np.maximum(log_re - knot, 0.)**3 for knot in knots]
+    coeffs = np.linalg.lstsq(np.stack(basis, axis=1), cd, rcond=None)[0]
+
+    spline = {'lb': lb_log_re, 'ub': ub_log_re, 'knots': knots, 'poly': coeffs[:4], 'jumps': coeffs[4:]}
+
+    return spline
+
+def get_spline(reynolds, smoothing):
+
+    if smoothing not in list(_spline_cache.keys()):
+        _spline_cache[smoothing] = make_spline_coefficients(smoothing)
+    spline = _spline_cache[smoothing]
+
+    # outside of the data range, the drag coefficient is held constant
+    log_re = cas.fmin(cas.fmax(np.log10(reynolds), spline['lb']), spline['ub'])
+    shifted = log_re - spline['lb']
+
+    poly = spline['poly']
+    estimate = poly[0] + shifted * (poly[1] + shifted * (poly[2] + shifted * poly[3]))
+    for knot, jump in zip(spline['knots'], spline['jumps']):
+        estimate += jump * cas.fmax(log_re - knot, 0.)**3
+
+    return estimate
+
+# fits only depend on the smoothing, and are shared between all models
+_polyfit_cache = {}
+_spline_cache = {}
@@ -30,6 +30,7 @@ and information storage and retrieval.
 @edit: rachel leuthold, alu-fr 2019
 """
 
+import itertools
 
 class Architecture:
     """Class that facilitates structure bookkeeping of tree-structured tethered kite systems.
@@ -122,6 +123,44 @@ class Architecture:
 
         return None
 
+    def get_anticollision_pairs(self, pair_selection = 'all'):
+        """Get list of kite pairs that might collide. With the 'architecture' selection, only siblings
+        and kites whose parents are adjacent in the tree are paired, since kites on other layers are
+        separated by design.
+        """
+
+        kite_pairs = []
+        for kite_a, kite_b in itertools.combinations(self.__kite_nodes, 2):
+            parent_a = self.__parent_map[kite_a]
+            parent_b = self.__parent_map[kite_b]
+
+            if pair_selection == 'all':
+                paired = True
+            elif pair_selection == 'architecture':
+                siblings = (parent_a == parent_b)
+                adjacent_layers = (self.__parent_map.get(parent_a) == parent_b) or (self.__parent_map.get(parent_b) == parent_a)
+                paired = siblings or adjacent_layers
+            else:
+                raise ValueError('unsupported anticollision pair selection: ' + str(pair_selection))
+
+            if paired:
+                kite_pairs += [(kite_a, kite_b)]
+
+        return kite_pairs
+
+    def get_sibling_permutation(self, shift = 1):
+        """Map every kite onto the sibling that is shift positions further along its layer, so that
+        the siblings of every layer are permuted cyclically. Kites without siblings are mapped onto themselves.
+        """
+
+        permutation = {}
+        for kite in self.__kite_nodes:
+            siblings = self.__siblings_map[kite]
+            idx = siblings.index(kite)
+            permutation[kite] = siblings[(idx + shift) % len(siblings)]
+
+        return permutation
+
     def get_number_children(self, parent):
         children = self.__children_map[parent]
         number_children = len(children)
@@ -30,6 +30,7 @@ _python-3.5 / casadi-3.4.5
 '''
 
 import casadi.tools as cas
+import logging
 
 class Atmosphere:
     def __init__(self, options, params):
@@ -38,18 +39,38 @@ class Atmosphere:
             # self.find_p_polynomial_from_datafile(params)
         self.__options = options
         self.__params = params
+        self.__build_atmosphere_function()
 
-    def get_temperature(self, zz):
-        params = self.__params.prefix['theta0','atmosphere']
+    def __build_atmosphere_function(self):
+        """Build a single function of the altitude that returns all atmospheric quantities, so that they
+        share the temperature, and a cache of its evaluations for every (symbolic) altitude.
+        """
+
+        atmosphere_struct = self.__params.getStruct('theta0').getStruct('atmosphere')
+        params = atmosphere_struct(cas.SX.sym('params', atmosphere_struct.size))
+        zz = cas.SX.sym('zz')
+
+        t = self.__make_temperature(zz, params)
+        rho = self.__make_density(t, params)
+        p = self.__make_pressure(t, rho, params)
+        mu = self.__make_viscosity(t, params)
+
+        self.__atmosphere_fun = cas.Function('atmosphere', [zz, params], [t, rho, p, mu],
+                                             ['zz', 'params'], ['t', 'rho', 'p', 'mu'])
+        self.__altitude_cache = {}
+
+        return None
+
+    def __make_temperature(self, zz, params):
         options = self.__options
         if options['model'] == 'isa':
             t = params['t_ref'] - params['gamma_air'] * zz
         elif options['model'] == 'windshear':
             t = params['t_ref'] - params['gamma_air'] * zz
         elif options['model'] == 'log_wind':
-            t = cas.DM(params['t_ref'])
+            t = params['t_ref']
         elif options['model'] == 'uniform':
-            t = cas.DM(params['t_ref'])
+            t = params['t_ref']
         elif options['model'] == 'datafile':
             t = params['t_ref'] - params['gamma_air'] * zz
         else:
@@ -57,72 +78,100 @@ class Atmosphere:
 
         return t
 
-    def get_density(self, zz):
-        params = self.__params.prefix['theta0','atmosphere']
+    def __make_density(self, t, params):
         options = self.__options
         if options['model'] == 'isa':
-            t = self.get_temperature(zz)
             rho = params['rho_ref'] * (t / params['t_ref']) ** (
                 params['g'] / params['gamma_air'] / params['r'] - 1.0)
         elif options['model'] == 'log_wind':
-            rho = cas.DM(params['rho_ref'])
+            rho = params['rho_ref']
         elif options['model'] == 'uniform':
             rho = cas.DM(1.)
         elif options['model'] == 'datafile':
-            rho = self.get_pressure(zz) / \
-                params['r'] / self.get_temperature(zz)
+            rho = params['p_ref'] / params['r'] / t
         else:
             raise ValueError('failure: unsupported atmospheric option chosen: %s', options['model'])
 
-
-        return rho
-
-    def get_density_ref(self):
-        params = self.__params.prefix['theta0', 'atmosphere']
-        options = self.__options
-        rho = params['rho_ref']
-
         return rho
 
-    def get_pressure(self, zz):
-        params = self.__params.prefix['theta0','atmosphere']
+    def __make_pressure(self, t, rho, params):
         options = self.__options
         if options['model'] == 'isa':
-            p = self.get_density(zz) * \
-                params['r'] * self.get_temperature(zz)
+            p = rho * params['r'] * t
         elif options['model'] == 'log_wind':
-            p = cas.DM(params['p_ref'])
+            p = params['p_ref']
         elif options['model'] == 'uniform':
-            p = cas.DM(params['p_ref'])
+            p = params['p_ref']
         elif options['model'] == 'datafile':
-            p = cas.DM(params['p_ref']) # constant value for now, could be computed with the files..
-            # raise ValueError('failure: unsupported atmospheric option chosen: %s', options['model'])
+            p = params['p_ref'] # constant value for now, could be computed with the files..
         else:
             raise ValueError('failure: unsupported atmospheric option chosen: %s', options['model'])
 
-
         return p
 
-    def get_viscosity(self, zz):
-        params = self.__params.prefix['theta0','atmosphere']
+    def __make_viscosity(self, t, params):
         options = self.__options
-        if options['model'] == 'isa':
-            mu = params['mu_ref'] * (params['t_ref'] + params['c_sutherland']) / (self.get_temperature(zz) +
-                 params['c_sutherland']) * (self.get_temperature(zz) / params['t_ref']) ** (3.0 / 2.0)
+        if options['model'] in ['isa', 'datafile']:
+            mu = params['mu_ref'] * (params['t_ref'] + params['c_sutherland']) / (t +
+                 params['c_sutherland']) * (t / params['t_ref']) ** (3.0 / 2.0)
         elif options['model'] == 'log_wind':
-            mu = cas.DM(params['mu_ref'])
+            mu = params['mu_ref']
         elif options['model'] == 'uniform':
-            mu = cas.DM(params['mu_ref'])
-        elif options['model'] == 'datafile':
-            mu = params['mu_ref'] * (params['t_ref'] + params['c_sutherland']) / (self.get_temperature(zz) +
-                 params['c_sutherland']) * (self.get_temperature(zz) / params['t_ref']) ** (3.0 / 2.0)
+            mu = params['mu_ref']
         else:
             raise ValueError('failure: unsupported atmospheric option chosen: %s', options['model'])
 
-
         return mu
 
+    def get_state(self, zz):
+        """Temperature, density, pressure and viscosity at the altitude zz. The atmosphere function
+        is evaluated only once per symbolic altitude, all further requests share its outputs.
+        """
+
+        key = None
+        if isinstance(zz, cas.SX) and zz.is_scalar():
+            key = zz.element_hash()
+            if key in self.__altitude_cache:
+                return self.__altitude_cache[key][1]
+
+        [t, rho, p, mu] = self.__atmosphere_fun(zz, self.__params['theta0','atmosphere'])
+        state = {'t': t, 'rho': rho, 'p': p, 'mu': mu}
+
+        if key is not None:
+            # keep the altitude alive, so that its hash can not be reused by another expression
+            self.__altitude_cache[key] = (zz, state)
+
+        return state
+
+    def get_temperature(self, zz):
+        return self.get_state(zz)['t']
+
+    def get_density(self, zz):
+        return self.get_state(zz)['rho']
+
+    def get_density_ref(self):
+        params = self.__params.prefix['theta0', 'atmosphere']
+        options = self.__options
+        rho = params['rho_ref']
+
+        return rho
+
+    def get_pressure(self, zz):
+        return self.get_state(zz)['p']
+
+    def get_viscosity(self, zz):
+        return self.get_state(zz)['mu']
+
     def get_speed_of_sound(self, zz):
         params = self.__params.prefix['theta0','atmosphere']
         a = (params['gamma'] * params['r'] * self.get_temperature(zz)) ** 0.5
         return a
+
+    @property
+    def atmosphere_fun(self):
+        """function of the altitude and atmosphere parameters returning temperature, density, pressure and viscosity"""
+        return self.__atmosphere_fun
+
+    @atmosphere_fun.setter
+    def atmosphere_fun(self, value):
+        logging.warning('Cannot set atmosphere_fun object.')
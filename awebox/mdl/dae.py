@@ -30,6 +30,7 @@ python-3.5 / casadi 3.0.0
 
 import awebox.tools.integrator_routines as int_rout
 import casadi.tools as cas
+import logging
 
 class Dae(object):
     """
@@ -86,7 +87,13 @@ class Dae(object):
 
         # create rootfinder
         g = cas.Function('g',[self.__z.cat,self.__x.cat,self.__p.cat],[self.__dae['alg']])
-        G = cas.rootfinder('G', 'fast_newton', g, {'jit': True})
+        # a failed newton iteration returns nan (e.g. a diverged rollout) rather than raising
+        try:
+            G = cas.rootfinder('G', 'fast_newton', g, {'jit': True, 'error_on_fail': False})
+        except RuntimeError:
+            # e.g. newer casadi versions do not ship the jit compiler
+            logging.info('rootfinder can not be jit-compiled, using the uncompiled rootfinder.')
+            G = cas.rootfinder('G', 'fast_newton', g, {'error_on_fail': False})
 
         self.__rootfinder = G
 
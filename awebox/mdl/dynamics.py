@@ -32,8 +32,6 @@ python-3.5 / casadi-3.4.5
 import casadi.tools as cas
 import numpy as np
 
-import itertools
-
 from collections import OrderedDict
 
 from . import system
@@ -223,18 +221,12 @@ def make_dynamics(options,atmos,wind,parameters,architecture):
     # order of V is: q, dq, omega, R, delta, lt, dlt, e
     res = cas.vertcat(*dynamics_list)
 
-    # dynamics function options
-    if options['jit_code_gen']['include']:
-        opts = {'jit': True, 'compiler': options['jit_code_gen']['compiler']}
-    else:
-        opts = {}
-
     # generate dynamics function
     dynamics = cas.Function(
-        'dynamics', [system_variables['scaled'], parameters], [res], opts)
+        'dynamics', [system_variables['scaled'], parameters], [res])
 
     # generate integral outputs function
-    integral_outputs_fun = cas.Function('integral_outputs', [system_variables['scaled'], parameters], [integral_outputs], opts)
+    integral_outputs_fun = cas.Function('integral_outputs', [system_variables['scaled'], parameters], [integral_outputs])
 
     return [
         system_variables['scaled'],
@@ -457,6 +449,11 @@ def generate_tether_drag_forces(options, variables, parameters, atmos, wind, out
     # tether_drag_coeff.plot_cd_vs_reynolds(100, options)
     cd_tether_fun = tether_drag_coeff.get_drag_coeff_equation(options, parameters)
 
+    # drag of one tether element, shared by all elements and tethers
+    segment_drag_fun = None
+    if 'physical' in tether_aero.get_drag_model_names(options['tether']['tether_drag']['model_type']):
+        segment_drag_fun = tether_aero.get_segment_drag_function(atmos, wind, cd_tether_fun, parameters)
+
     # initialize dictionary
     tether_drag_forces = {}
     for n in range(1, architecture.number_of_nodes):
@@ -468,26 +465,21 @@ def generate_tether_drag_forces(options, variables, parameters, atmos, wind, out
 
         parent = architecture.parent_map[n]
 
-        outputs = tether_aero.get_forces(options, variables, atmos, wind, n, cd_tether_fun, outputs, parameters, architecture)
-
-        physical_upper = outputs['tether_aero']['physical_upper' + str(n)]
-        physical_lower = outputs['tether_aero']['physical_lower' + str(n)]
-        simple_upper = outputs['tether_aero']['simple_upper' + str(n)]
-        simple_lower = outputs['tether_aero']['simple_lower' + str(n)]
-        trivial_upper = outputs['tether_aero']['trivial_upper' + str(n)]
-        trivial_lower = outputs['tether_aero']['trivial_lower' + str(n)]
+        outputs = tether_aero.get_forces(options, variables, atmos, wind, n, cd_tether_fun, outputs, parameters, architecture,
+                                         segment_drag_fun = segment_drag_fun)
 
         tether_model = options['tether']['tether_drag']['model_type']
+        tether_forces = outputs['tether_aero']
 
         if tether_model == 'equivalence':
-            drag_parent = p_dec['tau'] * trivial_lower + (1. - p_dec['tau']) * physical_lower
-            drag_node = p_dec['tau'] * trivial_upper + (1. - p_dec['tau']) * physical_upper
+            drag_parent = p_dec['tau'] * tether_forces['trivial_lower' + str(n)] + (1. - p_dec['tau']) * tether_forces['physical_lower' + str(n)]
+            drag_node = p_dec['tau'] * tether_forces['trivial_upper' + str(n)] + (1. - p_dec['tau']) * tether_forces['physical_upper' + str(n)]
         elif tether_model == 'simple':
-            drag_parent = p_dec['tau'] * trivial_lower + (1. - p_dec['tau']) * simple_lower
-            drag_node = p_dec['tau'] * trivial_upper + (1. - p_dec['tau']) * simple_upper
+            drag_parent = p_dec['tau'] * tether_forces['trivial_lower' + str(n)] + (1. - p_dec['tau']) * tether_forces['simple_lower' + str(n)]
+            drag_node = p_dec['tau'] * tether_forces['trivial_upper' + str(n)] + (1. - p_dec['tau']) * tether_forces['simple_upper' + str(n)]
         elif tether_model == 'trivial':
-            drag_parent = trivial_lower
-            drag_node = trivial_upper
+            drag_parent = tether_forces['trivial_lower' + str(n)]
+            drag_node = tether_forces['trivial_upper' + str(n)]
         elif tether_model == 'not_in_use':
             drag_parent = np.zeros((3, 1))
             drag_node = np.zeros((3, 1))
@@ -507,6 +499,31 @@ def generate_tether_drag_forces(options, variables, parameters, atmos, wind, out
 
     return tether_drag_forces, outputs
 
+def make_tether_drag_diagnostics_function(options, atmos, wind, variables, parameters, architecture):
+    """Function of all tether drag models, for comparison after the solve (not part of the dynamics)
+
+    @param options model options
+    @param variables scaled system variables
+    @return Function (variables, parameters) -> dict of all tether drag forces and reynolds numbers
+    """
+
+    variables_si = generate_scaled_variables(options['scaling'], variables)[0]
+    cd_tether_fun = tether_drag_coeff.get_drag_coeff_equation(options, parameters)
+    segment_drag_fun = tether_aero.get_segment_drag_function(atmos, wind, cd_tether_fun, parameters)
+
+    outputs = {}
+    for n in range(1, architecture.number_of_nodes):
+        outputs = tether_aero.get_forces(options, variables_si, atmos, wind, n, cd_tether_fun, outputs, parameters,
+                                         architecture, drag_models = tether_aero.get_drag_model_names('all'),
+                                         segment_drag_fun = segment_drag_fun)
+
+    output_names = sorted(outputs['tether_aero'].keys())
+    tether_drag_diagnostics_fun = cas.Function('tether_drag_diagnostics', [variables, parameters],
+                                               [outputs['tether_aero'][name] for name in output_names],
+                                               ['variables', 'parameters'], output_names)
+
+    return tether_drag_diagnostics_fun
+
 def generate_aerodynamic_forces(options, variables, parameters, atmos, wind, outputs, architecture):
 
     # homotopy parameters
@@ -705,23 +722,43 @@ def anticollision_radius_inequality(options, variables, outputs, parameters, arc
 
     return outputs
 
+def get_anticollision_pairs(options, architecture):
+    """Kite pairs with an anticollision inequality: the pairs selected from the architecture and the added pairs
+
+    @param options model options
+    @param architecture system architecture
+    @return list of kite pairs
+    """
+
+    anticollision_options = options['model_bounds']['anticollision']
+
+    selected_pairs = architecture.get_anticollision_pairs(anticollision_options['pair_selection'])
+    added_pairs = [set(kite_pair) for kite_pair in anticollision_options['added_pairs']]
+
+    kite_pairs = []
+    for kite_pair in architecture.get_anticollision_pairs('all'):
+        if (kite_pair in selected_pairs) or (set(kite_pair) in added_pairs):
+            kite_pairs += [kite_pair]
+
+    return kite_pairs
+
 def anticollision_inequality(options, variables, outputs, parameters, architecture):
 
-    kite_nodes = architecture.kite_nodes
     parent_map = architecture.parent_map
 
     if 'anticollision' not in list(outputs.keys()):
         outputs['anticollision'] = {}
 
-    if len(kite_nodes) == 1:
+    kite_pairs = get_anticollision_pairs(options, architecture)
+
+    if not kite_pairs:
         outputs['anticollision']['n10'] = cas.DM(0.0)
         return outputs
 
     safety_factor = options['model_bounds']['anticollision']['safety_factor']
     dist_min = safety_factor*parameters['theta0','geometry','b_ref']
 
-    kite_combinations = itertools.combinations(kite_nodes, 2)
-    for kite_pair in kite_combinations:
+    for kite_pair in kite_pairs:
             kite_a = kite_pair[0]
             kite_b = kite_pair[1]
             parent_a = parent_map[kite_a]
@@ -798,7 +835,7 @@ def coeff_actuation_inequality(options, variables, parameters, outputs):
 
 def acceleration_inequality(options, variables, outputs, parameters):
 
-    acc_max = options['model_bounds']['acceleration']['acc_max'] * options['scaling']['other']['g']
+    acc_max = parameters['theta0','model_bounds','acc_max']
 
     if 'acceleration' not in list(outputs.keys()):
         outputs['acceleration'] = {}
@@ -1258,14 +1295,8 @@ def generate_constraints(options, variables, parameters, constraint_out):
     # fill in struct
     model_constraints = model_constraints_struct(cas.vertcat(*constraint_list))
 
-    # constraints function options
-    if options['jit_code_gen']['include']:
-        opts = {'jit': True, 'compiler': options['jit_code_gen']['compiler']}
-    else:
-        opts = {}
-
     # create function
-    model_constraints_fun = cas.Function('model_constraints_fun',[variables, parameters],[model_constraints.cat], opts)
+    model_constraints_fun = cas.Function('model_constraints_fun',[variables, parameters],[model_constraints.cat])
 
     return model_constraints_struct, model_constraints_fun, model_constraints_dict
 
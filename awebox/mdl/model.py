@@ -32,6 +32,10 @@ from . import system
 from . import dynamics as dyn
 
 import awebox.tools.print_operations as print_op
+import awebox.tools.code_generation as code_gen
+import awebox.tools.graph_operations as graph_op
+import casadi.tools as cas
+import numpy as np
 import time
 from . import dae
 import logging
@@ -61,6 +65,8 @@ class Model(object):
             self.__generate_variable_bounds(options)
             self.__generate_parameter_bounds(options)
             self.__generate_constraints(options)
+            self.__simplify_functions(options)
+            self.__generate_nlp_functions(options)
             self.__options = options
 
             self.__timings['overall'] = time.time()-timer
@@ -130,9 +136,33 @@ class Model(object):
         self.__integral_scaling = integral_scaling
 
         self.__output_components = [outputs_fun, outputs_dict]
+        self.__outputs_group_funs = {}
+        self.__tether_drag_diagnostics_fun = None
 
         return None
 
+    def get_outputs_group_fun(self, output_type):
+        """Function that only evaluates the outputs of one output type (generated on first request)
+        """
+
+        if output_type not in list(self.__outputs_group_funs.keys()):
+            outputs = self.__outputs(self.__outputs_fun(self.__variables, self.__parameters))
+            self.__outputs_group_funs[output_type] = cas.Function('outputs_' + output_type,
+                                                                  [self.__variables, self.__parameters], [outputs[output_type]])
+
+        return self.__outputs_group_funs[output_type]
+
+    def get_tether_drag_diagnostics_fun(self):
+        """Function that evaluates all tether drag models, also those not used in the dynamics (generated on first request)
+        """
+
+        if self.__tether_drag_diagnostics_fun is None:
+            self.__tether_drag_diagnostics_fun = dyn.make_tether_drag_diagnostics_function(self.__options, self.__atmos, self.__wind,
+                                                                                           self.__variables, self.__parameters,
+                                                                                           self.__architecture)
+
+        return self.__tether_drag_diagnostics_fun
+
     def get_dae(self):
         """Generate DAE object for casadi integrators, rootfinder,...
         """
@@ -155,6 +185,31 @@ class Model(object):
                                                      self.__scaling)
         return None
 
+    def update_variable_bounds(self, system_bounds):
+        """Re-generate the variable bounds for new system bounds, without rebuilding the model.
+
+        @param system_bounds system bounds options (SI units)
+        @return True if the variable bounds changed
+        """
+
+        variable_bounds = system.scale_bounds(system.define_bounds(system_bounds, self.__variables),
+                                              self.__scaling)
+
+        changed = False
+        for variable_type in list(variable_bounds.keys()):
+            for name in list(variable_bounds[variable_type].keys()):
+                for bound_type in ['lb', 'ub']:
+                    new_bound = np.array(variable_bounds[variable_type][name][bound_type], dtype=float)
+                    old_bound = np.array(self.__variable_bounds[variable_type][name][bound_type], dtype=float)
+                    if not np.array_equal(new_bound, old_bound):
+                        changed = True
+
+        if changed:
+            logging.info('update variable bounds...')
+            self.__variable_bounds = variable_bounds
+
+        return changed
+
     def __generate_parameter_bounds(self,options):
 
         logging.info('generate parameter bounds...')
@@ -183,6 +238,53 @@ class Model(object):
 
         return None
 
+    def __simplify_functions(self, options):
+        """Eliminate common subexpressions of the model functions, and report their size before and after.
+        """
+
+        self.__function_statistics = {}
+
+        if options['simplification']['include']:
+            logging.info('simplify model functions...')
+
+            functions = {}
+            functions['dynamics'] = self.__dynamics
+            functions['constraints_fun'] = self.__constraints_fun
+            functions['outputs_fun'] = self.__outputs_fun
+            functions['integral_outputs_fun'] = self.__integral_outputs_fun
+
+            functions, self.__function_statistics = graph_op.simplify_functions(functions, n_eval = options['simplification']['n_eval'])
+
+            self.__dynamics = functions['dynamics']
+            self.__constraints_fun = functions['constraints_fun']
+            self.__outputs_fun = functions['outputs_fun']
+            self.__integral_outputs_fun = functions['integral_outputs_fun']
+            self.__output_components = [self.__outputs_fun, self.__outputs_dict]
+
+        return None
+
+    def __generate_nlp_functions(self, options):
+        """Collect the model functions that are evaluated in the nlp. With code generation, these are
+        compiled (or loaded from the cache) external functions, while the symbolic functions remain available.
+        """
+
+        nlp_functions = {}
+        nlp_functions['dynamics'] = self.__dynamics
+        nlp_functions['constraints_fun'] = self.__constraints_fun
+        nlp_functions['outputs_fun'] = self.__outputs_fun
+        nlp_functions['integral_outputs_fun'] = self.__integral_outputs_fun
+
+        if options['jit_code_gen']['include']:
+            logging.info('generate compiled model functions...')
+            timer = time.time()
+            for name in list(nlp_functions.keys()):
+                nlp_functions[name] = code_gen.get_compiled_function(nlp_functions[name], options['jit_code_gen'])
+            self.__timings['code_generation'] = time.time() - timer
+
+        self.__nlp_functions = nlp_functions
+
+        return None
+
 
     @property
     def kite_geometry(self):
@@ -193,6 +295,24 @@ class Model(object):
         self.__kite_geometry = geometry_options
         return None
 
+    @property
+    def function_statistics(self):
+        """graph size and evaluation time of the model functions before and after simplification"""
+        return self.__function_statistics
+
+    @function_statistics.setter
+    def function_statistics(self, value):
+        logging.warning('Cannot set function_statistics object.')
+
+    @property
+    def nlp_functions(self):
+        """model functions evaluated in the nlp"""
+        return self.__nlp_functions
+
+    @nlp_functions.setter
+    def nlp_functions(self, value):
+        logging.warning('Cannot set nlp_functions object.')
+
     @property
     def status(self):
         return self.__status
@@ -31,6 +31,7 @@ _python-3.5 / casadi-3.4.5
 import casadi.tools as cas
 import numpy as np
 import logging
+import hashlib
 import awebox.tools.vector_operations as vect_op
 import awebox.tools.lagr_interpol as lagr_interpol
 
@@ -38,9 +39,7 @@ class Wind:
     def __init__(self, wind_model_options, params):
         self.__options = wind_model_options
         self.__params = params #NOTE: where do those parameters come from?
-        if self.__options['model'] == 'datafile':
-            self.find_u_polynomial_from_datafile()
-            # self.find_p_polynomial_from_datafile(params) # pressure is set as constant for now
+        # pressure is set as constant for now, see find_p_polynomial_from_datafile
 
     def get_velocity(self, zz):
         params = self.__params.prefix['theta0','wind']
@@ -80,39 +79,6 @@ class Wind:
 
         return u_ref
 
-    def find_u_polynomial_from_datafile(self):
-        """_data description:
-        data given at 10 lowest different pressure levels (see text file) at 2928 time instants.
-        3h resolution over the year 2016 in goeteborg
-
-        winddata:       north and east wind component
-        heightsdata:    heights corresponding to the pressure levels at that time point
-        featuresdata:   north and east wind component converted to main wind direction
-                        and angle derivation. later in the code this is converter to
-                        x and y wind component. in the code x is the main wind direction.
-        """
-        options = self.__options
-        heightsdata  = options['atmosphere_heightsdata']
-        featuresdata = options['atmosphere_featuresdata']
-
-        # k = options['atmosphere_dataseries'] ## NOTE: What's that??? the number of pressure points?
-
-        # create x and y wind component
-        k = 0 # example for time stamp 1
-        xwind = [w * np.abs(np.cos(-a)) for w, a in featuresdata[:, k, :]]
-        ywind = [w * np.sin(-a) for w, a in featuresdata[:, k, :]]
-        xwind = np.array(xwind, dtype=float)
-        ywind = np.array(ywind, dtype=float)
-        self.heights = heightsdata[:, k]
-
-        # create the function of the lagrange polynomial for x and y wind
-        # and give out the polynomial parameters, respectively.
-        _, taux_opt = lagr_interpol.smooth_lagrange_poly(self.heights, xwind)
-        _, tauy_opt = lagr_interpol.smooth_lagrange_poly(self.heights, ywind)
-
-        self.taux_opt = taux_opt
-        self.tauy_opt = tauy_opt
-
     def find_p_polynomial_from_datafile(self):
         options = self.__options
         pressures = np.array(
@@ -139,12 +105,14 @@ class Wind:
 
     def get_velocity_from_datafile(self, zz):
 
-        # generate the lagrange polynomial with the 'optimized' poly. parameters
-        Lagr_x_fun = lagr_interpol.lagrange_poly(self.heights, self.taux_opt)
-        Lagr_y_fun = lagr_interpol.lagrange_poly(self.heights, self.tauy_opt)
+        # the spline is built once per number of pressure levels, the heights and the profile
+        # of the chosen time stamp enter through the system parameters.
+        params = self.__params.prefix['theta0','wind','datafile']
+        spline_fun = get_datafile_spline(params['heights'].shape[0])
+
         # compute the x,y,z components
-        x_component = Lagr_x_fun(zz)
-        y_component = Lagr_y_fun(zz)
+        x_component = spline_fun(zz, params['heights'], params['u_x'])
+        y_component = spline_fun(zz, params['heights'], params['u_y'])
         z_component = 0.
 
         u_wind = cas.vertcat(x_component, y_component, z_component)
@@ -157,3 +125,132 @@ class Wind:
     @options.setter
     def options(self, value):
         logging.warning('Cannot set options object.')
+
+# wind profiles and splines are shared between all wind objects, so that every
+# (swept, batched) problem on the same data set reuses them.
+_datafile_profiles = {}
+_datafile_splines = {}
+
+def build_datafile_profiles(heightsdata, featuresdata):
+    """Compute the wind profiles of all time stamps of the data set at once.
+
+    data given at 10 lowest different pressure levels (see text file) at 2928 time instants.
+    3h resolution over the year 2016 in goeteborg
+
+    heightsdata:    heights corresponding to the pressure levels at every time point [levels x time stamps]
+    featuresdata:   north and east wind component converted to main wind direction
+                    and angle derivation [levels x time stamps x 2]. here this is converted to
+                    x and y wind component. in the code x is the main wind direction.
+
+    The heights of the pressure levels vary in time, so every profile keeps the heights of its
+    own time stamp, sorted in ascending order.
+
+    @param heightsdata heights of the pressure levels
+    @param featuresdata wind speed and angle at the pressure levels
+    @return profiles dict with heights and x and y wind component [levels x time stamps]
+    """
+
+    heightsdata = np.array(heightsdata, dtype=float)
+    featuresdata = np.array(featuresdata, dtype=float)
+
+    key = hashlib.sha1(heightsdata.tobytes() + featuresdata.tobytes() + str(featuresdata.shape).encode()).hexdigest()
+    if key in _datafile_profiles:
+        return _datafile_profiles[key]
+
+    if heightsdata.ndim == 1:
+        heightsdata = heightsdata[:, np.newaxis]
+        featuresdata = featuresdata[:, np.newaxis, :]
+
+    # create x and y wind component
+    speed = featuresdata[:, :, 0]
+    angle = featuresdata[:, :, 1]
+    xwind = speed * np.abs(np.cos(-angle))
+    ywind = speed * np.sin(-angle)
+
+    # sort the levels of every time stamp by height
+    order = np.argsort(heightsdata, axis=0)
+    heights = np.take_along_axis(heightsdata, order, axis=0)
+    u_x = np.take_along_axis(xwind, order, axis=0)
+    u_y = np.take_along_axis(ywind, order, axis=0)
+
+    profiles = {'heights': heights, 'u_x': u_x, 'u_y': u_y}
+    _datafile_profiles[key] = profiles
+
+    return profiles
+
+def get_datafile_profile(heightsdata, featuresdata, k):
+    """Wind profile at time stamp k of the data set, as used for the wind parameters.
+
+    @param heightsdata heights of the pressure levels
+    @param featuresdata wind speed and angle at the pressure levels
+    @param k time stamp index
+    @return dict with heights and x and y wind component at these heights
+    """
+
+    profiles = build_datafile_profiles(heightsdata, featuresdata)
+    number_of_stamps = profiles['u_x'].shape[1]
+    if k < 0 or k >= number_of_stamps:
+        raise ValueError('wind data time stamp ' + str(k) + ' out of range: data set has ' + str(number_of_stamps) + ' time stamps.')
+
+    profile = {}
+    profile['heights'] = profiles['heights'][:, [k]]
+    profile['u_x'] = profiles['u_x'][:, [k]]
+    profile['u_y'] = profiles['u_y'][:, [k]]
+
+    return profile
+
+def get_datafile_spline(n_h):
+    """Natural cubic spline through the wind values at a height grid, with the heights and the
+    values as function inputs. Above and below the grid, the spline is extended linearly.
+
+    A casadi interpolant would hold fixed data and, in casadi 3.4.5, can not be evaluated
+    on SX arguments, as needed for the model; the spline is therefore built symbolically.
+
+    @param n_h number of grid points
+    @return casadi function (zz, heights, values) -> wind component at height zz
+    """
+
+    if n_h in _datafile_splines:
+        return _datafile_splines[n_h]
+
+    zz = cas.SX.sym('zz')
+    heights = cas.SX.sym('heights', n_h)
+    values = cas.SX.sym('values', n_h)
+    delta = [heights[i+1] - heights[i] for i in range(n_h - 1)]
+
+    # second derivatives of a natural spline: tridiagonal system, solved by forward elimination
+    # and back substitution
+    diagonal = [2. * (delta[i-1] + delta[i]) for i in range(1, n_h - 1)]
+    rhs = [6. * ((values[i+1] - values[i]) / delta[i] - (values[i] - values[i-1]) / delta[i-1]) for i in range(1, n_h - 1)]
+    for i in range(1, n_h - 2):
+        factor = delta[i] / diagonal[i-1]
+        diagonal[i] = diagonal[i] - factor * delta[i]
+        rhs[i] = rhs[i] - factor * rhs[i-1]
+    interior = [0.] * (n_h - 2)
+    for i in reversed(range(n_h - 2)):
+        upper_term = delta[i+1] * interior[i+1] if i < n_h - 3 else 0.
+        interior[i] = (rhs[i] - upper_term) / diagonal[i]
+    curvature = [0.] + interior + [0.]
+
+    segments = []
+    for j in range(n_h - 1):
+        t = (zz - heights[j]) / delta[j]
+        segments += [(1. - t) * values[j] + t * values[j+1]
+            + delta[j]**2 / 6. * (((1. - t)**3 - (1. - t)) * curvature[j] + (t**3 - t) * curvature[j+1])]
+
+    slope_lower = (values[1] - values[0]) / delta[0] - delta[0] / 6. * (2. * curvature[0] + curvature[1])
+    slope_upper = (values[-1] - values[-2]) / delta[-1] + delta[-1] / 6. * (curvature[-2] + 2. * curvature[-1])
+    lower = values[0] + slope_lower * (zz - heights[0])
+    upper = values[-1] + slope_upper * (zz - heights[-1])
+
+    # switch between the segments at the grid points
+    u = segments[0]
+    for j in range(1, n_h - 1):
+        u += (zz >= heights[j]) * (segments[j] - segments[j-1])
+    u += (zz < heights[0]) * (lower - segments[0])
+    u += (zz > heights[-1]) * (upper - segments[-1])
+
+    spline_fun = cas.Function('wind_spline', [zz, heights, values], [u])
+    _datafile_splines[n_h] = spline_fun
+
+    return spline_fun
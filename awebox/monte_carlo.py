@@ -0,0 +1,411 @@
+#
+#    This file is part of awebox.
+#
+#    awebox -- A modeling and optimization framework for multi-kite AWE systems.
+#    Copyright (C) 2017-2019 Jochem De Schutter, Rachel Leuthold, Moritz Diehl,
+#                            ALU Freiburg.
+#    Copyright (C) 2018-2019 Thilo Bronnenmeyer, Kiteswarms Ltd.
+#    Copyright (C) 2016      Elena Malz, Sebastien Gros, Chalmers UT.
+#
+#    awebox is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 3 of the License, or (at your option) any later version.
+#
+#    awebox is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with awebox; if not, write to the Free Software Foundation,
+#    Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+###################################
+# Class MonteCarlo evaluates the robustness of an optimal trajectory by closed-loop rollouts
+# for many sampled wind conditions and initial states
+###################################
+
+import awebox.mdl.wind as wind
+import awebox.tools.struct_operations as struct_op
+import awebox.tools.print_operations as print_op
+import casadi.tools as cas
+import numpy as np
+import multiprocessing
+import logging
+import time
+
+class MonteCarlo(object):
+    def __init__(self, options):
+        """Constructor.
+
+        @param options monte carlo options
+        """
+
+        self.__status = 'Monte Carlo simulation not yet built.'
+        self.__options = options
+        self.__timings = {}
+        self.__rollout_maps = {}
+
+    def build(self, trial):
+        """Build the closed-loop rollout of the optimal trajectory and its feedback gains.
+
+        @param trial solved awebox trial
+        """
+
+        logging.info('Building Monte Carlo simulation...')
+
+        if trial.optimization.V_opt is None:
+            raise ValueError('Cannot build Monte Carlo simulation without a solved trial.')
+
+        timer = time.time()
+
+        model = trial.model
+        nlp = trial.nlp
+        V_opt = trial.optimization.V_opt
+        p_fix_num = trial.optimization.p_fix_num
+        self.__wind_options = trial.options['user_options']['wind']
+
+        # the optimal model of trial.generate_optimal_model has numerical model parameters,
+        # so the model dae with symbolic parameters is used, in which the wind parameters can be sampled
+        model_dae = model.get_dae()
+        dae = model_dae.dae
+        self.__dae_p = dae['p']
+        nx = dae['x'].cat.shape[0]
+        nz = dae['z'].cat.shape[0]
+        nu = model.variables_dict['u'].cat.shape[0]
+
+        # the dae time is normalized, so that one integration lasts theta['t_f']
+        integrator = model_dae.build_integrator(self.__options['integrator'], 1.)
+
+        # interval durations of the (possibly non-uniform) time grid
+        tgrid_u = np.array(trial.optimization.time_grids['u']).flatten()
+        tgrid_x = np.array(trial.optimization.time_grids['x']).flatten()
+        self.__time = tgrid_x
+        self.__T = tgrid_x[-1]
+        dt = np.diff(np.append(tgrid_u, tgrid_x[-1]))
+
+        # reference states and dae parameters of the optimal trajectory at the interval nodes
+        Xdot_opt = nlp.Xdot(nlp.Xdot_fun(V_opt))
+        self.__param_ref = model.parameters(cas.vertcat(p_fix_num['theta0'], V_opt['phi']))
+        XZ_ref = []
+        self.__P_ref = []
+        for kdx in range(nlp.n_k):
+            var_at_time = struct_op.get_variables_at_time(nlp.options, V_opt, Xdot_opt, model, kdx)
+            z_ref = [var_at_time['xddot'], var_at_time['xa']]
+            if 'xl' in list(model.variables.keys()):
+                z_ref += [var_at_time['xl']]
+            XZ_ref += [np.array(cas.vertcat(V_opt['xd', kdx], *z_ref)).flatten()]
+
+            theta = model.variables_dict['theta'](0.)
+            for name in list(model.variables_dict['theta'].keys()):
+                if name == 't_f':
+                    theta['t_f'] = dt[kdx] / model.scaling['theta']['t_f']
+                else:
+                    theta[name] = V_opt['theta', name]
+            p_num = self.__dae_p(0.)
+            p_num['u'] = V_opt['u', kdx]
+            p_num['theta'] = theta.cat
+            p_num['param'] = self.__param_ref.cat
+            self.__P_ref += [p_num]
+        self.__xz_ref = XZ_ref[0]
+        self.__X_ref = np.array(XZ_ref).T[:nx, :]
+
+        # time-varying lqr gains around the optimal trajectory
+        u_lb = np.array(trial.optimization.V_bounds['lb']['u', 0]).flatten()
+        u_ub = np.array(trial.optimization.V_bounds['ub']['u', 0]).flatten()
+        if self.__options['feedback']['include']:
+            K = self.__build_feedback_gains(model, integrator, XZ_ref, nx, nu)
+        else:
+            K = np.zeros((nu * nx, nlp.n_k))
+        self.__K = K
+
+        # one control interval: the algebraic variables serve as initial guess for the next interval
+        node_fun = self.__build_node_function(model, dae)
+        xz0 = cas.MX.sym('xz0', nx + nz)
+        p = cas.MX.sym('p', dae['p'].cat.shape[0])
+        x_ref = cas.MX.sym('x_ref', nx)
+        K_vec = cas.MX.sym('K', nu * nx)
+
+        # the controls are the first entry of the dae parameters
+        u = p[:nu] + cas.mtimes(cas.reshape(K_vec, nu, nx), xz0[:nx] - x_ref)
+        u = cas.fmin(cas.fmax(u, u_lb), u_ub)
+        p_cl = cas.vertcat(u, p[nu:])
+
+        res = integrator(x0 = xz0[:nx], z0 = xz0[nx:], p = p_cl)
+        xz_next = cas.vertcat(res['xf'], res['zf'])
+        node_out = cas.vertcat(res['qf'], node_fun(res['xf'], res['zf'], p_cl), u)
+        interval = cas.Function('interval', [xz0, p, x_ref, K_vec], [xz_next, node_out])
+
+        # rollout of one sample
+        self.__rollout = interval.mapaccum('rollout', nlp.n_k)
+        self.__n_k = nlp.n_k
+        self.__nx = nx
+        self.__nu = nu
+        self.__n_q = model.integral_outputs.cat.shape[0]
+
+        # energy is either an integral output or a differential state
+        if 'e' in list(model.integral_outputs.keys()):
+            self.__energy_scaling = model.integral_scaling['e']
+            self.__e_quad_index = model.integral_outputs.f['e'][0]
+            self.__e_index = None
+        else:
+            self.__energy_scaling = model.scaling['xd']['e']
+            self.__e_quad_index = None
+            self.__e_index = model.variables_dict['xd'].f['e'][0]
+
+        self.__timings['construction'] = time.time() - timer
+        self.__status = 'I am a Monte Carlo simulation.'
+
+        logging.info('Monte Carlo simulation built.')
+        logging.info('Monte Carlo construction time: %s', print_op.print_single_timing(self.__timings['construction']))
+        logging.info('')
+
+        return None
+
+    def __build_feedback_gains(self, model, integrator, XZ_ref, nx, nu):
+        """Finite-horizon lqr gains of the control intervals, from the linearization of the
+        integrator around the optimal trajectory (the energy state is not weighted)
+
+        @return matrix with the vectorized gain of every interval as columns
+        """
+
+        x0 = cas.MX.sym('x0', nx)
+        z0 = cas.MX.sym('z0', XZ_ref[0].shape[0] - nx)
+        p = cas.MX.sym('p', self.__dae_p.cat.shape[0])
+        xf = integrator(x0 = x0, z0 = z0, p = p)['xf']
+        linearization = cas.Function('linearization', [x0, z0, p], [cas.jacobian(xf, x0), cas.jacobian(xf, p)[:, :nu]])
+
+        q_weights = self.__options['feedback']['Q'] * np.ones(nx)
+        if 'e' in list(model.variables_dict['xd'].keys()):
+            q_weights[model.variables_dict['xd'].f['e']] = 0.
+        Q = np.diag(q_weights)
+        R = self.__options['feedback']['R'] * np.eye(nu)
+
+        # backward riccati recursion over the horizon of the rollouts
+        n_k = len(XZ_ref)
+        K = np.zeros((nu * nx, n_k))
+        P = Q
+        for kdx in reversed(range(n_k)):
+            [A, B] = linearization(XZ_ref[kdx][:nx], XZ_ref[kdx][nx:], self.__P_ref[kdx].cat)
+            A = A.full()
+            B = B.full()
+            K_k = - np.linalg.solve(R + B.T.dot(P).dot(B), B.T.dot(P).dot(A))
+            P = Q + A.T.dot(P).dot(A + B.dot(K_k))
+            P = 0.5 * (P + P.T)
+            K[:, kdx] = K_k.flatten(order='F')
+
+        return K
+
+    def __build_node_function(self, model, dae):
+        """Function of the maximum tether force and constraint violation for given dae variables
+        """
+
+        variables = model.variables
+        parameters = model.parameters
+
+        outputs = model.outputs(model.outputs_fun(variables, parameters))
+        tether_forces = [outputs['local_performance', name] for name in list(model.outputs_dict['local_performance'].keys())
+                         if name[:12] == 'tether_force']
+        if tether_forces:
+            tether_force_max = cas.mmax(cas.vertcat(*tether_forces))
+        else:
+            tether_force_max = cas.SX(0.)
+
+        constraints = model.constraints(model.constraints_fun(variables, parameters))
+        if 'inequality' in list(constraints.keys()):
+            violation = cas.mmax(cas.fmax(constraints['inequality'], 0.))
+        else:
+            violation = cas.SX(0.)
+
+        node_fun = cas.Function('node_fun', [dae['x'], dae['z'], dae['p']], [cas.vertcat(tether_force_max, violation)])
+
+        return node_fun
+
+    def sample(self, N_samples):
+        """Draw wind parameters and initial state perturbations.
+
+        @param N_samples number of samples
+        @return dict with sampled reference wind speeds, roughness lengths (or time stamps of the
+                wind data set for the datafile wind model) and initial states
+        """
+
+        options = self.__options
+        random = np.random.RandomState(options['seed'])
+
+        samples = {}
+        if self.__wind_options['model'] == 'datafile':
+            profiles = wind.build_datafile_profiles(self.__wind_options['atmosphere_heightsdata'], self.__wind_options['atmosphere_featuresdata'])
+            samples['time_stamp'] = random.randint(profiles['u_x'].shape[1], size=N_samples)
+        else:
+            param = self.__param_ref
+            u_ref = float(param['theta0', 'wind', 'u_ref'])
+            z0_air = float(param['theta0', 'wind', 'log_wind', 'z0_air'])
+            samples['u_ref'] = u_ref * (1. + options['wind']['u_ref_std'] * random.randn(N_samples))
+            samples['z0_air'] = z0_air * np.exp(options['wind']['z0_air_std'] * random.randn(N_samples))
+        samples['xd0'] = self.__xz_ref[:self.__nx, None] + options['xd_std'] * random.randn(self.__nx, N_samples)
+
+        return samples
+
+    def evaluate_rollouts(self, XZ0, P, parallelization = 'serial'):
+        """Evaluate the rollouts of several samples in one mapped call.
+
+        @param XZ0 initial states and algebraic variables, one column per sample
+        @param P dae parameters of all control intervals, n_k columns per sample
+        @param parallelization casadi map parallelization
+        @return states and node outputs at the end of all control intervals, n_k columns per sample
+        """
+
+        N_samples = XZ0.shape[1]
+        if (N_samples, parallelization) not in list(self.__rollout_maps.keys()):
+            # the reference states and gains are shared by all samples
+            self.__rollout_maps[(N_samples, parallelization)] = self.__rollout.map('monte_carlo', parallelization, N_samples, [2, 3], [])
+        [XZ, OUT] = self.__rollout_maps[(N_samples, parallelization)](XZ0, P, self.__X_ref, self.__K)
+
+        return XZ.full(), OUT.full()
+
+    def run(self, N_samples = None):
+        """Run the rollouts of all samples and aggregate their statistics.
+
+        @param N_samples number of samples (default: from options)
+        @return dict with sampled quantities and their statistics
+        """
+
+        if self.__status != 'I am a Monte Carlo simulation.':
+            raise ValueError('Cannot run Monte Carlo simulation without building it.')
+
+        if N_samples is None:
+            N_samples = self.__options['N_samples']
+
+        timer = time.time()
+
+        samples = self.sample(N_samples)
+
+        # initial states and dae parameters of all samples
+        XZ0 = np.tile(self.__xz_ref[:, None], (1, N_samples))
+        XZ0[:self.__nx, :] = samples['xd0']
+
+        P = np.zeros((self.__dae_p.cat.shape[0], self.__n_k * N_samples))
+        for idx in range(N_samples):
+            # copy, so that the nominal parameters are not modified in place
+            param = self.__param_ref(cas.DM(self.__param_ref.cat))
+            if 'time_stamp' in list(samples.keys()):
+                profile = wind.get_datafile_profile(self.__wind_options['atmosphere_heightsdata'], self.__wind_options['atmosphere_featuresdata'], int(samples['time_stamp'][idx]))
+                param['theta0', 'wind', 'datafile', 'heights'] = profile['heights']
+                param['theta0', 'wind', 'datafile', 'u_x'] = profile['u_x']
+                param['theta0', 'wind', 'datafile', 'u_y'] = profile['u_y']
+            else:
+                param['theta0', 'wind', 'u_ref'] = samples['u_ref'][idx]
+                param['theta0', 'wind', 'log_wind', 'z0_air'] = samples['z0_air'][idx]
+            for kdx in range(self.__n_k):
+                p_num = self.__dae_p(cas.DM(self.__P_ref[kdx].cat))
+                p_num['param'] = param.cat
+                P[:, idx * self.__n_k + kdx] = np.array(p_num.cat).flatten()
+
+        # all rollouts in one call, or one call per process on a share of the samples
+        parallelization = self.__options['parallelization']
+        n_processes = min(self.__options['n_processes'], N_samples)
+        if parallelization == 'process' and n_processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning('Monte Carlo rollouts in a process pool require forked processes: evaluating rollouts in serial.')
+            n_processes = 1
+
+        if parallelization == 'process' and n_processes > 1:
+            chunks = np.array_split(np.arange(N_samples), n_processes)
+            args = [(XZ0[:, chunk], P[:, chunk[0] * self.__n_k:(chunk[-1] + 1) * self.__n_k]) for chunk in chunks]
+            pool = multiprocessing.get_context('fork').Pool(n_processes, initializer = initialize_worker, initargs = (self,))
+            chunk_results = pool.map(evaluate_worker_rollouts, args)
+            pool.close()
+            pool.join()
+            XZ = np.hstack([XZ_chunk for [XZ_chunk, OUT_chunk] in chunk_results])
+            OUT = np.hstack([OUT_chunk for [XZ_chunk, OUT_chunk] in chunk_results])
+        elif parallelization == 'process':
+            [XZ, OUT] = self.evaluate_rollouts(XZ0, P)
+        else:
+            [XZ, OUT] = self.evaluate_rollouts(XZ0, P, parallelization)
+
+        # (entry, sample, interval)
+        XZ = np.transpose(XZ.reshape((-1, self.__n_k, N_samples), order='F'), (0, 2, 1))
+        OUT = np.transpose(OUT.reshape((-1, self.__n_k, N_samples), order='F'), (0, 2, 1))
+
+        # differential states at all interval nodes
+        xd = np.zeros((N_samples, self.__nx, self.__n_k + 1))
+        xd[:, :, 0] = samples['xd0'].T
+        xd[:, :, 1:] = np.transpose(XZ[:self.__nx, :, :], (1, 0, 2))
+
+        # node outputs: quadratures of the integral outputs, maximum tether force, constraint violation and applied controls
+        n_q = self.__n_q
+        tether_force_max = np.max(OUT[n_q, :, :], axis=1)
+        violation = np.max(OUT[n_q + 1, :, :], axis=1)
+        if self.__e_index is None:
+            energy = np.sum(OUT[self.__e_quad_index, :, :], axis=1) * self.__energy_scaling
+        else:
+            energy = (xd[:, self.__e_index, -1] - xd[:, self.__e_index, 0]) * self.__energy_scaling
+
+        results = {}
+        results['samples'] = samples
+        results['time'] = self.__time
+        results['xd'] = xd
+        results['u'] = np.transpose(OUT[n_q + 2:, :, :], (1, 0, 2))
+        results['power'] = energy / self.__T
+        results['tether_force_max'] = tether_force_max
+        results['constraint_violation'] = violation
+        results['diverged'] = np.logical_not(np.all(np.isfinite(xd), axis=(1, 2)))
+
+        statistics = {}
+        for name in ['power', 'tether_force_max', 'constraint_violation']:
+            values = results[name][np.logical_not(results['diverged'])]
+            if values.size > 0:
+                statistics[name] = {'mean': np.mean(values), 'std': np.std(values),
+                                    'min': np.min(values), 'max': np.max(values)}
+            else:
+                # all rollouts diverged
+                statistics[name] = {'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+        statistics['diverged'] = np.sum(results['diverged'])
+        results['statistics'] = statistics
+
+        self.__results = results
+        self.__timings['run'] = time.time() - timer
+
+        logging.info('Monte Carlo simulation of %s samples: %s', N_samples, print_op.print_single_timing(self.__timings['run']))
+        logging.info('average power: %s W (std: %s W)', statistics['power']['mean'], statistics['power']['std'])
+        logging.info('maximum tether force: %s N', statistics['tether_force_max']['max'])
+        if statistics['diverged'] > 0:
+            logging.warning(str(statistics['diverged']) + ' of ' + str(N_samples) + ' rollouts diverged.')
+
+        return results
+
+    @property
+    def status(self):
+        return self.__status
+
+    @status.setter
+    def status(self, value):
+        logging.warning('Cannot set status object.')
+
+    @property
+    def results(self):
+        return self.__results
+
+    @results.setter
+    def results(self, value):
+        logging.warning('Cannot set results object.')
+
+    @property
+    def timings(self):
+        return self.__timings
+
+    @timings.setter
+    def timings(self, value):
+        logging.warning('Cannot set timings object.')
+
+# monte carlo simulation of a pool process, handed over by the pool initializer
+worker_monte_carlo = None
+
+def initialize_worker(monte_carlo):
+    global worker_monte_carlo
+    worker_monte_carlo = monte_carlo
+
+def evaluate_worker_rollouts(args):
+    [XZ0, P] = args
+    return worker_monte_carlo.evaluate_rollouts(XZ0, P)
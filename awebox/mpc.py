@@ -0,0 +1,421 @@
+#
+#    This file is part of awebox.
+#
+#    awebox -- A modeling and optimization framework for multi-kite AWE systems.
+#    Copyright (C) 2017-2019 Jochem De Schutter, Rachel Leuthold, Moritz Diehl,
+#                            ALU Freiburg.
+#    Copyright (C) 2018-2019 Thilo Bronnenmeyer, Kiteswarms Ltd.
+#    Copyright (C) 2016      Elena Malz, Sebastien Gros, Chalmers UT.
+#
+#    awebox is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 3 of the License, or (at your option) any later version.
+#
+#    awebox is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with awebox; if not, write to the Free Software Foundation,
+#    Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+###################################
+# Class Mpc runs a receding-horizon tracking controller of the multi-kite system
+# around a solved periodic reference trajectory
+###################################
+
+import awebox.sim as sim
+import awebox.tools.struct_operations as struct_op
+import awebox.tools.integrator_routines as int_rout
+import awebox.tools.print_operations as print_op
+import casadi.tools as cas
+import numpy as np
+import logging
+import time
+
+class Mpc(object):
+    def __init__(self, options):
+        """Constructor.
+
+        @param options mpc options
+        """
+
+        self.__status = 'Mpc not yet built.'
+        self.__options = options
+        self.__N = options['N']
+        self.__timings = {}
+
+    def build(self, trial):
+        """Build the tracking NLP, the solver and the plant simulation once.
+
+        @param trial solved awebox trial, which provides the periodic reference
+        """
+
+        logging.info('Building MPC controller...')
+
+        if trial.optimization.V_opt is None:
+            raise ValueError('Cannot build MPC controller without a solved reference trajectory.')
+
+        timer = time.time()
+
+        self.__extract_reference(trial)
+        self.__build_prediction_model(trial)
+        self.__build_solver(trial)
+        self.__build_plant(trial)
+
+        self.__timings['construction'] = time.time() - timer
+        self.__status = 'I am an mpc controller.'
+
+        logging.info('MPC controller built.')
+        logging.info('MPC construction time: %s', print_op.print_single_timing(self.__timings['construction']))
+        logging.info('')
+
+        return None
+
+    def __extract_reference(self, trial):
+        """Extract the (scaled) reference trajectory of the trial on its discretization grid
+        """
+
+        nlp = trial.nlp
+        V_opt = trial.optimization.V_opt
+        Xdot_opt = nlp.Xdot(nlp.Xdot_fun(V_opt))
+
+        time_grids = trial.optimization.time_grids
+        self.__tgrid_u = np.array(time_grids['u']).flatten()
+
+        if self.__options['ts'] is None:
+            self.__ts = self.__tgrid_u[1] - self.__tgrid_u[0]
+        else:
+            self.__ts = self.__options['ts']
+
+        # differential states on the finest available grid for interpolation
+        direct_collocation = (nlp.options['discretization'] == 'direct_collocation')
+        if direct_collocation:
+            self.__tgrid_x = np.array(time_grids['x_coll']).flatten()
+        else:
+            self.__tgrid_x = np.array(time_grids['x']).flatten()
+        self.__T = self.__tgrid_x[-1]
+
+        x_ref = []
+        u_ref = []
+        z_ref = []
+        for kdx in range(nlp.n_k):
+            var_at_time = struct_op.get_variables_at_time(nlp.options, V_opt, Xdot_opt, trial.model, kdx)
+            x_ref += [var_at_time['xd']]
+            if direct_collocation:
+                x_ref += [V_opt['coll_var', kdx, ddx, 'xd'] for ddx in range(nlp.d)]
+            u_ref += [var_at_time['u']]
+            z_at_time = [var_at_time['xddot'], var_at_time['xa']]
+            if 'xl' in list(trial.model.variables.keys()):
+                z_at_time += [var_at_time['xl']]
+            z_ref += [cas.vertcat(*z_at_time)]
+        x_ref += [V_opt['xd', -1]]
+
+        self.__x_ref = np.array(cas.horzcat(*x_ref))
+        self.__u_ref = np.array(cas.horzcat(*u_ref))
+        self.__z_ref = np.array(cas.horzcat(*z_ref))
+
+        return None
+
+    def get_reference(self, t):
+        """Periodic reference at the times t.
+
+        @param t array of time points
+        @return differential states (linear interpolation), controls and algebraic variables (piecewise constant)
+        """
+
+        tau = np.mod(np.array(t, dtype=float).flatten(), self.__T)
+
+        x_ref = np.array([np.interp(tau, self.__tgrid_x, self.__x_ref[idx, :]) for idx in range(self.__x_ref.shape[0])])
+
+        # controls are piecewise constant, round-off at the interval boundaries is neglected
+        tol = 1e-8 * self.__T
+        kdx = np.clip(np.searchsorted(self.__tgrid_u, tau + tol, side='right') - 1, 0, self.__tgrid_u.shape[0] - 1)
+        u_ref = self.__u_ref[:, kdx]
+        z_ref = self.__z_ref[:, kdx]
+
+        return x_ref, u_ref, z_ref
+
+    def __build_prediction_model(self, trial):
+        """Build the integrator of one sampling time from the dae of the optimal model
+        """
+
+        optimal_model = trial.generate_optimal_model()
+        self.__optimal_model = optimal_model
+
+        # the dae time is normalized with the period of the reference trajectory
+        opts = {'tf': self.__ts / optimal_model['t_f']}
+        opts['number_of_finite_elements'] = self.__options['integrator']['num_steps']
+
+        self.__F = int_rout.rk4root('F', optimal_model['dae'], optimal_model['rootfinder'], opts)
+        self.__nx = self.__F.size1_in('x0')
+        self.__nu = self.__F.size1_in('p')
+        self.__nz = self.__F.size1_in('z0')
+
+        return None
+
+    def __build_solver(self, trial):
+        """Build the shorter-horizon tracking NLP and its solver once
+        """
+
+        N = self.__N
+        nx = self.__nx
+        nu = self.__nu
+        nz = self.__nz
+        optimal_model = self.__optimal_model
+
+        # decision variables
+        X = cas.MX.sym('X', nx, N+1)
+        U = cas.MX.sym('U', nu, N)
+
+        # parameters: current state and reference over the horizon
+        x0 = cas.MX.sym('x0', nx)
+        X_ref = cas.MX.sym('X_ref', nx, N+1)
+        U_ref = cas.MX.sym('U_ref', nu, N)
+        Z_ref = cas.MX.sym('Z_ref', nz, N)
+
+        # simulate all intervals at once
+        F_map = self.__F.map('F_map', 'serial', N, [], [])
+        X_f = F_map(x0 = X[:, :-1], z0 = Z_ref, p = U)['xf']
+
+        # model constraints on every shooting node, with the algebraic variables consistent with the node
+        G_map = optimal_model['rootfinder'].map('G_map', 'serial', N, [], [])
+        Z = G_map(Z_ref, X[:, :-1], U)
+        constraints_map = optimal_model['constraints'].map('constraints_map', 'serial', N, [], [])
+        model_constraints = constraints_map(X[:, :-1], U, Z)
+
+        g = cas.vertcat(X[:, 0] - x0, cas.vec(X[:, 1:] - X_f), cas.vec(model_constraints))
+        f = self.__options['Q'] * cas.sumsqr(X - X_ref) + self.__options['R'] * cas.sumsqr(U - U_ref)
+
+        w = cas.vertcat(cas.vec(X), cas.vec(U))
+        p = cas.vertcat(x0, cas.vec(X_ref), cas.vec(U_ref), cas.vec(Z_ref))
+
+        # model equalities are zero, model inequalities non-positive
+        constraints_lb = trial.model.constraints(0.)
+        constraints_ub = trial.model.constraints(0.)
+        if 'inequality' in list(constraints_lb.keys()):
+            constraints_lb['inequality'] = -np.inf
+        self.__lbg = np.concatenate([np.zeros(nx * (N+1)), np.tile(np.array(constraints_lb.cat).flatten(), N)])
+        self.__ubg = np.concatenate([np.zeros(nx * (N+1)), np.tile(np.array(constraints_ub.cat).flatten(), N)])
+
+        # differential states within the model bounds (except for the fixed initial state), controls within the control bounds
+        xd_lb = trial.model.variables_dict['xd'](-np.inf)
+        xd_ub = trial.model.variables_dict['xd'](np.inf)
+        for name in list(trial.model.variables_dict['xd'].keys()):
+            xd_lb[name] = trial.model.variable_bounds['xd'][name]['lb']
+            xd_ub[name] = trial.model.variable_bounds['xd'][name]['ub']
+        u_lb = np.array(trial.optimization.V_bounds['lb']['u', 0]).flatten()
+        u_ub = np.array(trial.optimization.V_bounds['ub']['u', 0]).flatten()
+        self.__lbw = np.concatenate([-np.inf * np.ones(nx), np.tile(np.array(xd_lb.cat).flatten(), N), np.tile(u_lb, N)])
+        self.__ubw = np.concatenate([np.inf * np.ones(nx), np.tile(np.array(xd_ub.cat).flatten(), N), np.tile(u_ub, N)])
+
+        if self.__options['scheme'] == 'rti':
+
+            # the gauss-newton hessian of the least-squares tracking cost is constant
+            self.__H = cas.diag(cas.vertcat(2. * self.__options['Q'] * cas.DM.ones(nx * (N+1)), 2. * self.__options['R'] * cas.DM.ones(nu * N)))
+            J = cas.jacobian(g, w)
+            self.__linearization = cas.Function('mpc_linearization', [w, p], [g, J, cas.gradient(f, w)])
+
+            opts = {}
+            opts['printLevel'] = 'none'
+            opts['sparse'] = True
+            self.__solver = cas.conic('mpc_solver', 'qpoases', {'h': self.__H.sparsity(), 'a': J.sparsity()}, opts)
+
+        elif self.__options['scheme'] == 'ipopt':
+
+            opts = {}
+            opts['ipopt.max_iter'] = self.__options['max_iter']
+            opts['ipopt.linear_solver'] = self.__options['linear_solver']
+            opts['ipopt.warm_start_init_point'] = 'yes'
+            opts['ipopt.print_level'] = 0
+            opts['print_time'] = 0
+
+            self.__solver = cas.nlpsol('mpc_solver', 'ipopt', {'x': w, 'p': p, 'f': f, 'g': g}, opts)
+
+        else:
+            raise ValueError('MPC scheme ' + self.__options['scheme'] + ' is not supported.')
+
+        self.__g_shape = g.shape
+
+        return None
+
+    def __solve_rti(self, w0, p):
+        """One sqp iteration around the shifted initial guess: the tracking nlp is linearized once and the
+        resulting qp with gauss-newton hessian is solved for the full step.
+
+        @param w0 shifted initial guess of the decision variables
+        @param p parameters of the tracking nlp
+        @return solution dict of the decision variables and multipliers
+        """
+
+        [g0, J, grad_f] = self.__linearization(w0, p)
+
+        qp_solution = self.__solver(h = self.__H, g = grad_f, a = J,
+            lba = self.__lbg - g0, uba = self.__ubg - g0,
+            lbx = self.__lbw - w0, ubx = self.__ubw - w0)
+
+        solution = {}
+        solution['x'] = w0 + qp_solution['x']
+        solution['lam_x'] = qp_solution['lam_x']
+        solution['lam_g'] = qp_solution['lam_a']
+
+        return solution
+
+    def __build_plant(self, trial):
+        """Build the simulation of the plant and its (numerical) parameters
+        """
+
+        model = trial.model
+        V_opt = trial.optimization.V_opt
+        p_fix_num = trial.optimization.p_fix_num
+
+        self.__plant = sim.Simulation(trial.options['simulation'])
+        self.__plant.build_integrator(trial.options['simulation'], model)
+
+        # one plant interval lasts one sampling time
+        theta = model.variables_dict['theta'](0.)
+        for name in list(model.variables_dict['theta'].keys()):
+            if name == 't_f':
+                theta['t_f'] = self.__ts / model.scaling['theta']['t_f']
+            else:
+                theta[name] = V_opt['theta', name]
+
+        self.__plant_theta = theta
+        self.__plant_phi = model.parameters(cas.vertcat(p_fix_num['theta0'], V_opt['phi']))
+
+        return None
+
+    def run(self, N_steps, x0 = None, t0 = 0.):
+        """Run the closed-loop simulation of the controller and the plant.
+
+        @param N_steps number of sampling times
+        @param x0 initial (scaled) differential states of the plant (default: reference at t0)
+        @param t0 initial time on the reference trajectory
+        @return dict with closed-loop states, controls and per-step computation times
+        """
+
+        if self.__status != 'I am an mpc controller.':
+            raise ValueError('Cannot run MPC controller without building it.')
+
+        N = self.__N
+        nx = self.__nx
+        nu = self.__nu
+        ts = self.__ts
+
+        if x0 is None:
+            x0 = self.get_reference(t0)[0][:, 0]
+        x_plant = np.array(x0, dtype=float).flatten()
+        z_plant = None
+
+        # initialize the first horizon with the reference
+        t_horizon = t0 + ts * np.arange(N+1)
+        [x_ref, u_ref, z_ref] = self.get_reference(t_horizon)
+        w0 = np.concatenate([x_ref.flatten(order='F'), u_ref[:, :-1].flatten(order='F')])
+        lam_x0 = np.zeros(w0.shape)
+        lam_g0 = np.zeros(self.__g_shape[0])
+
+        # closed-loop records
+        x_cl = np.zeros((nx, N_steps+1))
+        u_cl = np.zeros((nu, N_steps))
+        t_comp = np.zeros(N_steps)
+        return_status = []
+        tracking_error = np.zeros(N_steps+1)
+
+        x_cl[:, 0] = x_plant
+        tracking_error[0] = np.linalg.norm(x_plant - x_ref[:, 0])
+
+        for idx in range(N_steps):
+
+            t_horizon = t0 + ts * (idx + np.arange(N+1))
+            [x_ref, u_ref, z_ref] = self.get_reference(t_horizon)
+            p = np.concatenate([x_plant, x_ref.flatten(order='F'), u_ref[:, :-1].flatten(order='F'), z_ref[:, :-1].flatten(order='F')])
+
+            # solve with warmstart
+            timer = time.time()
+            if self.__options['scheme'] == 'rti':
+                solution = self.__solve_rti(w0, p)
+            else:
+                solution = self.__solver(x0 = w0, p = p, lbx = self.__lbw, ubx = self.__ubw, lbg = self.__lbg, ubg = self.__ubg, lam_x0 = lam_x0, lam_g0 = lam_g0)
+            t_comp[idx] = time.time() - timer
+            return_status += [self.__solver.stats()['return_status']]
+
+            w_opt = np.array(solution['x']).flatten()
+            X_opt = w_opt[:nx*(N+1)].reshape((nx, N+1), order='F')
+            U_opt = w_opt[nx*(N+1):].reshape((nu, N), order='F')
+
+            # apply first control to the plant
+            u_cl[:, idx] = U_opt[:, 0]
+            [x_next, z_plant] = self.__plant.step(x_plant, U_opt[:, 0], self.__plant_theta, self.__plant_phi, z_plant)
+            x_plant = np.array(x_next).flatten()
+
+            x_cl[:, idx+1] = x_plant
+            tracking_error[idx+1] = np.linalg.norm(x_plant - self.get_reference(t_horizon[1])[0][:, 0])
+
+            # shifted warmstart for next sampling time, the new last interval is initialized with the reference
+            [x_ref_next, u_ref_next, _] = self.get_reference(t_horizon[-1] + ts * np.arange(2))
+            X_shift = np.hstack([X_opt[:, 1:], x_ref_next[:, -1:]])
+            U_shift = np.hstack([U_opt[:, 1:], u_ref_next[:, :1]])
+            w0 = np.concatenate([X_shift.flatten(order='F'), U_shift.flatten(order='F')])
+            lam_x0 = np.array(solution['lam_x']).flatten()
+            lam_g0 = np.array(solution['lam_g']).flatten()
+
+        results = {}
+        results['time'] = t0 + ts * np.arange(N_steps+1)
+        results['xd'] = x_cl
+        results['u'] = u_cl
+        results['t_comp'] = t_comp
+        results['return_status'] = return_status
+        results['tracking_error'] = tracking_error
+
+        self.__results = results
+
+        logging.info('MPC closed-loop simulation of %s steps with sampling time %s', N_steps, print_op.print_single_timing(ts))
+        logging.info('average computation time per step: %s', print_op.print_single_timing(np.mean(t_comp)))
+        logging.info('maximum computation time per step: %s', print_op.print_single_timing(np.max(t_comp)))
+        if np.max(t_comp) > ts:
+            logging.warning('Computation time exceeds the sampling time in ' + str(np.sum(t_comp > ts)) + ' of ' + str(N_steps) + ' steps.')
+
+        return results
+
+    @property
+    def status(self):
+        return self.__status
+
+    @status.setter
+    def status(self, value):
+        logging.warning('Cannot set status object.')
+
+    @property
+    def ts(self):
+        return self.__ts
+
+    @ts.setter
+    def ts(self, value):
+        logging.warning('Cannot set ts object.')
+
+    @property
+    def solver(self):
+        return self.__solver
+
+    @solver.setter
+    def solver(self, value):
+        logging.warning('Cannot set solver object.')
+
+    @property
+    def results(self):
+        return self.__results
+
+    @results.setter
+    def results(self, value):
+        logging.warning('Cannot set results object.')
+
+    @property
+    def timings(self):
+        return self.__timings
+
+    @timings.setter
+    def timings(self, value):
+        logging.warning('Cannot set timings object.')
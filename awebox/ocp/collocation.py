@@ -170,7 +170,7 @@ class Collocation(object):
         Vdot = struct_op.construct_Xdot_struct(nlp_numerics_options, model)
 
         # size of the finite elements
-        h = 1. / self.__n_k
+        fractions = struct_op.get_interval_fractions(nlp_numerics_options)
 
         store_derivatives = []
 
@@ -178,6 +178,7 @@ class Collocation(object):
         for k in range(self.__n_k):
 
             tf = struct_op.calculate_tf(nlp_numerics_options, V, k)
+            h = fractions[k]
 
             # For all collocation points
             for j in range(self.__d+1):
@@ -221,7 +222,7 @@ class Collocation(object):
 
         return coll_var
 
-    def __integrate_integral_outputs(self, Integral_outputs_list, integral_outputs_deriv, model, tf):
+    def __integrate_integral_outputs(self, Integral_outputs_list, integral_outputs_deriv, model, h, tf):
 
         # number of integral outputs
         ni = model.integral_outputs.cat.shape[0]
@@ -246,7 +247,7 @@ class Collocation(object):
                     derivatives.append(derivative_list[i][name])
 
                 # compute state values at collocation nodes
-                integral_output[name] = tf/self.__n_k*cas.mtimes(self.__Lambda.T, cas.vertcat(*derivatives))
+                integral_output[name] = h*tf*cas.mtimes(self.__Lambda.T, cas.vertcat(*derivatives))
 
                 # compute state value at end of collocation interval
                 integral_output_continuity = 0.0
@@ -290,46 +291,51 @@ class Collocation(object):
 
         return [g_list, g_bounds]
 
-    def __integrate_integral_constraints(self, integral_constraints, kdx, t_f):
+    def __integrate_integral_constraints(self, integral_constraints, kdx, h, t_f):
 
         integral_over_interval = {}
         for cstr_type in list(integral_constraints.keys()):
             integral_over_interval[cstr_type] = 0.
             for ddx in range(self.__d):
                 integral_over_interval[cstr_type] += self.__quad_weights[ddx]*integral_constraints[cstr_type][:,kdx*self.__d+ddx]
-            integral_over_interval[cstr_type] *= t_f/self.__n_k
+            integral_over_interval[cstr_type] *= h*t_f
 
         return integral_over_interval
 
-    def collocate_constraints(self, options, model, formulation, V, P, Xdot):
-        """ Generate collocation and path constraints on all nodes, provide integral outputs and
-            integral constraints on all nodes
+    def get_collocation_node_variables(self, options, V, P, Xdot, model):
+        """ Construct the model variables and parameters on all collocation nodes
         """
-        # extract discretization information
         N_coll = self.__n_k*self.__d # collocation points
 
-        # extract model information
-        variables = model.variables
-        parameters = model.parameters
-
-        # construct list of all collocation node variables and parameters
         coll_vars = []
         for kdx in range(self.__n_k):
             for ddx in range(self.__d):
                 var_at_time = struct_op.get_variables_at_time(options, V, Xdot, model, kdx, ddx)
                 coll_vars = cas.horzcat(coll_vars, var_at_time)
 
-        coll_params = cas.repmat(parameters(cas.vertcat(P['theta0'], V['phi'])), 1, N_coll)
+        coll_params = cas.repmat(model.parameters(cas.vertcat(P['theta0'], V['phi'])), 1, N_coll)
+
+        return coll_vars, coll_params
+
+    def collocate_constraints(self, options, model, formulation, V, P, Xdot):
+        """ Generate collocation and path constraints on all nodes, provide integral outputs and
+            integral constraints on all nodes
+        """
+        # extract discretization information
+        N_coll = self.__n_k*self.__d # collocation points
+
+        # construct list of all collocation node variables and parameters
+        [coll_vars, coll_params] = self.get_collocation_node_variables(options, V, P, Xdot, model)
 
         # evaluate dynamics and constraint functions on all intervals
         if options['parallelization']['include']:
 
             # use function map for parallellization
             parallellization = options['parallelization']['type']
-            dynamics = model.dynamics.map('dynamics_map', parallellization, N_coll, [], [])
-            path_constraints_fun = model.constraints_fun.map('constraints_map', parallellization, N_coll, [], [])
-            integral_outputs_fun = model.integral_outputs_fun.map('integral_outputs_map', parallellization, N_coll, [], [])
-            outputs_fun = model.outputs_fun.map('outputs_fun', parallellization, N_coll, [], [])
+            dynamics = model.nlp_functions['dynamics'].map('dynamics_map', parallellization, N_coll, [], [])
+            path_constraints_fun = model.nlp_functions['constraints_fun'].map('constraints_map', parallellization, N_coll, [], [])
+            integral_outputs_fun = model.nlp_functions['integral_outputs_fun'].map('integral_outputs_map', parallellization, N_coll, [], [])
+            outputs_fun = model.nlp_functions['outputs_fun'].map('outputs_fun', parallellization, N_coll, [], [])
 
             # extract formulation information
             constraints_fun_ineq = formulation.constraints_fun['integral']['inequality'].map('integral_constraints_map_ineq', 'serial', N_coll, [], [])
@@ -357,10 +363,10 @@ class Collocation(object):
 
             # evaluate functions in for loop
             for i in range(N_coll):
-                coll_dynamics = cas.horzcat(coll_dynamics, model.dynamics(coll_vars[:,i],coll_params[:,i]))
-                coll_constraints = cas.horzcat(coll_constraints, model.constraints_fun(coll_vars[:,i],coll_params[:,i]))
-                coll_outputs = cas.horzcat(coll_outputs, model.outputs_fun(coll_vars[:,i],coll_params[:,i]))
-                integral_outputs_deriv = cas.horzcat(integral_outputs_deriv, model.integral_outputs_fun(coll_vars[:,i],coll_params[:,i]))
+                coll_dynamics = cas.horzcat(coll_dynamics, model.nlp_functions['dynamics'](coll_vars[:,i],coll_params[:,i]))
+                coll_constraints = cas.horzcat(coll_constraints, model.nlp_functions['constraints_fun'](coll_vars[:,i],coll_params[:,i]))
+                coll_outputs = cas.horzcat(coll_outputs, model.nlp_functions['outputs_fun'](coll_vars[:,i],coll_params[:,i]))
+                integral_outputs_deriv = cas.horzcat(integral_outputs_deriv, model.nlp_functions['integral_outputs_fun'](coll_vars[:,i],coll_params[:,i]))
                 integral_constraints['inequality'] = cas.horzcat(integral_constraints['inequality'], formulation.constraints_fun['integral']['inequality'](coll_vars[:,i],coll_params[:,i]))
                 integral_constraints['equality'] = cas.horzcat(integral_constraints['equality'], formulation.constraints_fun['integral']['equality'](coll_vars[:,i],coll_params[:,i]))
 
@@ -368,10 +374,11 @@ class Collocation(object):
         # integrate integral outputs
         Integral_outputs_list = [np.zeros(model.integral_outputs.cat.shape[0])]
         Integral_constraints_list = []
+        fractions = struct_op.get_interval_fractions(options)
         for kdx in range(self.__n_k):
             tf = struct_op.calculate_tf(options, V, kdx)
-            Integral_outputs_list = self.__integrate_integral_outputs(Integral_outputs_list, integral_outputs_deriv[:,kdx*self.__d:(kdx+1)*self.__d], model, tf)
-            Integral_constraints_list += [self.__integrate_integral_constraints(integral_constraints, kdx, tf)]
+            Integral_outputs_list = self.__integrate_integral_outputs(Integral_outputs_list, integral_outputs_deriv[:,kdx*self.__d:(kdx+1)*self.__d], model, fractions[kdx], tf)
+            Integral_constraints_list += [self.__integrate_integral_constraints(integral_constraints, kdx, fractions[kdx], tf)]
 
         return coll_dynamics, coll_constraints, coll_outputs, Integral_outputs_list, Integral_constraints_list
 
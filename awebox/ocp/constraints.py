@@ -127,7 +127,7 @@ def make_constraints_entry_list(nlp_numerics_options, constraints, model):
 def make_stage_constraint_struct(model):
 
     # make entry list to check if not empty
-    entry_list = [cas.entry('collocation', shape =model.dynamics(model.variables, model.parameters).size())]
+    entry_list = [cas.entry('collocation', shape =model.dynamics.size_out(0))]
     if list(model.constraints.keys()):  # check if not empty
         entry_list.append(cas.entry('path_constraints', struct = model.constraints))
 
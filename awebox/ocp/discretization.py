@@ -134,36 +134,31 @@ def construct_time_grids(nlp_numerics_options):
     else:
         tfsym = cas.SX.sym('tfsym',1)
 
+    # fraction of the phase time constant covered by each interval
+    fractions = struct_op.get_interval_fractions(nlp_numerics_options)
+
     # initialize
-    tx = []
+    tx = cas.SX(0.)
     tu = []
 
-    for k in range(nk+1):
+    for k in range(nk):
 
         # extract correct time constant in case of phase fix
-        if nlp_numerics_options['phase_fix']:
-            if k < nk_reelout:
-                tf = tfsym[0]
-                k0 = 0.0
-                kcount = k
-            else:
-                tf = tfsym[1]
-                k0 = nk_reelout * tfsym[0]/ tf
-                kcount = k - nk_reelout
+        if nlp_numerics_options['phase_fix'] and k >= nk_reelout:
+            tf = tfsym[1]
+        elif nlp_numerics_options['phase_fix']:
+            tf = tfsym[0]
         else:
-            k0 = 0.0
-            kcount = k
             tf = tfsym
 
         # add interval timings
-        tx = cas.vertcat(tx, (k0 + kcount) * tf / float(nk))
-        if k < nk:
-            tu = cas.vertcat(tu, (k0 + kcount) * tf / float(nk))
+        tu = cas.vertcat(tu, tx[-1])
+        tx = cas.vertcat(tx, tx[-1] + fractions[k] * tf)
 
         # add collocation timings
-        if direct_collocation and (k < nk):
+        if direct_collocation:
             for j in range(d):
-                tcoll = cas.vertcat(tcoll,(k0 + kcount + tau_root[j]) * tf / float(nk))
+                tcoll = cas.vertcat(tcoll, tu[-1] + tau_root[j] * fractions[k] * tf)
 
     if direct_collocation:
         # reshape tcoll
@@ -290,6 +285,46 @@ def setup_output_structure(nlp_numerics_options, model_outputs, form_outputs):
 
     return Outputs
 
+def setup_output_group(nlp_numerics_options, model, V, P, Xdot, Collocation, Multiple_shooting, group):
+    """ Structure and function of a single output group, so that consumers that only read a few
+    channels do not have to evaluate the full Outputs_fun. The group is either one of the model
+    output types or 'final' for the performance outputs.
+    """
+
+    nk = nlp_numerics_options['n_k']
+
+    if group == 'final':
+        [form_outputs, form_outputs_dict] = performance.collect_performance_outputs(nlp_numerics_options, model, V)
+        Group_struct = cas.struct_symSX([cas.entry('final', struct=form_outputs)])
+        group_outputs = form_outputs.cat
+
+    else:
+        group_model_outputs = cas.struct_symMX([cas.entry(group, struct=model.outputs_dict[group])])
+        group_fun = model.get_outputs_group_fun(group)
+
+        if nlp_numerics_options['parallelization']['include']:
+            parallellization = nlp_numerics_options['parallelization']['type']
+        else:
+            parallellization = 'serial'
+
+        if nlp_numerics_options['discretization'] == 'direct_collocation':
+            d = nlp_numerics_options['collocation']['d']
+            Group_struct = cas.struct_symSX([cas.entry('coll_outputs', repeat = [nk,d], struct = group_model_outputs)])
+            [node_vars, node_params] = Collocation.get_collocation_node_variables(nlp_numerics_options, V, P, Xdot, model)
+            N = nk*d
+
+        elif nlp_numerics_options['discretization'] == 'multiple_shooting':
+            Group_struct = cas.struct_symSX([cas.entry('outputs', repeat = [nk], struct = group_model_outputs)])
+            [node_vars, node_params] = Multiple_shooting.get_ms_node_variables()
+            N = nk
+
+        group_fun_map = group_fun.map('outputs_' + group + '_map', parallellization, N, [], [])
+        group_outputs = cas.vec(group_fun_map(node_vars, node_params))
+
+    Group_fun = cas.Function('Outputs_' + group + '_fun', [V, P], [group_outputs])
+
+    return Group_struct, Group_fun
+
 def discretize(nlp_numerics_options, model, formulation):
 
     # -----------------------------------------------------------------------------
@@ -225,7 +225,8 @@ class Formulation(object):
 
         periodic_constraints, periodic_constraints_fun = operation.generate_periodic_constraints(options,
                             variables,
-                            ref_variables)
+                            ref_variables,
+                            model)
 
         integral_constraints, integral_constraint_fun, integral_constants = operation.generate_integral_constraints(options, variables, parameters, model)
 
@@ -76,8 +76,8 @@ class Multiple_shooting(object):
             # use function map for parallellization
             parallellization = options['parallelization']['type']
             F_map = self.__F.map('F_map', parallellization, self.__n_k, [], [])
-            path_constraints_fun = model.constraints_fun.map('constraints_map', parallellization, self.__n_k, [], [])
-            outputs_fun = model.outputs_fun.map('outputs_fun', parallellization, self.__n_k, [], [])
+            path_constraints_fun = model.nlp_functions['constraints_fun'].map('constraints_map', parallellization, self.__n_k, [], [])
+            outputs_fun = model.nlp_functions['outputs_fun'].map('outputs_fun', parallellization, self.__n_k, [], [])
 
             # integrate
             ms_dynamics = F_map(x0= self.__ms_x, z0 = self.__ms_z, p = self.__ms_p)
@@ -115,8 +115,8 @@ class Multiple_shooting(object):
                 ms_dynamics = self.__F(x0 = self.__ms_x[:,i], z0 = self.__ms_z[:,i], p = self.__ms_p[:,i])
                 ms_xf = cas.horzcat(ms_xf, ms_dynamics['xf'])
                 ms_qf = cas.horzcat(ms_qf, ms_qf[:,-1]+ms_dynamics['qf'])
-                ms_constraints = cas.horzcat(ms_constraints, model.constraints_fun(self.__ms_vars[:,i],self.__ms_params[:,i]))
-                ms_outputs = cas.horzcat(ms_outputs, model.outputs_fun(self.__ms_vars[:,i],self.__ms_params[:,i]))
+                ms_constraints = cas.horzcat(ms_constraints, model.nlp_functions['constraints_fun'](self.__ms_vars[:,i],self.__ms_params[:,i]))
+                ms_outputs = cas.horzcat(ms_outputs, model.nlp_functions['outputs_fun'](self.__ms_vars[:,i],self.__ms_params[:,i]))
                 # integral_constraints['inequality'] = cas.horzcat(integral_constraints['inequality'], formulation.constraints_fun['integral']['inequality'](coll_vars[:,i],coll_params[:,i]))
                 # integral_constraints['equality'] = cas.horzcat(integral_constraints['equality'], formulation.constraints_fun['integral']['equality'](coll_vars[:,i],coll_params[:,i]))
 
@@ -182,6 +182,10 @@ class Multiple_shooting(object):
             # compute implicit vars in parallel fashion
             z_implicit = G_map(z_root, x_root, p_root)
 
+        # the integrator covers 1/n_k of the time constant: rescale it to the interval fractions
+        fractions = struct_op.get_interval_fractions(options)
+        t_f_index = np.array(model.variables_dict['theta'].f['t_f'])
+
         # construct list of all interval variables
         ms_vars = []
         ms_x = []
@@ -193,6 +197,9 @@ class Multiple_shooting(object):
             var_at_time = self.__set_implicit_variables(options, ms_vars0[kdx], param_at_time, self.__dae.z(z_implicit[:,kdx]))
             # update dae vars at time
             x, z, p = self.__dae.fill_in_dae_variables(var_at_time, param_at_time)
+            theta_scaling = np.ones(var_at_time['theta'].shape[0])
+            theta_scaling[t_f_index] = fractions[kdx] * self.__n_k
+            p = cas.vertcat(var_at_time['u'], cas.DM(theta_scaling) * var_at_time['theta'], param_at_time.cat)
 
             # store result
             ms_vars = cas.horzcat(ms_vars, var_at_time)
@@ -242,6 +249,12 @@ class Multiple_shooting(object):
 
         return variables
 
+    def get_ms_node_variables(self):
+        """Model variables and parameters on all interval nodes (available after discretization)
+        """
+
+        return self.__ms_vars, self.__ms_params
+
     def __build_integral_outputs(self, ms_qf, integral_outputs):
         """Build integral outputs list based on integrator quadrature outputs
 
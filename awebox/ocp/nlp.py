@@ -28,6 +28,7 @@ _python-3.5 / casadi-3.4.5
 - authors: rachel leuthold, jochem de schutter, thilo bronnenmeyer alu-fr 2017-2018
 '''
 import awebox.tools.print_operations as print_op
+import awebox.tools.graph_operations as graph_op
 
 from . import discretization
 
@@ -44,6 +45,7 @@ class NLP(object):
     def __init__(self):
         self.__status = 'NLP not yet built.'
         self.__Outputs = None
+        self.__Output_groups = {}
         self.__timings = {}
 
     def build(self, nlp_options, model, formulation):
@@ -61,6 +63,7 @@ class NLP(object):
             self.__generate_discretization(nlp_options, model,formulation)
             self.__generate_variable_bounds(nlp_options, model)
             self.__generate_objective(nlp_options, model)
+            self.__simplify_functions(nlp_options)
 
             self.__status = 'I am an NLP.'
 
@@ -113,6 +116,7 @@ class NLP(object):
         self.__time_grids = time_grids
         self.__Collocation = Collocation
         self.__Multiple_shooting = Multiple_shooting
+        self.__model = model
 
         return None
 
@@ -125,6 +129,16 @@ class NLP(object):
 
         return None
 
+    def update_variable_bounds(self, model):
+        """Re-generate the variable bounds of the built nlp from the current model variable bounds.
+
+        @param model awebox model
+        """
+
+        self.__generate_variable_bounds(self.__options, model)
+
+        return None
+
     def __generate_objective(self, nlp_options, model):
 
         logging.info('generate objective... ')
@@ -142,6 +156,36 @@ class NLP(object):
 
         return None
 
+    def __simplify_functions(self, nlp_options):
+        """Expand (where faster) and eliminate common subexpressions of the constraint and objective functions,
+        and report their size before and after.
+        """
+
+        self.__function_statistics = {}
+
+        if nlp_options['simplification']['include']:
+            logging.info('simplify nlp functions...')
+
+            functions = {'g_fun': self.__g_fun, 'f_fun': self.__f_fun}
+            functions, self.__function_statistics = graph_op.simplify_functions(functions, n_eval = nlp_options['simplification']['n_eval'])
+
+            self.__g_fun = functions['g_fun']
+            self.__f_fun = functions['f_fun']
+
+        return None
+
+    def get_output_group(self, group):
+        """Structure and function of a single output group (e.g. 'performance', 'tether_length' or 'final'),
+        which are only generated when first requested.
+        """
+
+        if group not in list(self.__Output_groups.keys()):
+            self.__Output_groups[group] = discretization.setup_output_group(self.__options, self.__model,
+                                                                            self.__V, self.__P, self.__Xdot(self.__Xdot_fun(self.__V)),
+                                                                            self.__Collocation, self.__Multiple_shooting, group)
+
+        return self.__Output_groups[group]
+
     def get_nlp(self):
 
         # construct constraints
@@ -153,6 +197,15 @@ class NLP(object):
 
         return nlp
 
+    @property
+    def function_statistics(self):
+        """graph size and evaluation time of the nlp functions before and after simplification"""
+        return self.__function_statistics
+
+    @function_statistics.setter
+    def function_statistics(self, value):
+        logging.warning('Cannot set function_statistics object.')
+
     @property
     def status(self):
         return self.__status
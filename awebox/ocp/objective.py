@@ -64,10 +64,19 @@ def find_int_weights(nlp_numerics_options):
 
     return int_weights
 
+def find_interval_weights(nlp_numerics_options):
+
+    # relative interval lengths, equal to one on a uniform grid
+    nk = nlp_numerics_options['n_k']
+    interval_weights = struct_op.get_interval_fractions(nlp_numerics_options) * nk
+
+    return interval_weights
+
 def find_tracking(nlp_numerics_options, V, P, variables):
 
     nk = nlp_numerics_options['n_k']
     direct_collocation, multiple_shooting, d, scheme, int_weights = extract_discretization_info(nlp_numerics_options)
+    interval_weights = find_interval_weights(nlp_numerics_options)
 
     tracking = 0.
 
@@ -78,16 +87,16 @@ def find_tracking(nlp_numerics_options, V, P, variables):
             for name in set(struct_op.subkeys(variables, 'xd')) - set('e'):
 
                 difference = V['xd', kdx, name] - P['p', 'ref', 'xd', kdx, name]
-                tracking += P['p', 'weights', 'xd', name][0] * cas.mtimes(difference.T, difference)
+                tracking += interval_weights[kdx]*P['p', 'weights', 'xd', name][0] * cas.mtimes(difference.T, difference)
 
             for name in set(struct_op.subkeys(variables, 'xa')):
                 difference = V['xa', kdx, name] - P['p', 'ref', 'xa', kdx, name]
-                tracking += P['p', 'weights', 'xa', name][0] * cas.mtimes(difference.T, difference)
+                tracking += interval_weights[kdx]*P['p', 'weights', 'xa', name][0] * cas.mtimes(difference.T, difference)
 
             if 'xl' in list(variables.keys()):
                 for name in set(struct_op.subkeys(variables, 'xl')):
                     difference = V['xl', kdx, name] - P['p', 'ref', 'xl', kdx, name]
-                    tracking += P['p', 'weights', 'xl', name][0] * cas.mtimes(difference.T, difference)
+                    tracking += interval_weights[kdx]*P['p', 'weights', 'xl', name][0] * cas.mtimes(difference.T, difference)
 
         elif direct_collocation:
 
@@ -96,22 +105,23 @@ def find_tracking(nlp_numerics_options, V, P, variables):
                 for name in set(struct_op.subkeys(variables, 'xd')) - set('e'):
 
                     difference = V['coll_var',kdx, jdx, 'xd', name] - P['p', 'ref', 'coll_var', kdx, jdx, 'xd', name]
-                    tracking += int_weights[jdx]*P['p', 'weights', 'xd', name][0] * cas.mtimes(difference.T, difference)
+                    tracking += interval_weights[kdx]*int_weights[jdx]*P['p', 'weights', 'xd', name][0] * cas.mtimes(difference.T, difference)
 
                 for name in set(struct_op.subkeys(variables, 'xa')):
                     difference = V['coll_var', kdx, jdx, 'xa', name] - P['p', 'ref', 'coll_var', kdx, jdx, 'xa', name]
-                    tracking += int_weights[jdx]*P['p', 'weights', 'xa', name][0] * cas.mtimes(difference.T, difference)
+                    tracking += interval_weights[kdx]*int_weights[jdx]*P['p', 'weights', 'xa', name][0] * cas.mtimes(difference.T, difference)
 
                 if 'xl' in list(variables.keys()):
                     for name in set(struct_op.subkeys(variables, 'xl')):
                         difference = V['coll_var', kdx, jdx, 'xl', name] - P['p', 'ref', 'coll_var', kdx, jdx, 'xl', name]
-                        tracking += int_weights[jdx]*P['p', 'weights', 'xl', name][0] * cas.mtimes(difference.T, difference)
+                        tracking += interval_weights[kdx]*int_weights[jdx]*P['p', 'weights', 'xl', name][0] * cas.mtimes(difference.T, difference)
 
 
     return tracking
 
 def find_regularisation(nlp_numerics_options, V, P, variables):
     nk = nlp_numerics_options['n_k']
+    interval_weights = find_interval_weights(nlp_numerics_options)
 
     regularisation = 0.
 
@@ -119,13 +129,14 @@ def find_regularisation(nlp_numerics_options, V, P, variables):
         for name in set(struct_op.subkeys(variables, 'u')) - set(['ddl_t']):
             if not 'fict' in name:
                 difference = V['u', kdx, name] - P['p', 'ref', 'u', kdx, name]
-                regularisation += P['p', 'weights', 'u', name][0] * cas.mtimes(difference.T, difference)
+                regularisation += interval_weights[kdx]*P['p', 'weights', 'u', name][0] * cas.mtimes(difference.T, difference)
 
     return regularisation
 
 def find_ddq_regularisation(nlp_numerics_options, V, P, xdot, outputs):
     nk = nlp_numerics_options['n_k']
     direct_collocation, multiple_shooting, d, scheme, int_weights = extract_discretization_info(nlp_numerics_options)
+    interval_weights = find_interval_weights(nlp_numerics_options)
 
     ddq_regularisation = 0.
 
@@ -134,14 +145,14 @@ def find_ddq_regularisation(nlp_numerics_options, V, P, xdot, outputs):
         if multiple_shooting:
 
             for name in set(struct_op.subkeys(outputs, 'xddot_from_var')):
-                ddq_regularisation += cas.mtimes(xdot['xd',kdx,name[1:]].T, xdot['xd',kdx,name[1:]])
+                ddq_regularisation += interval_weights[kdx]*cas.mtimes(xdot['xd',kdx,name[1:]].T, xdot['xd',kdx,name[1:]])
 
         elif direct_collocation:
 
             for jdx in range(d):
                 for name in set(struct_op.subkeys(outputs, 'xddot_from_var')):
                     if 'ddq' in name:
-                        ddq_regularisation += int_weights[jdx]*cas.mtimes(xdot['coll_xd',kdx,jdx,name[1:]].T, xdot['coll_xd',kdx,jdx,name[1:]])
+                        ddq_regularisation += interval_weights[kdx]*int_weights[jdx]*cas.mtimes(xdot['coll_xd',kdx,jdx,name[1:]].T, xdot['coll_xd',kdx,jdx,name[1:]])
 
     return ddq_regularisation
 
@@ -165,11 +176,13 @@ def find_time_period(nlp_numerics_options, V):
     phase_fix_reel_out = nlp_numerics_options['phase_fix_reelout']
 
     if use_phase_fix:
-        time_period_zeroth = V['theta', 't_f',0] * round(nk * phase_fix_reel_out)
-        time_period_first = V['theta', 't_f',1] * (nk - round(nk * phase_fix_reel_out))
+        fractions = struct_op.get_interval_fractions(nlp_numerics_options)
+        nk_reelout = round(nk * phase_fix_reel_out)
+        time_period_zeroth = V['theta', 't_f',0] * float(sum(fractions[:nk_reelout]))
+        time_period_first = V['theta', 't_f',1] * float(sum(fractions[nk_reelout:]))
 
-        # average over collocation nodes
-        time_period = (time_period_zeroth + time_period_first) / nk
+        # sum over both phases
+        time_period = time_period_zeroth + time_period_first
     else:
         time_period = V['theta', 't_f']
 
@@ -437,12 +450,14 @@ def get_component_cost_dictionary(nlp_numerics_options, V, P, variables, paramet
 
     return component_costs
 
-def get_component_cost_function(component_costs, V, P):
+def get_component_cost_function(component_costs, V, P, component_cost_struct):
 
-    component_cost_fun = {}
+    # all components in one fused function, so that common subexpressions are evaluated only once
+    component_cost_vector = []
+    for name in list(component_cost_struct.keys()):
+        component_cost_vector = cas.vertcat(component_cost_vector, component_costs[name])
 
-    for name in list(component_costs.keys()):
-        component_cost_fun[name + '_fun'] = cas.Function(name + '_fun', [V, P], [component_costs[name]])
+    component_cost_fun = cas.Function('component_cost_fun', [V, P], [component_cost_vector])
 
     return component_cost_fun
 
@@ -460,8 +475,8 @@ def get_cost_function_and_structure(nlp_numerics_options, V, P, variables, param
 
     component_costs = get_component_cost_dictionary(nlp_numerics_options, V, P, variables, parameters, xdot, outputs, model, Integral_outputs)
 
-    component_cost_function = get_component_cost_function(component_costs, V, P)
     component_cost_structure = get_component_cost_structure(component_costs)
+    component_cost_function = get_component_cost_function(component_costs, V, P, component_cost_structure)
     [f_fun, f_jacobian_fun, f_hessian_fun] = make_cost_function(V, P, component_costs)
 
     return [component_cost_function, component_cost_structure, f_fun, f_jacobian_fun, f_hessian_fun]
@@ -202,7 +202,7 @@ def generate_terminal_constraints(options, terminal_variables, ref_variables, mo
 
     return terminal_constraints_struct, terminal_constraints_fun
 
-def generate_periodic_constraints(options, initial_model_variables, terminal_model_variables):
+def generate_periodic_constraints(options, initial_model_variables, terminal_model_variables, model):
 
     eqs_dict = {}
     ineqs_dict = {}
@@ -212,7 +212,13 @@ def generate_periodic_constraints(options, initial_model_variables, terminal_mod
 
     # list all periodic equalities ==> put SX expressions in dict
     if periodic:
-        eqs_dict['state_periodicity'] = make_periodicity_equality(initial_model_variables, terminal_model_variables)
+        # with sibling symmetry, the horizon is one of several equal parts of the period,
+        # after which every kite continues on the trajectory of the sibling it is mapped onto
+        if options['symmetry']['include']:
+            permutation = model.architecture.get_sibling_permutation(options['symmetry']['shift'])
+        else:
+            permutation = None
+        eqs_dict['state_periodicity'] = make_periodicity_equality(initial_model_variables, terminal_model_variables, permutation, model.architecture.parent_map)
         constraint_list.append(eqs_dict['state_periodicity'])
 
     # list all periodic inequalities ==> put SX expressions in dict
@@ -235,13 +241,18 @@ def make_initial_energy_equality(initial_model_variables, ref_variables):
 
     return initial_energy_eq
 
-def make_periodicity_equality(initial_model_variables, terminal_model_variables):
+def make_periodicity_equality(initial_model_variables, terminal_model_variables, permutation = None, parent_map = None):
 
     periodicity_cstr = []
     for name in set(struct_op.subkeys(initial_model_variables, 'xd')):
         if not name[0] == 'e' and not name[0] == 'w': # and not name[0] == 'a':
 
-            initial_value = vect_op.columnize(initial_model_variables['xd', name])
+            if permutation is None:
+                initial_name = name
+            else:
+                initial_name = struct_op.get_permuted_variable_name(name, permutation, parent_map)
+
+            initial_value = vect_op.columnize(initial_model_variables['xd', initial_name])
             final_value = vect_op.columnize(terminal_model_variables['xd', name])
 
             difference = initial_value - final_value
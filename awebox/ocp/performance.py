@@ -55,10 +55,12 @@ def get_time_period(nlp_options, V, outputs):
     pf_reelout = nlp_options['phase_fix_reelout']
 
     if nlp_options['phase_fix']:
-        time_period_zeroth = V['theta', 't_f',0] * round(n_k * pf_reelout)
-        time_period_first = V['theta', 't_f',1] * (n_k - round(n_k * pf_reelout))
-        # average over collocation nodes
-        time_period = (time_period_zeroth + time_period_first) / n_k
+        fractions = struct_op.get_interval_fractions(nlp_options)
+        n_k_reelout = round(n_k * pf_reelout)
+        time_period_zeroth = V['theta', 't_f',0] * float(np.sum(fractions[:n_k_reelout]))
+        time_period_first = V['theta', 't_f',1] * float(np.sum(fractions[n_k_reelout:]))
+        # sum over both phases
+        time_period = time_period_zeroth + time_period_first
     else:
         time_period = V['theta','t_f']
 
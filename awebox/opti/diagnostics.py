@@ -49,10 +49,10 @@ def print_homotopy_values(nlp, solution, p_fix_num):
 
     # print the cost components
     [cost_fun, cost_struct] = nlp.cost_components
+    cost = struct_op.evaluate_cost_dict(cost_fun, cost_struct, V(solution['x']), p_fix_num)
     logging.debug("{0:.<30}:".format('objective components'))
-    for name in list(cost_fun.keys()):
-        if 'problem' not in name and 'objective' not in name:
-            logging.debug(" {0:>20} = {1:5}".format(name[0:-9], str(cost_fun[name](V(solution['x']), p_fix_num))))
+    for name in list(cost.keys()):
+        logging.debug(" {0:>20} = {1:5}".format(name[0:-5], str(cost[name])))
     logging.debug('')
 
 def print_runtime_values(stats):
@@ -60,7 +60,7 @@ def print_runtime_values(stats):
 
     logging.info("{0:.<30}: {1:<30}".format('solver return status', stats['return_status']))
     logging.info("{0:.<30}: {1:<30}".format('number of iterations', stats['iter_count']))
-    logging.info("{0:.<30}: {1:<30}".format('main loop wall time', stats['t_wall_solver']))
+    logging.info("{0:.<30}: {1:<30}".format('main loop wall time', str(stats.get('t_wall_solver', stats.get('t_wall_total')))))
     logging.info('')
 
     return None
@@ -115,35 +115,41 @@ def build_si_initial_guess(nlp, model, formulation, options):
     if 'coll' in list(nlp.time_grids.keys()):
         tgrid_coll = nlp.time_grids['coll'](tf_init)
 
-    for k in range(nk+1):
+    if initialization_options['type'] in ['nominal_landing','compromised_landing','transition']:
 
-        t = tgrid_xd[k]
+        for k in range(nk+1):
 
-        # initialize kite(s) on trajectory
-        if initialization_options['type'] in ['nominal_landing','compromised_landing']:
-            guess = initial_guess_landing(t, initialization_options, model, formulation, tf_init, n_min, d_min)
-        elif initialization_options['type'] in ['transition']:
-            guess = initial_guess_transition(t, initialization_options, model, formulation, tf_init, n_min_0, d_min_0, n_min_f, d_min_f)
-        else:
-            guess = initial_guess(t, initialization_options, nlp, model, formulation)
+            t = tgrid_xd[k]
 
-        for name in struct_op.subkeys(model.variables, 'xd'):
-            V_init['xd', k, name] = guess[name]
+            # initialize kite(s) on trajectory
+            if initialization_options['type'] in ['nominal_landing','compromised_landing']:
+                guess = initial_guess_landing(t, initialization_options, model, formulation, tf_init, n_min, d_min)
+            else:
+                guess = initial_guess_transition(t, initialization_options, model, formulation, tf_init, n_min_0, d_min_0, n_min_f, d_min_f)
 
-        if nlp.discretization == 'direct_collocation' and (k < nk):
-            for j in range(d):
-                t = tgrid_coll[k,j]
+            for name in struct_op.subkeys(model.variables, 'xd'):
+                V_init['xd', k, name] = guess[name]
 
-                # initialize kite(s) on trajectory
-                if initialization_options['type'] in ['nominal_landing','compromised_landing']:
-                    guess = initial_guess_landing(t, initialization_options, model, formulation, tf_init, n_min, d_min)
-                elif initialization_options['type'] in ['transition']:
-                    guess = initial_guess_transition(t, initialization_options, model, formulation, tf_init, n_min_0, d_min_0, n_min_f, d_min_f)
-                else:
-                    guess = initial_guess(t, initialization_options, nlp, model, formulation)
+            if nlp.discretization == 'direct_collocation' and (k < nk):
+                for j in range(d):
+                    t = tgrid_coll[k,j]
+
+                    # initialize kite(s) on trajectory
+                    if initialization_options['type'] in ['nominal_landing','compromised_landing']:
+                        guess = initial_guess_landing(t, initialization_options, model, formulation, tf_init, n_min, d_min)
+                    else:
+                        guess = initial_guess_transition(t, initialization_options, model, formulation, tf_init, n_min_0, d_min_0, n_min_f, d_min_f)
 
-                for name in struct_op.subkeys(model.variables, 'xd'):
-                    V_init['coll_var', k, j, 'xd', name] = guess[name]
+                    for name in struct_op.subkeys(model.variables, 'xd'):
+                        V_init['coll_var', k, j, 'xd', name] = guess[name]
+
+    else:
+
+        # initialize kite(s) on trajectory on all nodes at once
+        if nlp.discretization == 'direct_collocation':
+            V_init = set_initial_guess_on_all_nodes(V_init, nlp, model, formulation, initialization_options, tgrid_xd, tgrid_coll)
+        else:
+            V_init = set_initial_guess_on_all_nodes(V_init, nlp, model, formulation, initialization_options, tgrid_xd)
 
     V_init = initial_guess_induction(initialization_options, nlp, formulation, model, V_init)
 
@@ -163,6 +169,27 @@ def build_si_initial_guess(nlp, model, formulation, options):
 
     return V_init
 
+def set_initial_guess_on_all_nodes(V_init, nlp, model, formulation, options, tgrid_xd, tgrid_coll = None):
+
+    V = nlp.V
+
+    # interval nodes, followed by the collocation nodes in the order of the nlp variables
+    t_all = np.array(tgrid_xd).flatten()
+    if tgrid_coll is not None:
+        t_all = np.concatenate([t_all, np.array(tgrid_coll).flatten()])
+
+    guess = initial_guess(t_all, options, nlp, model, formulation)
+
+    # write the guess into the nlp variables through their flat indices
+    V_init_cat = np.array(V_init.cat).flatten()
+    for name in struct_op.subkeys(model.variables, 'xd'):
+        indices = np.array(V.f['xd', :, name])
+        if tgrid_coll is not None:
+            indices = np.concatenate([indices, np.array(V.f['coll_var', :, :, 'xd', name])])
+        V_init_cat[indices] = np.array(guess[name]).T.flatten()
+
+    return V(V_init_cat)
+
 def estimate_radius_and_flight_time(options, model):
 
     trajectory_type = options['type']
@@ -503,10 +530,13 @@ def initial_guess_landing(t, initialization_options, model, formulation, t_f, n_
 
 def initial_guess(t, options, nlp, model, formulation):
 
+    # the guess is evaluated on an array of time points at once
+    t = np.array(t, dtype=float).flatten()
+    n_t = t.shape[0]
+
     ret = {}
     for name in struct_op.subkeys(model.variables,'xd'):
-        ret[name] = 0.0
-    ret['e'] = 0.0
+        ret[name] = np.zeros((model.variables_dict['xd'][name].shape[0], n_t))
 
     # if options['type'] == 'landing':
     #
@@ -525,14 +555,14 @@ def initial_guess(t, options, nlp, model, formulation):
     if options['type'] == 'aero_test':
         [l_t, dl_t, q10, dq10, r_dcm, omega] = get_aero_test_values(t, options)
 
-        ret['l_t'] = l_t
-        ret['dl_t'] = dl_t
+        ret['l_t'] = np.reshape(l_t, (1, n_t))
+        ret['dl_t'] = np.reshape(dl_t, (1, n_t))
 
         ret = initial_node_variables_for_aero_test_test(t, options, model, formulation, ret)
 
     else:
-        ret['l_t'] = options['xd']['l_t']
-        ret['dl_t'] = 0.0
+        ret['l_t'] = options['xd']['l_t'] * np.ones((1, n_t))
+        ret['dl_t'] = np.zeros((1, n_t))
 
         ret = initial_node_variables_for_standard_path(t, options, model, formulation, ret)
 
@@ -568,7 +598,16 @@ def initial_node_variables_for_standard_path(t, options, model, formulation, ret
     ua_norm = options['ua_norm']
     kite_dof = model.kite_dof
 
-    [height_list, radius, ehat_tether, ehat_side, ehat_up] = get_orbit_cone_parameters(options, model, ret['l_t'])
+    # all nodes are evaluated on the whole array of time points
+    t = np.array(t, dtype=float).flatten()
+    ones = np.ones((1, t.shape[0]))
+
+    # the tether length is constant along the standard path
+    l_t = options['xd']['l_t']
+    [height_list, radius, ehat_tether, ehat_side, ehat_up] = get_orbit_cone_parameters(options, model, l_t)
+    ehat_tether = np.reshape(np.array(ehat_tether, dtype=float), (3, 1))
+    ehat_side = np.reshape(np.array(ehat_side, dtype=float), (3, 1))
+    ehat_up = np.reshape(np.array(ehat_up, dtype=float), (3, 1))
 
     for node in range(1, number_of_nodes):
 
@@ -580,17 +619,17 @@ def initial_node_variables_for_standard_path(t, options, model, formulation, ret
             parent_position = ret['q' + str(parent) + str(grandparent)]
 
         if not node in kite_nodes:
-            ret['q' + str(node) + str(parent)] = get_tether_node_position(options, parent_position, node, ret['l_t'])
-            ret['dq' + str(node) + str(parent)] = np.zeros((3, 1))
+            ret['q' + str(node) + str(parent)] = get_tether_node_position(options, parent_position, node, l_t) * ones
+            ret['dq' + str(node) + str(parent)] = np.zeros((3, 1)) * ones
 
         else:
             if parent == 0:
-                height = height_list[0]
+                height = float(height_list[0])
             else:
-                height = height_list[1]
+                height = float(height_list[1])
 
             omega_norm = ua_norm / radius
-            omega_vector = ehat_tether * omega_norm
+            omega_vector = ehat_tether * omega_norm * ones
 
             psi = get_azimuthal_angle(t, level_siblings, node, parent, omega_norm)
 
@@ -603,11 +642,12 @@ def initial_node_variables_for_standard_path(t, options, model, formulation, ret
             velocity = ua_norm * ehat_tangential
 
             ehat1 = -1. * ehat_tangential
-            ehat3 = ehat_tether
-            ehat2 = vect_op.normed_cross(ehat3, ehat1)
+            ehat3 = ehat_tether * ones
+            ehat2 = np.cross(ehat3, ehat1, axis=0)
+            ehat2 = ehat2 / np.linalg.norm(ehat2, axis=0)
 
-            dcm = cas.horzcat(ehat1, ehat2, ehat3)
-            dcm_column = cas.reshape(dcm, (9, 1))
+            # columns of the rotation matrix, stacked
+            dcm_column = np.vstack([ehat1, ehat2, ehat3])
 
             ret['q' + str(node) + str(parent)] = position
             ret['dq' + str(node) + str(parent)] = velocity
@@ -642,8 +682,8 @@ def get_aero_test_values(t, options):
     ehat2 = vect_op.yhat_np()
     ehat3 = np.cos(phi) * vect_op.zhat_np() + np.sin(phi) * vect_op.xhat_np()
 
-    r_dcm = cas.horzcat(ehat1, ehat2, ehat3)
-    r_dcm = cas.reshape(r_dcm, (9, 1))
+    # columns of the rotation matrix, stacked
+    r_dcm = np.vstack([ehat1, ehat2 * np.ones_like(phi), ehat3])
 
     omega = dphi * ehat2
 
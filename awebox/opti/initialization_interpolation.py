@@ -32,8 +32,8 @@ import casadi.tools as ct
 def __goto_configuration(t_cont, time_grid_parameters, interpolation_parameters, model, interpolation_scheme):
     """Motion primitive for going from one configuration to another
 
-    :type t_cont: double
-    :param t_cont: point in (continuous) time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in (continuous) time
 
     :type time_grid_parameters: dict
     :param time_grid_parameters: parameters related to the time grids
@@ -56,10 +56,10 @@ def __goto_configuration(t_cont, time_grid_parameters, interpolation_parameters,
     return continuous_guess, interpolation_variables
 
 def __get_interpolation_variables(t_cont, time_grid_parameters, interpolation_parameters, interpolation_scheme, model):
-    """Get values for the variables that are interpolated for a point in time
+    """Get values for the variables that are interpolated for all points in time
 
-    :type t_cont: double
-    :param t_cont: point in continuous time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in continuous time
 
     :type time_grid_parameters: dict
     :param time_grid_parameters: parameters related to the time grids
@@ -99,10 +99,10 @@ def __get_interpolation_variables(t_cont, time_grid_parameters, interpolation_pa
     return interpolation_variables
 
 def __interpolate_specific_variable(t_cont, tgrid_s_curve, interpolation_variables, node_str, variable_name, interpolation_parameters, interpolation_scheme):
-    """Give the value of a specific interpolation variable and its derivatives at a point in time
+    """Give the value of a specific interpolation variable and its derivatives at all points in time
 
-    :type t_cont: double
-    :param t_cont: point in continuous time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in continuous time
 
     :type tgrid_s_curve: list
     :param tgrid_s_curve: time grid of s-curve
@@ -148,8 +148,8 @@ def __interpolate_specific_variable(t_cont, tgrid_s_curve, interpolation_variabl
 def __eval_polynomial(t_cont, polynomial_coeff, derivative_order = 0):
     """Evaluate 5th degree polynomial that defines the interpolation
 
-    :type t_cont: double
-    :param t_cont: point in (continuous) time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in (continuous) time
 
     :type polynomial_coeff: list
     :param polynomial_coeff: coefficients for each piecewise polynomial
@@ -175,10 +175,10 @@ def __eval_polynomial(t_cont, polynomial_coeff, derivative_order = 0):
     return polynomial_value
 
 def __eval_piecewise_polynomial(t_cont, polynomial_coeff, tgrid_s_curve, derivative_order = 0): #todo: use existing polynomial implementation
-    """Evaluate piecewise polynomial expression that defines the s-curve
+    """Evaluate piecewise polynomial expression that defines the s-curve on all points in time at once
 
-    :type t_cont: double
-    :param t_cont: point in (continuous) time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in (continuous) time
 
     :type polynomial_coeff: list
     :param polynomial_coeff: coeffients for each piecewise polynomial
@@ -189,10 +189,13 @@ def __eval_piecewise_polynomial(t_cont, polynomial_coeff, tgrid_s_curve, derivat
     :type derivate_order: int
     :param derivative_order: order of derivative of the polynomial expression that is evaluated
 
-    :rtype: double
+    :rtype: numpy.ndarray
     """
 
-    vec_offset = compute_vec_offset(t_cont, tgrid_s_curve) # determines which polynomial coeff to use todo: more robust implementation
+    t_cont = np.array(t_cont, dtype=float)
+    polynomial_coeff = np.array(polynomial_coeff, dtype=float).flatten()
+
+    vec_offset = compute_vec_offset(t_cont, tgrid_s_curve) # determines which polynomial coeff to use
     if derivative_order == 0:
         polynomial_value = polynomial_coeff[0 + vec_offset] + polynomial_coeff[1 + vec_offset]*t_cont + 0.5*t_cont*t_cont*polynomial_coeff[2 + vec_offset] + 1./6.*t_cont*t_cont*t_cont*polynomial_coeff[3 + vec_offset]
     elif derivative_order == 1:
@@ -205,20 +208,17 @@ def __eval_piecewise_polynomial(t_cont, polynomial_coeff, tgrid_s_curve, derivat
 def compute_vec_offset(t_cont, tgrid_s_curve):
     """compute vector offset for index of polynomial coeff in s-curve
 
-    :type t_cont: double
-    :param t_cont: point in continuous time
+    :type t_cont: numpy.ndarray
+    :param t_cont: points in continuous time
 
     :type tgrid_s_curve: list
     :param tgrid_s_curve: time grid of s-curve
 
-    :rtype: int
+    :rtype: numpy.ndarray
     """
 
-    vec_offset = 0
-    for t in tgrid_s_curve:
-        if t < t_cont:
-            vec_offset = 4*(tgrid_s_curve.index(t) + 1)
-    vec_offset = int(vec_offset)
+    # number of grid points that lie strictly before each point in time
+    vec_offset = 4 * np.searchsorted(np.array(tgrid_s_curve, dtype=float).flatten(), t_cont, side='left')
 
     return vec_offset
 
@@ -226,7 +226,7 @@ def __compute_states_from_interpolation_variables(interpolation_variables, confi
     """Compute q and dq from the interpolation variables
 
     :type interpolation_variables: dict
-    :param interpolation_variables: interpolation variables at a point in time that parameterize q and dq
+    :param interpolation_variables: interpolation variables at all points in time that parameterize q and dq
 
     :type configurations: dict
     :param configurations: initial and terminal system configurations
@@ -271,20 +271,22 @@ def __get_states(sstates_functions, model, interpolation_variables, sinterp):
     # initialize dict
     states = {}
 
-    # fill sinterp with numerical values
-    ninterp = sinterp(0.0)
+    # fill sinterp with numerical values, one column for each point in time
+    n_points = np.array(interpolation_variables['l_t']).size
+    ninterp = np.zeros((sinterp.cat.shape[0], n_points))
     for key in list(sinterp.keys()):
         for subkey in struct_op.subkeys(sinterp, key):
-            ninterp[key, subkey] = interpolation_variables[subkey]
+            ninterp[sinterp.f[key, subkey], :] = interpolation_variables[subkey]
 
+    # evaluate the states on all points in time at once
     for node in range(1, number_of_nodes):
         node_str = str(node) + str(parent_nodes[node])
-        states['q' + node_str] = sstates_functions['q' + node_str](ninterp)
-        states['dq' + node_str] = sstates_functions['dq' + node_str](ninterp)
+        states['q' + node_str] = sstates_functions['q' + node_str].map(n_points)(ninterp).full()
+        states['dq' + node_str] = sstates_functions['dq' + node_str].map(n_points)(ninterp).full()
 
         if int(kite_dof) == 6 and node in kite_nodes:
-            states['omega' + node_str] = sstates_functions['omega' + node_str](ninterp)
-            states['r' + node_str] = sstates_functions['r' + node_str](ninterp)
+            states['omega' + node_str] = sstates_functions['omega' + node_str].map(n_points)(ninterp).full()
+            states['r' + node_str] = sstates_functions['r' + node_str].map(n_points)(ninterp).full()
 
     return states
 
@@ -451,7 +453,7 @@ def __get_sstruct(dictionary):
     """Convert a dictionary to a casadi struct with the same structure and entries for 0th, 1st and 2nd derivatives
 
     :type dictionary: dict
-    :param dictionary: variables to be put into the struct
+    :param dictionary: variables to be put into the struct, which are scalar at every point in time
 
     :rtype: casadi.struct_symSX
     """
@@ -460,15 +462,15 @@ def __get_sstruct(dictionary):
 
     for key in list(dictionary.keys()):
         if key[0] != 'd':
-            struct_list += [(key, dictionary[key].shape)]
+            struct_list += [key]
 
-    sub_struct = ct.struct_symSX([ct.entry(struct_list[i][0], shape=struct_list[i][1])
+    sub_struct = ct.struct_symSX([ct.entry(struct_list[i])
                     for i in range(len(struct_list))])
 
-    dsub_struct = ct.struct_symSX([ct.entry('d' + struct_list[i][0], shape=struct_list[i][1])
+    dsub_struct = ct.struct_symSX([ct.entry('d' + struct_list[i])
                     for i in range(len(struct_list))])
 
-    ddsub_struct = ct.struct_symSX([ct.entry('dd' + struct_list[i][0], shape=struct_list[i][1])
+    ddsub_struct = ct.struct_symSX([ct.entry('dd' + struct_list[i])
                     for i in range(len(struct_list))])
 
     sstruct = ct.struct_symSX([
@@ -31,7 +31,6 @@ _python _version 2.7 / casadi-3.4.5
 import copy
 import numpy as np
 import casadi.tools as ct
-import casadi as cas
 import collections
 import awebox.tools.vector_operations as vect_op
 import math
@@ -417,9 +416,8 @@ def __generate_interpolation_parameters(time_grid_parameters, model, initializat
     conf_0, conf_f = __get_boundary_configurations(primitive, model, initialization_options, formulation, nlp)
     boundary_conditions = __get_boundary_conditions(conf_0, conf_f, model)
 
-    # generate polynomial coefficients for s curves
-    polynomial_coeff = {}
-    polynomial_coeff['l_t'] = __parameterize_curve(boundary_conditions['l_t'], time_grid_parameters, interpolation_scheme)
+    # collect interpolation variables that are parameterized by s curves
+    curve_names = ['l_t']
 
     for node in range(1, number_of_nodes):
         parameter_list = []
@@ -431,8 +429,10 @@ def __generate_interpolation_parameters(time_grid_parameters, model, initializat
                 parameter_list += ['inclination']
         else:
             parameter_list += ['inclination', 'azimuth']
-        for parameter in parameter_list:
-            polynomial_coeff[parameter + node_str] = __parameterize_curve(boundary_conditions[parameter + node_str], time_grid_parameters, interpolation_scheme)
+        curve_names += [parameter + node_str for parameter in parameter_list]
+
+    # generate polynomial coefficients for all s curves at once
+    polynomial_coeff = __parameterize_curves(boundary_conditions, curve_names, time_grid_parameters, interpolation_scheme)
 
     # create configuration dict
     configurations = {}
@@ -968,23 +968,26 @@ def __list_DM_to_array(list_DM):
 
     return array
 
-def __parameterize_curve(boundary_conditions, time_grid_parameters, interpolation_scheme):
+def __parameterize_curves(boundary_conditions, curve_names, time_grid_parameters, interpolation_scheme):
     """
-    Solves linear system of equations to generate parameters (polynomial coefficients) of 7 segment s-curve s.t.
-        boundary conditions are met
+    Solves linear system of equations to generate parameters (polynomial coefficients) of 7 segment s-curves s.t.
+        boundary conditions are met, for all interpolation variables in one block solve
     :param boundary_conditions: boundary conditions for interpolation variables
+    :param curve_names: names of the interpolation variables that are parameterized
     :param time_grid_parameters: dictionary of time grid parameters containing time grid for s-curve
-    :return: polynomial coefficients parameterizing s-curve
+    :return: dictionary of polynomial coefficients parameterizing the s-curves
     """
 
     if interpolation_scheme == 's_curve':
         tgrid_s_curve = time_grid_parameters['tgrid_s_curve']
-        c_vec = __assemble_lse_for_s_curve(tgrid_s_curve, boundary_conditions)
+        c_mat = __assemble_lse_for_s_curve(tgrid_s_curve, [boundary_conditions[name] for name in curve_names])
 
     else:
         raise ValueError('Error: Interpolation scheme not supported.')
 
-    polynomial_coeff = c_vec
+    polynomial_coeff = {}
+    for idx, name in enumerate(curve_names):
+        polynomial_coeff[name] = c_mat[:, idx]
 
     return polynomial_coeff
 
@@ -1066,36 +1069,49 @@ def __generate_vals(V_init, primitive, nlp, model, time_grid_parameters, interpo
         V_init['xi','xi_0'] = interpolation_parameters['configurations']['conf_0']['parameterization_dict']['xi_initial']
     if options['type'] in ['launch']:
         V_init['xi','xi_0'] = interpolation_parameters['configurations']['conf_f']['parameterization_dict']['xi_terminal']
-    for k in range(n_max + 1):
-        t_xd = tgrid_xd[k]
-        continuous_guess, interpolation_variables = __get_continuous_guess(t_xd, time_grid_parameters, interpolation_parameters, primitive, model, interpolation_scheme)
-        for name in struct_op.subkeys(model.variables, 'xd'):
-            V_init['xd', k, name] = continuous_guess[name]
-        if k < (n_max):
-            if model.options['tether']['control_var'] == 'ddl_t':
-                V_init['u', k + n_current, 'ddl_t'] = continuous_guess['ddl_t']
-        if nlp.discretization == 'direct_collocation':
+
+    # interval nodes, followed by the collocation nodes covered by the primitive
+    xd_nodes = list(range(n_max + 1))
+    coll_nodes = []
+    if nlp.discretization == 'direct_collocation':
+        for k in xd_nodes:
             if k == n_max:
                 d_vals = d_max
             else:
                 d_vals = nlp.d
-            for j in range(d_vals):
-                t_coll = tgrid_coll[k, j]
-                continuous_guess, interpolation_variables = __get_continuous_guess(t_coll, time_grid_parameters, interpolation_parameters, primitive, model, interpolation_scheme)
-                for name in struct_op.subkeys(model.variables, 'xd'):
-                    V_init['coll_var', k, j, 'xd', name] = continuous_guess[name]
+            coll_nodes += [(k, j) for j in range(d_vals)]
+    t_list = [tgrid_xd[k] for k in xd_nodes] + [tgrid_coll[k, j] for (k, j) in coll_nodes]
+    t_cont = np.array(ct.vertcat(*t_list)).flatten()
+    n_points = t_cont.shape[0]
+
+    # evaluate the guess on all nodes at once
+    continuous_guess, interpolation_variables = __get_continuous_guess(t_cont, time_grid_parameters, interpolation_parameters, primitive, model, interpolation_scheme)
+
+    # write the guess into the nlp variables through their flat indices
+    V = nlp.V
+    V_init_cat = np.array(V_init.cat).flatten()
+    for name in struct_op.subkeys(model.variables, 'xd'):
+        indices = [V.f['xd', k, name] for k in xd_nodes] + [V.f['coll_var', k, j, 'xd', name] for (k, j) in coll_nodes]
+        values = np.array(continuous_guess[name], dtype=float) * np.ones((model.variables_dict['xd'][name].shape[0], n_points))
+        V_init_cat[np.concatenate(indices)] = values.T.flatten()
+    V_init = V(V_init_cat)
+
+    if model.options['tether']['control_var'] == 'ddl_t':
+        ddl_t = np.array(continuous_guess['ddl_t'], dtype=float).flatten()
+        for k in range(n_max):
+            V_init['u', k + n_current, 'ddl_t'] = ddl_t[k]
 
     return V_init
 
 def __get_continuous_guess(t_cont, time_grid_parameters, interpolation_parameters, primitive, model, interpolation_scheme):
     """
-    Returns initial guess for a point in (continuous) time based on the type of motion primitive
-    :param t_cont: point in time
+    Returns initial guess for an array of points in (continuous) time based on the type of motion primitive
+    :param t_cont: array of points in time
     :param time_grid_parameters: dictionary of parameters related to the time grids
     :param interpolation_parameters: dictionary of parameters defining the interpolation
     :param primitive: arguments describing motion primitive
     :param model: system model
-    :return: initial guess for a point in (continuous) time
+    :return: initial guess for all points in (continuous) time
     """
 
     if primitive['type'] == 'goto':
@@ -1103,13 +1119,13 @@ def __get_continuous_guess(t_cont, time_grid_parameters, interpolation_parameter
 
     return continuous_guess, interpolation_variables
 
-def __assemble_lse_for_s_curve(tgrid_s_curve, boundary_conditions):
+def __assemble_lse_for_s_curve(tgrid_s_curve, boundary_conditions_list):
     """
-    Assembles the linear system of equations A*x = b that is used to find the polynomial coefficients that parameterize
-        the s-curve
+    Assembles and solves the linear system of equations that is used to find the jerk-minimal polynomial coefficients
+        that parameterize the s-curves. All curves share the time grid, so that they are solved with one factorization.
     :param tgrid_s_curve: vector containing s-curve time grid
-    :param boundary_conditions: dictionary of boundary conditions
-    :return: matrix A and vector b for the linear system of equations
+    :param boundary_conditions_list: list of dictionaries of boundary conditions, one for each curve
+    :return: matrix of polynomial coefficients, one column for each curve
     """
 
     # generate constants
@@ -1212,55 +1228,34 @@ def __assemble_lse_for_s_curve(tgrid_s_curve, boundary_conditions):
     # generate symbolic A_mat
     A_mat = ct.jacobian(equations, V['c_vec'])
 
-    # generate function for A_mat
-    A_mat_fun = ct.Function('A_mat_fun', [V], [A_mat])
+    # the equations are linear in the coefficients and in the boundary conditions: A_mat * c_vec = B_mat * b_vec
+    B_mat = -ct.jacobian(equations, V['b_vec'])
+    A_mat_fun = ct.Function('A_mat_fun', [V], [A_mat, B_mat])
 
     # generate numerical V
     V_num = V(0.0)
-    for key in struct_op.subkeys(V, 'b_vec'):
-        V_num['b_vec', key] = boundary_conditions[key]
     for i in range(len(struct_op.subkeys(V, 't_vec'))):
         V_num['t_vec','t_' + str(i)] = tgrid_s_curve[i]
-
-    # create NLP minimizing the jerk
-
-    ## build constraints
-    eq_constraints_list = []
-    for vec in ['t_vec', 'b_vec']:
-        for key in struct_op.subkeys(V, vec):
-            eq_constraints_list += [V[vec, key] - V_num[vec, key]]
-    eq_constraints = ct.vertcat(*eq_constraints_list)
-    constraints = ct.vertcat(equations,
-                             eq_constraints
-                             )
-
-    ## build cost function
-    cost_function = 0.
-    for segment in range(1,8):
-        for degree in range(1, 4):
-            cost_function += (V['c_vec','poly_coeff_' + str(segment), degree])**2
-
-    ## build nlp
-    jerk_nlp = {'x': V, 'f': cost_function, 'g': constraints}
-
-    ## set solver options
-    jerk_options = {}
-    logging_level = logging.getLogger().getEffectiveLevel()
-    if logging_level > 10:
-        jerk_options['ipopt.print_level'] = 0
-        jerk_options['print_time'] = 0
-
-    ## build solver
-    jerk_solver = cas.nlpsol('jerk_solver', 'ipopt', jerk_nlp, jerk_options)
-
-    ## compute solution
-    jerk_solution = jerk_solver(x0=V_num, lbg=0., ubg=0.)
-    jerk_solution = V(jerk_solution['x'])
+    [A_num, B_num] = [mat.full() for mat in A_mat_fun(V_num)]
+
+    # stack the boundary conditions of all curves
+    b_num = np.zeros((b_vec.cat.shape[0], len(boundary_conditions_list)))
+    for idx, boundary_conditions in enumerate(boundary_conditions_list):
+        for key in list(b_vec.keys()):
+            b_num[b_vec.f[key], idx] = float(boundary_conditions[key])
+
+    # minimize the jerk subject to the equations: the kkt system of this
+    # equality constrained qp is shared by all curves
+    n_c = c_vec.cat.shape[0]
+    n_eq = A_num.shape[0]
+    hessian = 2. * np.diag(np.tile([0., 1., 1., 1.], 7))
+    kkt_mat = np.vstack([np.hstack([hessian, A_num.T]), np.hstack([A_num, np.zeros((n_eq, n_eq))])])
+    kkt_rhs = np.vstack([np.zeros((n_c, b_num.shape[1])), np.dot(B_num, b_num)])
 
     # create outputs
-    c_vec = jerk_solution['c_vec']
+    c_mat = np.linalg.solve(kkt_mat, kkt_rhs)[:n_c, :]
 
-    return c_vec
+    return c_mat
 
 def __get_Omega(layer_siblings, node, parent):
     """
@@ -32,6 +32,8 @@ from . import preparation
 
 from . import diagnostics
 
+from . import solution_library
+
 import awebox.tools.struct_operations as struct_op
 
 import awebox.tools.print_operations as print_op
@@ -46,10 +48,13 @@ import logging
 
 import time
 
+import multiprocessing
+
 import pickle
 import pdb
 import pdb
 import numpy as np
+import casadi as cas
 
 class Optimization(object):
     def __init__(self):
@@ -62,6 +67,8 @@ class Optimization(object):
         self.__outputs_opt = None
         self.__time_grids = None
         self.__debug_fig_num = 1000
+        self.__batch_solver = None
+        self.__batch_maps = {}
 
         plt.close('all')
 
@@ -114,7 +121,7 @@ class Optimization(object):
 
             # reset timings / iteration counters
             self.__timings['optimization'] = 0.
-            self.__iterations['optimization'] = 0
+            self.__iterations = {'optimization': 0}
             self.__return_status_numeric['optimization'] = 17
 
            # schedule the homotopy steps
@@ -129,11 +136,25 @@ class Optimization(object):
             # solve the problem
 
             if final_homotopy_step != 'initial_guess':
-                if warmstart_file == None:
+
+                # a compatible solution of the solution library replaces the homotopy
+                library_warmstart = None
+                if warmstart_file == None and final_homotopy_step == 'final':
+                    library_warmstart = solution_library.get_warmstart(nlp, model, options['initialization'])
+
+                if library_warmstart is not None:
+                    self.solve_from_library(nlp, model, formulation, options, library_warmstart, visualization)
+                elif warmstart_file == None:
                     self.solve_homotopy(nlp, model, options, final_homotopy_step,visualization)
                 else:
                     self.solve_from_warmstart(nlp, model, options, warmstart_file, final_homotopy_step, visualization)
+
+                # outputs of the current iterate are only needed once the homotopy is done
+                self.generate_outputs(nlp, self.__solution)
             else:
+                # the variables of a warmstart file replace the initial guess
+                if warmstart_file is not None:
+                    self.set_warmstart_args(self.extract_warmstart_trial(warmstart_file), nlp)
                 self.__generate_outputs_from_V(nlp, self.__V_init)
                 self.__solve_succeeded = 'True'
                 self.__stats = None
@@ -160,8 +181,8 @@ class Optimization(object):
             self.generate_outputs(nlp, {'x': self.__V_init})
         fig_name = 'debug_plot_' + location
         sweep_toggle = False
-        cost_fun = nlp.cost_components[0]
-        cost = struct_op.evaluate_cost_dict(cost_fun, V_plot, self.__p_fix_num)
+        [cost_fun, cost_struct] = nlp.cost_components
+        cost = struct_op.evaluate_cost_dict(cost_fun, cost_struct, V_plot, self.__p_fix_num)
         visualization.plot(V_plot, visualization.options, [self.__outputs_init,
                                                            self.__outputs_opt],
                            self.__integral_outputs_opt, self.__debug_flags, self.__time_grids, cost, self.__name, sweep_toggle, fig_name=fig_name)
@@ -180,7 +201,8 @@ class Optimization(object):
 
         self.__p_fix_num = nlp.P(self.__arg['p'])
 
-        # pdb.set_trace()
+        # the initial guess does not change during the homotopy, so evaluate its outputs only once
+        self.__generate_init_outputs(nlp)
 
         if 'initial_guess' in self.__debug_locations or self.__debug_locations == 'all':
             self.__make_debug_plot(self.__V_init, nlp, visualization, 'initial_guess')
@@ -226,6 +248,127 @@ class Optimization(object):
 
         return None
 
+    def solve_batch(self, options, nlp, p_fix_num_batch, V_init_batch = None, parallelization = None):
+        """Solve the (already homotopy-solved) nlp for several parameter vectors at once.
+
+        @param options solver options
+        @param nlp awebox nlp
+        @param p_fix_num_batch list of parameter structures or matrix with one parameter vector per column
+        @param V_init_batch list of initial guesses or matrix with one initial guess per column (default: current solution)
+        @param parallelization 'process', 'serial' or casadi map parallelization ('openmp' or 'thread'), see solver batch options
+        @return stacked solutions (one column per instance) and batch statistics, with the return status
+                of every instance ('process' and 'serial' only) and its maximum constraint and bound violation
+        """
+
+        if parallelization is None:
+            parallelization = options['batch']['parallelization']
+
+        if self.__status not in ['I am a solved optimization.', 'I am a failed optimization.']:
+            raise ValueError('Cannot solve batch of optimizations before solving the homotopy.')
+
+        if isinstance(p_fix_num_batch, list):
+            p_fix_num_batch = cas.horzcat(*[cas.DM(p_fix_num) for p_fix_num in p_fix_num_batch])
+        p_fix_num_batch = cas.DM(p_fix_num_batch)
+        n_instances = p_fix_num_batch.shape[1]
+
+        if V_init_batch is None:
+            V_init_batch = self.__arg['x0']
+        elif isinstance(V_init_batch, list):
+            V_init_batch = cas.horzcat(*[cas.DM(V_init) for V_init in V_init_batch])
+        V_init_batch = cas.DM(V_init_batch)
+        if V_init_batch.shape[1] == 1:
+            V_init_batch = cas.repmat(V_init_batch, 1, n_instances)
+
+        if V_init_batch.shape != (nlp.V.cat.shape[0], n_instances):
+            raise ValueError('Initial guesses of batch do not correspond to NLP requirements.')
+
+        if p_fix_num_batch.shape[0] != nlp.P.cat.shape[0]:
+            raise ValueError('Parameters of batch do not correspond to NLP requirements.')
+
+        # all arguments of the mapped solver have to be given explicitly
+        batch_arg = {}
+        batch_arg['x0'] = V_init_batch
+        batch_arg['p'] = p_fix_num_batch
+        batch_arg['lbx'] = cas.repmat(cas.DM(self.__V_bounds['lb']), 1, n_instances)
+        batch_arg['ubx'] = cas.repmat(cas.DM(self.__V_bounds['ub']), 1, n_instances)
+        batch_arg['lbg'] = cas.repmat(cas.DM(self.__arg['lbg']), 1, n_instances)
+        batch_arg['ubg'] = cas.repmat(cas.DM(self.__arg['ubg']), 1, n_instances)
+        batch_arg['lam_x0'] = cas.DM.zeros(batch_arg['lbx'].shape)
+        batch_arg['lam_g0'] = cas.DM.zeros(batch_arg['lbg'].shape)
+        if 'lam_x0' in list(self.__arg.keys()):
+            batch_arg['lam_x0'] = cas.repmat(cas.DM(self.__arg['lam_x0']), 1, n_instances)
+            batch_arg['lam_g0'] = cas.repmat(cas.DM(self.__arg['lam_g0']), 1, n_instances)
+
+        if parallelization in ['openmp', 'thread'] and options['linear_solver'] == 'mumps':
+            logging.warning('Linear solver mumps is not thread-safe: solving batch in a process pool.')
+            parallelization = 'process'
+
+        n_processes = min(options['batch']['n_processes'], n_instances)
+        if parallelization == 'process' and n_processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning('Batch solves in a process pool require forked processes: solving batch in serial.')
+            parallelization = 'serial'
+        if parallelization == 'process' and n_processes <= 1:
+            parallelization = 'serial'
+
+        logging.info('solve batch of ' + str(n_instances) + ' optimizations...')
+
+        # the batch solver is only generated on the first batch solve, and mapped once per batch size
+        if self.__batch_solver is None:
+            self.__batch_solver = preparation.generate_batch_solver(nlp, options)
+
+        timer = time.time()
+        if parallelization in ['process', 'serial']:
+            # the solver statistics of every instance are available
+            instance_args = []
+            for idx in range(n_instances):
+                instance_arg = {}
+                for name in list(batch_arg.keys()):
+                    instance_arg[name] = batch_arg[name][:, idx]
+                instance_args += [instance_arg]
+
+            if parallelization == 'process':
+                # the forked processes receive the solver from the pool initializer
+                pool = multiprocessing.get_context('fork').Pool(n_processes, initializer = initialize_batch_worker, initargs = (self.__batch_solver,))
+                instance_results = pool.map(solve_batch_instance_in_worker, instance_args)
+                pool.close()
+                pool.join()
+            else:
+                instance_results = [solve_batch_instance(self.__batch_solver, instance_arg) for instance_arg in instance_args]
+
+            return_status = [instance_stats['return_status'] for [instance_solution, instance_stats] in instance_results]
+            success = [instance_stats['success'] for [instance_solution, instance_stats] in instance_results]
+
+            batch_solution = {}
+            for name in list(instance_results[0][0].keys()):
+                batch_solution[name] = cas.horzcat(*[cas.DM(instance_solution[name]) for [instance_solution, instance_stats] in instance_results])
+
+        else:
+            # the instances of the mapped solver share its statistics, so no per-instance status is available
+            if (n_instances, parallelization) not in list(self.__batch_maps.keys()):
+                self.__batch_maps[(n_instances, parallelization)] = self.__batch_solver.map('batch_solver_map', parallelization, n_instances, [], [])
+            batch_solution = self.__batch_maps[(n_instances, parallelization)](**batch_arg)
+            return_status = [None] * n_instances
+            success = [None] * n_instances
+        self.__timings['batch'] = time.time() - timer
+
+        # check the feasibility of every instance w.r.t. constraints and variable bounds
+        lbg_violation = cas.fmax(batch_arg['lbg'] - batch_solution['g'], 0.)
+        ubg_violation = cas.fmax(batch_solution['g'] - batch_arg['ubg'], 0.)
+        lbx_violation = cas.fmax(batch_arg['lbx'] - batch_solution['x'], 0.)
+        ubx_violation = cas.fmax(batch_solution['x'] - batch_arg['ubx'], 0.)
+        constraint_violation = [float(cas.mmax(cas.vertcat(lbg_violation[:, idx], ubg_violation[:, idx]))) for idx in range(n_instances)]
+        bound_violation = [float(cas.mmax(cas.vertcat(lbx_violation[:, idx], ubx_violation[:, idx]))) for idx in range(n_instances)]
+
+        batch_stats = {}
+        batch_stats['n_instances'] = n_instances
+        batch_stats['t_wall_batch'] = self.__timings['batch']
+        batch_stats['return_status'] = return_status
+        batch_stats['success'] = success
+        batch_stats['constraint_violation'] = constraint_violation
+        batch_stats['bound_violation'] = bound_violation
+
+        return batch_solution, batch_stats
+
     def solve_from_warmstart(self, nlp, model, options, warmstart_file, final_homotopy_step, visualization):
 
         logging.info('solve from warmstart...')
@@ -244,6 +387,35 @@ class Optimization(object):
 
         return None
 
+    def solve_from_library(self, nlp, model, formulation, options, library_warmstart, visualization):
+        """Solve the final problem directly from the closest library solution. If this fails,
+        the homotopy is solved from the initial guess of the library solution instead.
+        """
+
+        logging.info('solve from library solution...')
+        logging.info('')
+
+        self.__solve_succeeded = True
+
+        self.set_warmstart_args(library_warmstart, nlp)
+        self.define_warmstart_schedule('final', library_warmstart, nlp, model)
+
+        timer = time.time()
+        self.solve_general_homotopy_step('final', 0, options, nlp, model, self.__solvers['library'], visualization)
+        self.update_runtime_info(timer, 'final')
+
+        if not self.__solve_succeeded:
+            logging.warning('Solve from library solution failed: solving the homotopy instead.')
+            self.__iterations['final'] = 0.
+            self.define_homotopy_update_schedule(model, formulation, nlp, options['cost'])
+            self.__bound_update_counter = scheduling.initialize_bound_update_counter(model, self.__schedule, formulation)
+            self.initialize_args_and_updates(nlp, formulation, model, options, visualization)
+            self.solve_homotopy(nlp, model, options, 'final', visualization)
+
+        logging.info(print_op.hline('#'))
+
+        return None
+
     def update_runtime_info(self, timer, step_name):
 
         self.__timings[step_name] = time.time() - timer
@@ -329,7 +501,10 @@ class Optimization(object):
                 self.__iterations[step_name] = 0.
             self.__iterations[step_name] += self.__stats['iter_count']
 
-            self.generate_outputs(nlp, self.__solution)
+            # outputs of intermediate steps are only generated on request or for debug plots
+            make_debug_plot = (step_name in self.__debug_locations or self.__debug_locations == 'all')
+            if options['record_homotopy_outputs'] or make_debug_plot:
+                self.generate_outputs(nlp, self.__solution)
 
             self.allow_next_homotopy_step()
 
@@ -337,7 +512,7 @@ class Optimization(object):
             diagnostics.print_homotopy_values(nlp, self.__solution, self.__p_fix_num)
             diagnostics.health_check(nlp, self.__solution, self.__arg, options, self.__solve_succeeded)
 
-            if step_name in self.__debug_locations or self.__debug_locations == 'all':
+            if make_debug_plot:
                 V_plot = nlp.V(self.__solution['x'])
                 self.__make_debug_plot(V_plot, nlp, visualization, step_name)
 
@@ -381,6 +556,7 @@ class Optimization(object):
         if V_shape_matches:
             self.__V_init = V_init_proposed
             self.__arg['x0'] = self.__V_init.cat
+            self.__generate_init_outputs(nlp)
         else:
             raise ValueError('Variables of specified warmstart do not correspond to NLP requirements.')
 
@@ -471,19 +647,26 @@ class Optimization(object):
 
         return None
 
-    def __generate_outputs_from_V(self, nlp, V_final):
+    def __generate_init_outputs(self, nlp):
 
-        # V_initial = nlp.V(self.__arg['x0']) # todo: needed elsewhere?
         V_initial = self.__V_init
 
+        [nlp_outputs, nlp_output_fun] = nlp.output_components
+        self.__outputs_init = nlp_outputs(nlp_output_fun(V_initial, self.__p_fix_num))
+
+        [nlp_integral_outputs, nlp_integral_outputs_fun] = nlp.integral_output_components
+        self.__integral_outputs_init = nlp_integral_outputs(nlp_integral_outputs_fun(V_initial, self.__p_fix_num))
+
+        return None
+
+    def __generate_outputs_from_V(self, nlp, V_final):
+
         # general outputs
         [nlp_outputs, nlp_output_fun] = nlp.output_components
-        outputs_init = nlp_outputs(nlp_output_fun(V_initial, self.__p_fix_num))
         outputs_opt = nlp_outputs(nlp_output_fun(V_final, self.__p_fix_num))
 
         # integral outputs
         [nlp_integral_outputs, nlp_integral_outputs_fun] = nlp.integral_output_components
-        integral_outputs_init = nlp_integral_outputs(nlp_integral_outputs_fun(V_initial, self.__p_fix_num))
         integral_outputs_opt = nlp_integral_outputs(nlp_integral_outputs_fun(V_final, self.__p_fix_num))
 
         # time grids
@@ -493,8 +676,6 @@ class Optimization(object):
 
         # set properties
         self.__outputs_opt = outputs_opt
-        self.__outputs_init = outputs_init
-        self.__integral_outputs_init = integral_outputs_init
         self.__integral_outputs_opt = integral_outputs_opt
         self.__integral_outputs_fun = nlp_integral_outputs_fun
         self.__time_grids = time_grids
@@ -708,3 +889,25 @@ class Optimization(object):
     @integral_outputs_opt.setter
     def integral_outputs_opt(self, value):
         logging.warning('Cannot set integral_outputs_opt object.')
+
+def solve_batch_instance(batch_solver, instance_arg):
+    """Solve a single instance of a batch, with the solution as numpy arrays, so that it can be returned from a worker process.
+    """
+
+    instance_solution = batch_solver(**instance_arg)
+    instance_stats = batch_solver.stats()
+
+    instance_solution = {name: np.array(instance_solution[name]) for name in list(instance_solution.keys())}
+    instance_stats = {'return_status': instance_stats['return_status'], 'success': instance_stats['success']}
+
+    return [instance_solution, instance_stats]
+
+# batch solver of the worker processes, set by the pool initializer, since casadi functions cannot be pickled
+worker_batch_solver = None
+
+def initialize_batch_worker(batch_solver):
+    global worker_batch_solver
+    worker_batch_solver = batch_solver
+
+def solve_batch_instance_in_worker(instance_arg):
+    return solve_batch_instance(worker_batch_solver, instance_arg)
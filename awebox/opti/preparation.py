@@ -32,6 +32,8 @@ from . import initialization
 
 from . import initialization_modular as initialization_modular
 
+from . import solution_library
+
 from . import reference
 
 import awebox.tools.struct_operations as struct_op
@@ -44,11 +46,17 @@ import logging
 
 def initialize_arg(nlp, formulation, model, options):
 
+    # system bounds may be swept without rebuilding the nlp
+    if model.update_variable_bounds(options['initialization']['system_bounds']):
+        nlp.update_variable_bounds(model)
+
     # V_init = initialization.get_initial_guess(nlp, model, formulation, options)
     if options['initialization']['initialization_type'] == 'default':
         V_init = initialization.get_initial_guess(nlp, model, formulation, options['initialization'])
     elif options['initialization']['initialization_type'] == 'modular':
         V_init = initialization_modular.get_initial_guess(nlp, model, formulation, options['initialization'])
+    elif options['initialization']['initialization_type'] == 'library':
+        V_init = solution_library.get_initial_guess(nlp, model, formulation, options['initialization'])
 
     V_ref = reference.get_reference(nlp, model, V_init, options)
 
@@ -253,8 +261,31 @@ def generate_solvers(awebox_callback, model, nlp, formulation, options):
     solvers['middle'] = middle_solver
     solvers['final'] = final_solver
 
+    # the final problem is solved directly from a converged library solution, which is close to the solution
+    if options['initialization']['initialization_type'] == 'library' and options['initialization']['library']['skip_homotopy']:
+        library_opts = generate_default_solver_options(options)
+        library_opts['ipopt.mu_init'] = options['initialization']['library']['mu_init']
+        if options['callback']:
+            library_opts['iteration_callback'] = awebox_callback
+            library_opts['iteration_callback_step'] = options['callback_step']
+        solvers['library'] = cas.nlpsol('solver', 'ipopt', nlp.get_nlp(), library_opts)
+
     return solvers
 
+def generate_batch_solver(nlp, options):
+    """Generate an ipopt solver without callback for the batch solves of the nlp, which is
+    called once per instance or mapped over several instances
+    """
+
+    # python callbacks are not evaluated in the batch, as they cannot be called from parallel threads
+    batch_opts = generate_default_solver_options(options)
+    batch_opts['ipopt.print_level'] = 0
+    batch_opts['print_time'] = 0
+
+    batch_solver = cas.nlpsol('batch_solver', 'ipopt', nlp.get_nlp(), batch_opts)
+
+    return batch_solver
+
 def fix_q_and_r_values_if_necessary(solver_options, nlp, model, V_bounds, V_init):
 
     if solver_options['fixed_q_r_values']:
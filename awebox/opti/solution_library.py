@@ -0,0 +1,259 @@
+#
+#    This file is part of awebox.
+#
+#    awebox -- A modeling and optimization framework for multi-kite AWE systems.
+#    Copyright (C) 2017-2019 Jochem De Schutter, Rachel Leuthold, Moritz Diehl,
+#                            ALU Freiburg.
+#    Copyright (C) 2018-2019 Thilo Bronnenmeyer, Kiteswarms Ltd.
+#    Copyright (C) 2016      Elena Malz, Sebastien Gros, Chalmers UT.
+#
+#    awebox is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 3 of the License, or (at your option) any later version.
+#
+#    awebox is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with awebox; if not, write to the Free Software Foundation,
+#    Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+'''
+library of solved trials, indexed by a feature vector of their key options and parameters, that provides
+warm starts for new trials from the closest compatible solution
+
+python-3.5 / casadi-3.4.5
+'''
+
+import awebox.tools.struct_operations as struct_op
+import awebox.tools.data_saving as data_tools
+import awebox.trial_funcs as trial_funcs
+from . import initialization
+import casadi as cas
+import numpy as np
+import logging
+import pickle
+import os
+
+class SolutionLibrary(object):
+    def __init__(self, directory):
+        """Constructor.
+
+        @param directory directory that contains the solutions and their index
+        """
+
+        if directory is None:
+            raise ValueError('No directory specified for the solution library.')
+
+        self.__directory = directory
+        self.__index_file = os.path.join(directory, 'index.dict')
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        if os.path.isfile(self.__index_file):
+            with open(self.__index_file, 'rb') as index_file:
+                self.__entries = pickle.load(index_file)
+        else:
+            self.__entries = []
+
+    def add(self, trial):
+        """Store the solution of a solved trial in the library.
+
+        @param trial solved awebox trial
+        @return name of the stored solution
+        """
+
+        if trial.optimization.V_final is None:
+            raise ValueError('Cannot add an unsolved trial to the solution library.')
+
+        options = trial.options
+        name = trial.name + '_' + str(len(self.__entries))
+
+        # the solution is stored in si units, so that it can be rescaled for other models
+        solution = {}
+        solution['V_final'] = trial.optimization.V_final
+        solution['time_grids'] = trial.optimization.time_grids
+        solution['t_f'] = trial.optimization.V_final['theta', 't_f']
+        data_tools.pickle_data(solution, os.path.join(self.__directory, name), 'dict')
+
+        entry = {}
+        entry['name'] = name
+        entry['compatibility'] = get_compatibility_key(trial.nlp, trial.model, options['solver']['initialization'])
+        entry['features'] = get_feature_vector(options['solver']['initialization'])
+        self.__entries += [entry]
+
+        with open(self.__index_file, 'wb') as index_file:
+            pickle.dump(self.__entries, index_file)
+
+        logging.info('Trial (%s) added to solution library %s as %s.', trial.name, self.__directory, name)
+
+        return name
+
+    def find(self, nlp, model, options):
+        """Find the closest compatible solution, i.e. with the same architecture, kite_dof and variables.
+
+        @param nlp nlp formulation
+        @param model system model
+        @param options initialization options
+        @return stored solution and its distance in feature space, or None if there is no compatible solution
+        """
+
+        compatibility = get_compatibility_key(nlp, model, options)
+        features = get_feature_vector(options)
+
+        compatible = [entry for entry in self.__entries if entry['compatibility'] == compatibility]
+        if not compatible:
+            return None, None
+
+        # distance relative to the features of the current problem
+        scale = np.maximum(np.abs(features), 1e-6)
+        distances = [np.linalg.norm((entry['features'] - features) / scale) for entry in compatible]
+        closest = compatible[int(np.argmin(distances))]
+
+        with open(os.path.join(self.__directory, closest['name'] + '.dict'), 'rb') as solution_file:
+            solution = pickle.load(solution_file)
+        solution['name'] = closest['name']
+
+        return solution, float(np.min(distances))
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    @directory.setter
+    def directory(self, value):
+        logging.warning('Cannot set directory object.')
+
+    @property
+    def entries(self):
+        return self.__entries
+
+    @entries.setter
+    def entries(self, value):
+        logging.warning('Cannot set entries object.')
+
+def get_compatibility_key(nlp, model, options):
+    """
+    Key of the problem structure: solutions can only be interpolated between problems with the same key
+    :param nlp: nlp formulation
+    :param model: system model
+    :param options: initialization options
+    :return: tuple of architecture, kite_dof, discretization and variable labels
+    """
+
+    architecture = tuple(sorted((node, parent) for (node, parent) in options['model']['architecture'].items() if node != 0))
+    variables = tuple(model.variables.labels())
+
+    return (architecture, model.kite_dof, nlp.discretization, nlp.d, nlp.options['phase_fix'], variables)
+
+def get_feature_vector(options):
+    """
+    Feature vector of the key options and parameters of a problem
+    :param options: initialization options
+    :return: wind speed, roughness length, tether length, windings, kite mass, area and span
+    """
+
+    params = options['sys_params_num']
+
+    features = [params['wind']['u_ref'],
+                params['wind']['log_wind']['z0_air'],
+                options['xd']['l_t'],
+                options['windings'],
+                params['geometry']['m_k'],
+                params['geometry']['s_ref'],
+                params['geometry']['b_ref']]
+
+    return np.array(features, dtype=float)
+
+def get_initial_guess(nlp, model, formulation, options):
+    """
+    Initial guess interpolated from the closest compatible solution of the solution library,
+    or the analytical initial guess if there is none
+    :param nlp: nlp formulation
+    :param model: system model
+    :param formulation: problem formulation
+    :param options: initialization options
+    :return: initial guess in scaled units
+    """
+
+    if nlp.discretization != 'direct_collocation':
+        logging.warning('Solution library initialization is only supported for direct collocation: using the default initial guess.')
+        return initialization.get_initial_guess(nlp, model, formulation, options)
+
+    V_init_si = interpolate_closest_solution(nlp, model, options)
+
+    if V_init_si is None:
+        logging.warning('No compatible solution in library ' + options['library']['directory'] + ': using the default initial guess.')
+        return initialization.get_initial_guess(nlp, model, formulation, options)
+
+    # the homotopy starts from the initial problem again
+    for name in list(model.parameters_dict['phi'].keys()):
+        V_init_si['phi', name] = 1.
+
+    V_init = struct_op.si_to_scaled(model, V_init_si)
+
+    return V_init
+
+def get_warmstart(nlp, model, options):
+    """
+    Warmstart of the final homotopy step from the closest compatible solution of the solution library
+    :param nlp: nlp formulation
+    :param model: system model
+    :param options: initialization options
+    :return: warmstart solution dict, or None if the homotopy is not skipped or there is no compatible solution
+    """
+
+    if options['initialization_type'] != 'library' or not options['library']['skip_homotopy']:
+        return None
+
+    if nlp.discretization != 'direct_collocation':
+        return None
+
+    V_init_si = interpolate_closest_solution(nlp, model, options)
+    if V_init_si is None:
+        return None
+
+    # the library solutions solve the final problem
+    for name in list(model.parameters_dict['phi'].keys()):
+        V_init_si['phi', name] = 0.
+
+    warmstart_solution = {}
+    warmstart_solution['options'] = {'nlp': {'discretization': nlp.discretization}}
+    warmstart_solution['final_homotopy_step'] = 'final'
+    warmstart_solution['V_opt'] = struct_op.si_to_scaled(model, V_init_si)
+    warmstart_solution['opt_arg'] = {'lam_x0': cas.DM.zeros(nlp.V.cat.shape),
+                                     'lam_g0': cas.DM.zeros(nlp.g.shape)}
+
+    return warmstart_solution
+
+def interpolate_closest_solution(nlp, model, options):
+    """
+    Closest compatible solution of the solution library, interpolated onto the current mesh
+    :param nlp: nlp formulation
+    :param model: system model
+    :param options: initialization options
+    :return: decision variables in si units, or None if there is no compatible solution
+    """
+
+    library = SolutionLibrary(options['library']['directory'])
+    solution, distance = library.find(nlp, model, options)
+
+    if solution is None:
+        return None
+
+    logging.info('Initial guess from library solution %s (distance %s).', solution['name'], distance)
+
+    time_grids = {}
+    for grid in list(nlp.time_grids.keys()):
+        time_grids[grid] = nlp.time_grids[grid](solution['t_f'])
+    V_init_si = trial_funcs.interpolate_solution(solution['V_final'], solution['time_grids'], nlp, time_grids)
+
+    if True in np.isnan(np.array(V_init_si.cat)):
+        raise ValueError('NaN detected in V_init_si')
+
+    return V_init_si
@@ -41,6 +41,7 @@ def set_default_user_options(internal_access = False):
         ('user_options',    'trajectory',  None,        'type',                  'lift_mode',        ('possible options', ['lift_mode','transition']), 't'),
         ('user_options',    'trajectory',  'lift_mode', 'windings',              5,                  ('number of windings [int]', None),'s'),
         ('user_options',    'trajectory',  'lift_mode', 'phase_fix',             True,               ('choose True or False', [True, False]),'x'),
+        ('user_options',    'trajectory',  'lift_mode', 'sibling_symmetry',      False,              ('optimize only one of N equal parts of the period of N identical, phase-shifted sibling kites, closed by a periodicity condition that permutes the siblings (n_k counts the intervals of one part)', [True, False]),'x'),
         ('user_options',    'trajectory',  'lift_mode', 'max_l_t',               None,               ('set maximum main tether length', None),'s'),
         ('user_options',    'trajectory',  'lift_mode', 'pumping_range',         None,               ('set predefined pumping range (only in comb. w. phase-fix)', None),'x'),
         ('user_options',    'trajectory',  'transition','initial_trajectory',    None,               ('relative path to pickled initial trajectory', None),'x'),
@@ -59,6 +60,7 @@ def set_default_user_options(internal_access = False):
         ('user_options',    'wind',        None,        'u_ref',                 5.,                 ('reference wind speed [m/s]', None),'s'),
         ('user_options',    'wind',        None,        'atmosphere_heightsdata', None,              ('data for the heights at this time instant', None),'s'),
         ('user_options',    'wind',        None,        'atmosphere_featuresdata',None,              ('data for the wind features at this time instant', None),'s'),
+        ('user_options',    'wind',        None,        'atmosphere_dataseries', 0,                  ('index of the time stamp of the wind data set that is used [int]', None),'s'),
         ('user_options',    None,          None,        'induction_model',       'actuator',         ('possible options', ['not_in_use', 'actuator']),'x'),
         ('user_options',    None,          None,        'kite_standard',         None,               ('possible options',None),'x'),
         ('user_options',    None,          None,        'atmosphere',            'isa',              ('possible options', ['isa', 'uniform']),'x'),
@@ -219,17 +221,17 @@ def set_default_options(default_user_options, help_options):
         ('model',  'tether', None, 'control_var',  'dddl_t', ('tether control variable', ['ddl_t', 'dddl_t']),'x'),
         ('model',  'tether', None, 'aero_elements', 10,     ('number of discretizations made in approximating the tether drag. int greater than 1. [-]', None),'x'),
         ('model',  'tether', None, 'reynolds_smoothing',    1e-1,       ('smoothing width of the heaviside approximation in the cd vs. reynolds polynomial [-]', None),'x'),
-        ('model',  'tether', None, 'cd_model',              'constant',  ('how to calculate the tether drag coefficient: piecewise interpolation, polyfit interpolation, constant', ['piecewise', 'polyfit', 'constant']),'x'),
+        ('model',  'tether', None, 'cd_model',              'constant',  ('how to calculate the tether drag coefficient: piecewise interpolation, polyfit interpolation, spline fit, constant', ['piecewise', 'polyfit', 'spline', 'constant']),'x'),
 
         #### system bounds and limits (physical)
-        ('model',  'system_bounds', 'theta',       'diam_t',       [1.0e-3, 1.0e-1],                                                  ('main tether diameter bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'theta',       'diam_s',       [1.0e-3, 1.0e-1],                                                  ('secondary tether diameter bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'xd',          'l_t',          [1.0e-2, 1.0e3],                                                   ('main tether length bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'theta',       'l_s',          [1.0e-2, 1.0e3],                                                   ('secondary tether length bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'theta',       'l_i',          [1.0e2, 1.0e2],                                                    ('intermediate tether length bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'xd',          'q',            [np.array([-cas.inf, -cas.inf, 10.0]), np.array([cas.inf, cas.inf, cas.inf])],         ('kite position bounds [m]', None),'x'),
-        ('model',  'system_bounds', 'theta',       't_f',          [1e-3, 500.0],                                                     ('main tether max acceleration [m/s^2]', None),'x'),
-        ('model',  'system_bounds', 'xa',          'lambda',       [0., cas.inf],                                                         ('multiplier bounds', None),'x'),
+        ('model',  'system_bounds', 'theta',       'diam_t',       [1.0e-3, 1.0e-1],                                                  ('main tether diameter bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'theta',       'diam_s',       [1.0e-3, 1.0e-1],                                                  ('secondary tether diameter bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'xd',          'l_t',          [1.0e-2, 1.0e3],                                                   ('main tether length bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'theta',       'l_s',          [1.0e-2, 1.0e3],                                                   ('secondary tether length bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'theta',       'l_i',          [1.0e2, 1.0e2],                                                    ('intermediate tether length bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'xd',          'q',            [np.array([-cas.inf, -cas.inf, 10.0]), np.array([cas.inf, cas.inf, cas.inf])],         ('kite position bounds [m]', None),'s'),
+        ('model',  'system_bounds', 'theta',       't_f',          [1e-3, 500.0],                                                     ('main tether max acceleration [m/s^2]', None),'s'),
+        ('model',  'system_bounds', 'xa',          'lambda',       [0., cas.inf],                                                         ('multiplier bounds', None),'s'),
 
         #### model bounds (range of validity)
         ('model',   'model_bounds', 'tether_stress', 'include',              True,       ('include tether stress inequality in constraints', [True, False]),'x'),
@@ -242,10 +244,12 @@ def set_default_options(default_user_options, help_options):
         ('model',   'model_bounds', 'aero_validity', 'scaling',              1.,         ('tightness scaling for aero_validity inequalities', None),'x'),
         ('model',   'model_bounds', 'anticollision', 'safety_factor',        5.,         ('safety margin for anticollision constraint [m]', None),'x'),
         ('model',   'model_bounds', 'anticollision', 'include',              True,       ('include a minimum distance anticollision inequality in constraints', [True, False]),'x'),
+        ('model',   'model_bounds', 'anticollision', 'pair_selection',       'all',      ('kite pairs with an anticollision inequality: all pairs, or only siblings and kites on adjacent layers', ['all', 'architecture']),'x'),
+        ('model',   'model_bounds', 'anticollision', 'added_pairs',          [],         ('additional kite pairs with an anticollision inequality, e.g. [(2, 5)]', None),'x'),
         ('model',   'model_bounds', 'anticollision_radius', 'include',       False,      ('include a minimum radius anticollision inequality in constraints', [True, False]),'x'),
         ('model',   'model_bounds', 'anticollision_radius', 'scaling',       1.,         ('tightness scaling for anticollision inequalities', None),'x'),
         ('model',   'model_bounds', 'acceleration',  'include',              True,       ('include a hardware limit on node acceleration', [True, False]),'x'),
-        ('model',   'model_bounds', 'acceleration',  'acc_max',              12.,        ('maximum acceleration [g]', None),'x'),
+        ('model',   'model_bounds', 'acceleration',  'acc_max',              12.,        ('maximum acceleration [g]', None),'s'),
         ('model',   'model_bounds', 'rotation',     'include',               True,     ('include constraints on roll and pitch motion', None), 't'),
         ('params',  'model_bounds', None,           'rot_angles',            np.array([80.0*np.pi/180., 80.0*np.pi/180.]), ('[roll, pitch] - [rad]', None), 's'),
         ('model',   'model_bounds', 'dcoeff_actuation', 'include',      False,       ('include a bound on dcoeff', None), 'x'),
@@ -269,8 +273,12 @@ def set_default_options(default_user_options, help_options):
         ('model',   'scaling_overwrite', 'xa',     'lambda',    None,    ('scaling of tether tension per length', None),'t'),
         ('model',   'scaling_overwrite', 'xd',      'e',        None,    ('scaling of the energy', None),'t'),
 
-        ('model',  'jit_code_gen',     None, 'include',              False,                  ('generate code with jit for model functions'),'t'),
-        ('model',  'jit_code_gen',     None, 'compiler',             'clang',                ('compiler for generated code'),'t'),
+        ('model',  'jit_code_gen',     None, 'include',              False,                  ('generate code for the model functions in the nlp, compile it and cache the compiled library'),'t'),
+        ('model',  'jit_code_gen',     None, 'compiler',             'gcc',                  ('compiler for generated code'),'t'),
+        ('model',  'jit_code_gen',     None, 'flags',                '-O1',                  ('flags to be passed to the compiler of the generated code'),'t'),
+        ('model',  'jit_code_gen',     None, 'cache_dir',            None,                   ('directory of the compiled model functions (default: awebox_codegen in the temporary directory)'),'t'),
+        ('model',  'simplification',   None, 'include',              False,                  ('eliminate common subexpressions of the model functions and report their graph size and evaluation time', [True, False]),'t'),
+        ('model',  'simplification',   None, 'n_eval',               10,                     ('number of evaluations to average the reported evaluation time over [int]', None),'x'),
 
         ('params',   None,       None,   'kappa_r',  1.,         ('baumgarte stabilization constant for dcm dynamics', None),'x'),
 
@@ -314,11 +322,19 @@ def set_default_options(default_user_options, help_options):
         ('nlp',  None,               None, 'lift_xddot',           True,                   ('lift xddot values on interval nodes', [True, False]),'x'),
         ('nlp',  None,               None, 'lift_xa',              True,                   ('lift xa values on interval nodes', [True, False]),'x'),
         ('nlp',  None,               None, 'phase_fix_reelout',    0.7,                    ('time fraction of reel-out phase', None),'x'),
+        ('nlp',  None,               None, 'interval_fractions',   None,                   ('relative length of each control interval, normalized to sum to one (uniform if None)', None),'t'),
+        ('nlp',  'mesh_refinement',  None, 'max_iter',             3,                      ('maximum number of mesh refinement iterations [int]', None),'t'),
+        ('nlp',  'mesh_refinement',  None, 'tol',                  1e-3,                   ('tolerance on the relative re-integration drift of each interval', None),'t'),
+        ('nlp',  'mesh_refinement',  None, 'coarsen_factor',       1e-2,                   ('merge neighbouring intervals whose drift is below this fraction of the tolerance', None),'t'),
+        ('nlp',  'mesh_refinement',  None, 'max_split',            4,                      ('maximum number of pieces an interval is split into per iteration [int]', None),'t'),
+        ('nlp',  'mesh_refinement',  None, 'n_k_max',              200,                    ('maximum number of intervals of the refined mesh [int]', None),'t'),
         ('nlp',  None,               None, 'pumping_range',        [None, None],           ('set predefined pumping range (only in comb. w. phase-fix)', None),'x'),
         ('nlp',  'cost',             None, 'output_quadrature',    True,                   ('use quadrature for integral system outputs in cost function', (True, False)),'t'),
         ('nlp',  'parallelization',  None, 'overwrite',            None,                   ('parallellize function evaluations', (True, False)),'t'),
         ('nlp',  'parallelization',  None, 'type',                 'openmp',               ('parallellization type', (True, False)),'t'),
         ('nlp',  None,               None, 'slack_constraints',    False,                  ('slack path constraints', (True, False)),'t'),
+        ('nlp',  'simplification',   None, 'include',              False,                  ('expand (where faster) and eliminate common subexpressions of the nlp functions and report their graph size and evaluation time', (True, False)),'t'),
+        ('nlp',  'simplification',   None, 'n_eval',               10,                     ('number of evaluations to average the reported evaluation time over [int]', None),'x'),
 
         ### Multiple shooting integrator options
         ('nlp',  'integrator',       None, 'type',                 'collocation',          ('integrator type', ('idas', 'collocation')),'t'),
@@ -342,6 +358,7 @@ def set_default_options(default_user_options, help_options):
         ('solver',  None,   None,   'tol',                  1e-8,       ('ipopt solution tolerance [float]', None),'x'),
         ('solver',  None,   None,   'callback',             False,      ('plot intermediate solutions', [True,False]),'x'),
         ('solver',  None,   None,   'callback_step',        10,         ('callback interval [int]', None),'x'),
+        ('solver',  None,   None,   'record_homotopy_outputs', False,   ('evaluate the outputs after every homotopy step, instead of only after the final step', [True, False]),'x'),
         ('solver',  None,   None,   'jit',                  False,      ('callback interval [int]', None),'t'),
         ('solver',  None,   None,   'compiler',            'clang',     ('callback interval [int]', None),'x'),
         ('solver',  None,   None,   'jit_flags',           '-O0',       ('flags to be passed to jit compiler', None),'t'),
@@ -355,7 +372,10 @@ def set_default_options(default_user_options, help_options):
         ('solver',  'initialization', None,   'ua_norm',               60.,       ('initial guess of apparent kite speed [m/s]', None),'x'),
         ('solver',  'initialization', None,   'incid_deg',             30.,       ('initial tether elevation angle [deg]', None),'x'),
         ('solver',  'initialization', None,   'initialization_type',
-         'default',       ('set initialization type', None),'t'),
+         'default',       ('set initialization type', ['default', 'modular', 'library']),'t'),
+        ('solver',  'initialization', 'library', 'directory',          None,        ('directory of the solution library used by the library initialization', None),'t'),
+        ('solver',  'initialization', 'library', 'skip_homotopy',      True,        ('solve the final problem directly from a compatible library solution, instead of the homotopy', [True, False]),'t'),
+        ('solver',  'initialization', 'library', 'mu_init',            1e-6,        ('start value for interior point homotopy parameter in ipopt when solving from a library solution [float]', None),'x'),
         ('solver',  'initialization', None,   'winding_period',        10.,        ('initial guess of reasonable period for one winding [s]', None),'x'),
         ('solver',  'initialization', None,   'min_rel_radius',        2.,        ('minimum allowed radius to span ratio allowed in initial guess [-]', None),'x'),
         ('solver',  'initialization', None,   'max_cone_angle_multi',  80.,       ('maximum allowed cone angle allowed in initial guess, for multi-kite scenarios [deg]', None),'x'),
@@ -364,6 +384,16 @@ def set_default_options(default_user_options, help_options):
         ('solver',  'initialization', None,   'interpolation_scheme',     's_curve',       ('interpolation scheme used for initial guess generation', ['s_curve', 'poly']),'x'),
         ('solver',  'initialization', None,   'fix_tether_length',     False,       ('fix tether length for trajectory', [True, False]),'x'),
 
+        ('solver',  'multi_start',    None,   'windings',              None,        ('numbers of windings of the initial guesses, nominal value if None [list]', None),'t'),
+        ('solver',  'multi_start',    None,   'l_t',                   None,        ('main tether lengths of the initial guesses, nominal value if None [list]', None),'t'),
+        ('solver',  'multi_start',    None,   'cone_angle',            None,        ('maximum cone angles of the initial guesses, nominal value if None [deg, list]', None),'t'),
+        ('solver',  'multi_start',    None,   't_f',                   None,        ('flight times of the initial guesses, subject to the acceleration and radius limits, nominal value if None [s, list]', None),'t'),
+        ('solver',  'multi_start',    None,   'n_processes',           4,           ('number of attempts that are solved concurrently [int]', None),'t'),
+        ('solver',  'multi_start',    None,   'n_converged',           2,           ('cancel the remaining attempts once this number of attempts has converged [int]', None),'t'),
+
+        ('solver',  'batch',          None,   'parallelization',       'process',   ('parallelization of optimization.solve_batch: pool of forked processes, one instance after the other, or casadi map. The casadi map needs a thread-safe linear solver (not mumps) and gives no return status per instance', ['process', 'serial', 'openmp', 'thread']),'t'),
+        ('solver',  'batch',          None,   'n_processes',           4,           ('number of instances that are solved concurrently in the process pool [int]', None),'t'),
+
         ('solver',   'tracking',       None,   'stagger_distance',      0.1,       ('distance between tracking trajectory and initial guess [m]', None),'x'),
 
         ('solver',   'weights',        None,   'dq',                    1e-1,       ('optimization weight for all dq variables [-]', None),'x'),
@@ -430,6 +460,33 @@ def set_default_options(default_user_options, help_options):
         ('simulation',  None,         None,     'Nsim',     500,            ('simulation steps per control interval[int]', None),'x'),
         ('simulation', 'integrator',  None,    'type',   'idas',            ('integrator type', ['collocation','idas']), 'x'),
 
+        ### mpc options
+        ('mpc',         None,         None,     'N',            10,         ('number of control intervals in the prediction horizon [int]', None),'x'),
+        ('mpc',         None,         None,     'ts',           None,       ('sampling time of the controller [s] (default: control interval of the reference)', None),'x'),
+        ('mpc',         None,         None,     'scheme',       'rti',      ('solution scheme per sampling time: one gauss-newton sqp iteration (rti) or a limited number of ipopt iterations (ipopt)', ['rti', 'ipopt']),'x'),
+        ('mpc',         None,         None,     'max_iter',     1,          ('maximum ipopt iterations per sampling time, for scheme ipopt [int]', None),'x'),
+        ('mpc',         None,         None,     'linear_solver', 'mumps',   ('which linear solver to use, for scheme ipopt', None),'x'),
+        ('mpc',         None,         None,     'Q',            1.,         ('tracking weight on the scaled differential states [-]', None),'x'),
+        ('mpc',         None,         None,     'R',            1.,         ('tracking weight on the scaled controls [-]', None),'x'),
+        ('mpc',        'integrator',  None,     'num_steps',    20,         ('number of finite elements of the prediction integrator [int]', None),'x'),
+
+        ### monte carlo options
+        ('monte_carlo', None,         None,     'N_samples',    100,        ('number of sampled rollouts [int]', None),'x'),
+        ('monte_carlo', None,         None,     'seed',         0,          ('seed of the random number generator [int]', None),'x'),
+        ('monte_carlo', 'wind',       None,     'u_ref_std',    0.1,        ('relative standard deviation of the reference wind speed [-]', None),'x'),
+        ('monte_carlo', 'wind',       None,     'z0_air_std',   0.5,        ('standard deviation of the logarithm of the surface roughness length [-]', None),'x'),
+        ('monte_carlo', None,         None,     'xd_std',       0.001,      ('standard deviation of the perturbation of the scaled initial states [-]', None),'x'),
+        ('monte_carlo', None,         None,     'parallelization', 'process', ('parallelization of the rollouts: pool of forked processes or casadi map', ['process', 'serial', 'openmp', 'thread']),'x'),
+        ('monte_carlo', None,         None,     'n_processes',  4,          ('number of processes of the process pool [int]', None),'x'),
+        ('monte_carlo', 'feedback',   None,     'include',      True,       ('close the loop with time-varying lqr feedback around the optimal trajectory, otherwise replay the optimal controls', [True, False]),'x'),
+        ('monte_carlo', 'feedback',   None,     'Q',            1.,         ('lqr weight on the scaled differential states [-]', None),'x'),
+        ('monte_carlo', 'feedback',   None,     'R',            1.,         ('lqr weight on the scaled controls [-]', None),'x'),
+        ('monte_carlo', 'integrator', None,     'type',         'rk4root',  ('integrator type', ['rk4root', 'collocation']),'x'),
+        ('monte_carlo', 'integrator', None,     'num_steps',    20,         ('number of integrator steps per control interval [int]', None),'x'),
+        ('monte_carlo', 'integrator', None,     'collocation_scheme', 'radau', ('scheme of the collocation integrator', None),'x'),
+        ('monte_carlo', 'integrator', None,     'interpolation_order', 3,   ('order of the collocation integrator', None),'x'),
+        ('monte_carlo', 'integrator', None,     'jit',          False,      ('jit-compile the integrator', [True, False]),'x'),
+
         ### visualization options
         ('visualization', 'cosmetics', 'trajectory', 'colors',      kite_colors,    ('list of colors for trajectory', None), 'x'),
         ('visualization', 'cosmetics', 'trajectory', 'axisfont',    {'size': '20'}, ('???', None), 'x'),
@@ -472,6 +529,15 @@ def set_default_options(default_user_options, help_options):
         ('quality', 'test_param', None, 't_f_min', 5.,             ('minimum final time test parameter', None), 'x'),
         ('quality', 'test_param', None, 'power_balance_tresh', 2e-2,             ('power balance threshold test parameter', None), 'x'),
         ('quality', 'test_param', None, 'max_control_interval', 10.,             ('max control interval test parameter', None), 'x'),
+        ('quality', 'test_param', None, 'max_reintegration_drift', 1e-2,     ('maximum drift of the scaled states when re-integrating the control intervals, relative to their magnitude', None), 'x'),
+        ('quality', 'test_param', None, 'max_energy_error', 5e-2,            ('maximum energy error when re-integrating the control intervals, relative to the largest scaled interval energy (at least one)', None), 'x'),
+        ('quality', 'reintegration', None, 'include', False,                ('re-integrate the control intervals of the solution as a quality test', [True, False]), 'x'),
+        ('quality', 'reintegration', None, 'type', 'rk4root',               ('integrator type', ['rk4root', 'collocation', 'idas']), 'x'),
+        ('quality', 'reintegration', None, 'num_steps', 20,                 ('number of integrator steps per control interval [int]', None), 'x'),
+        ('quality', 'reintegration', None, 'collocation_scheme', 'radau',   ('scheme of the collocation integrator', None), 'x'),
+        ('quality', 'reintegration', None, 'interpolation_order', 3,        ('order of the collocation integrator', None), 'x'),
+        ('quality', 'reintegration', None, 'jit', False,                    ('jit-compile the integrator', [True, False]), 'x'),
+        ('quality', 'reintegration', None, 'parallelization', 'serial',     ('parallelization of the interval integrations', ['serial', 'openmp', 'thread']), 'x'),
     ]
 
     default_options, help_options = funcs.build_options_tree(default_options_tree, default_user_options, help_options)
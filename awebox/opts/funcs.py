@@ -30,6 +30,7 @@ import logging
 import pickle
 
 import awebox.tools.struct_operations as struct_op
+import awebox.mdl.wind as wind
 
 def build_options_tree(options_tree, options, help_options):
 
@@ -97,6 +98,28 @@ def build_options_dict(options, help_options, architecture):
     else:
         phase_fix = user_options['trajectory']['lift_mode']['phase_fix']
 
+    ### sibling symmetry: only one of several equal parts of the period is optimized
+    sibling_symmetry = (user_options['trajectory']['type'] == 'lift_mode') and user_options['trajectory']['lift_mode']['sibling_symmetry']
+    symmetry_copies = 1
+    symmetry_shift = 0
+    if sibling_symmetry:
+        numbers_of_siblings = set([architecture.get_number_siblings(kite) for kite in architecture.kite_nodes])
+        if len(numbers_of_siblings) > 1 or 1 in numbers_of_siblings:
+            raise ValueError('Sibling symmetry requires the same number (at least two) of sibling kites on every layer.')
+        symmetry_copies = numbers_of_siblings.pop()
+
+        # during one part, every kite advances by the windings per part, i.e. by this many sibling positions
+        symmetry_shift = int(user_options['trajectory']['lift_mode']['windings']) % symmetry_copies
+
+        # the full period consists of several parts, which cannot be split into one reel-out and one reel-in phase
+        if phase_fix:
+            logging.warning('Phase fixing is switched off for sibling symmetry.')
+        phase_fix = False
+
+    options_tree.append(('formulation', 'symmetry', None, 'include', sibling_symmetry, ('optimize only one of several equal parts of the period of identical sibling kites', [True, False]),'x'))
+    options_tree.append(('formulation', 'symmetry', None, 'copies', symmetry_copies, ('number of equal parts of the period', None),'x'))
+    options_tree.append(('formulation', 'symmetry', None, 'shift', symmetry_shift, ('sibling positions that every kite advances by during one part of the period', None),'x'))
+
     ### control surfaces
     coeff_max = np.array(options['model']['aero']['three_dof']['coeff_max'])
     coeff_min = np.array(options['model']['aero']['three_dof']['coeff_min'])
@@ -133,6 +156,13 @@ def build_options_dict(options, help_options, architecture):
     options_tree.append(('params', 'wind', None, 'u_ref', user_options['wind']['u_ref'],('reference wind speed [m/s]', None),'x'))
     options_tree.append(('model', 'wind', None, 'atmosphere_heightsdata', user_options['wind']['atmosphere_heightsdata'],('data for the heights at this time instant', None),'x'))
     options_tree.append(('model', 'wind', None, 'atmosphere_featuresdata', user_options['wind']['atmosphere_featuresdata'],('data for the features at this time instant', None),'x'))
+    if user_options['wind']['model'] == 'datafile':
+        heightsdata = user_options['wind']['atmosphere_heightsdata']
+        featuresdata = user_options['wind']['atmosphere_featuresdata']
+        profile = wind.get_datafile_profile(heightsdata, featuresdata, int(user_options['wind']['atmosphere_dataseries']))
+        options_tree.append(('params', 'wind', 'datafile', 'heights', profile['heights'],('heights of the pressure levels [m]', None),'x'))
+        options_tree.append(('params', 'wind', 'datafile', 'u_x', profile['u_x'],('wind component in main wind direction at the height grid [m/s]', None),'x'))
+        options_tree.append(('params', 'wind', 'datafile', 'u_y', profile['u_y'],('lateral wind component at the height grid [m/s]', None),'x'))
 
     ## atmosphere
     options_tree.append(('model',  'atmosphere', None, 'model', user_options['atmosphere'], ('atmosphere model', None),'x'))
@@ -257,6 +287,8 @@ def build_options_dict(options, help_options, architecture):
     m_fict_scaling = 0.5 * options['model']['model_bounds']['acceleration']['acc_max'] * geometry['m_k'] * gravity * geometry['b_ref'] / 2.
     options_tree.append(('model', 'scaling', 'u', 'f_fict', f_fict_scaling, ('scaling of fictitious homotopy forces', None),'x'))
     options_tree.append(('model', 'scaling', 'u', 'm_fict', m_fict_scaling, ('scaling of fictitious homotopy moments', None),'x'))
+    acc_max = options['model']['model_bounds']['acceleration']['acc_max'] * gravity
+    options_tree.append(('params', 'model_bounds', None, 'acc_max', acc_max, ('maximum acceleration [m/s^2]', None),'s'))
 
     lambda_scaling_overwrite = options['model']['scaling_overwrite']['xa']['lambda']
     e_scaling_overwrite = options['model']['scaling_overwrite']['xd']['e']
@@ -288,6 +320,18 @@ def build_options_dict(options, help_options, architecture):
 
     n_k = options['nlp']['n_k']
     d = options['nlp']['collocation']['d']
+
+    # non-uniform control intervals
+    interval_fractions = options['nlp']['interval_fractions']
+    if interval_fractions is not None:
+        interval_fractions = np.array(interval_fractions, dtype=float).flatten()
+        if interval_fractions.shape[0] != n_k:
+            raise ValueError('Number of interval fractions (' + str(interval_fractions.shape[0]) + ') does not match n_k (' + str(n_k) + ').')
+        if np.any(interval_fractions <= 0.):
+            raise ValueError('Interval fractions must be positive.')
+        interval_fractions = list(interval_fractions / np.sum(interval_fractions))
+    options_tree.append(('nlp', None, None, 'interval_fractions', interval_fractions, ('relative length of each control interval, normalized to sum to one', None),'x'))
+
     options_tree.append(('nlp', 'cost', 'normalization', 'tracking',             n_k,             ('tracking cost normalization', None),'x'))
     options_tree.append(('nlp', 'cost', 'normalization', 'regularisation',       n_k,             ('regularisation cost normalization', None),'x'))
     options_tree.append(('nlp', 'cost', 'normalization', 'ddq_regularisation',   n_k,             ('ddq_regularisation cost normalization', None),'x'))
@@ -370,13 +414,20 @@ def build_options_dict(options, help_options, architecture):
             expand = False
         if user_options['trajectory']['type'] in ['transition','nominal_landing','compromised_landing','launch']:
             expand = False
+        if options['model']['jit_code_gen']['include']:
+            # compiled model functions do not support eval_sx
+            expand = False
 
     options_tree.append(('solver', None, None,'expand', expand, ('choose True or False', [True, False]),'x'))
 
     acc_max = options['model']['model_bounds']['acceleration']['acc_max'] * gravity
     options_tree.append(('solver', 'initialization', None, 'acc_max', acc_max, ('maximum acceleration allowed within hardware constraints [m/s^2]', None),'x'))
 
-    options_tree.append(('solver', 'initialization',  None, 'windings', user_options['trajectory']['lift_mode']['windings'], ('number of windings [int]', None),'x'))
+    # with sibling symmetry, the initial guess covers only one part of the period
+    windings = user_options['trajectory']['lift_mode']['windings']
+    if sibling_symmetry:
+        windings = windings / float(symmetry_copies)
+    options_tree.append(('solver', 'initialization',  None, 'windings', windings, ('number of windings [int]', None),'x'))
     options_tree.append(('solver', 'homotopy', None, 'phase_fix_reelout', options['nlp']['phase_fix_reelout'], ('time fraction of reel-out phase', None),'x'))
     options_tree.append(('solver', 'homotopy', None, 'phase_fix', phase_fix,  ('lift-mode phase fix', (True, False)),'x'))
 
@@ -402,6 +453,7 @@ def build_system_parameter_dict(options, help_options):
 
     options['model']['params'] = options['params']
     options['solver']['initialization']['sys_params_num'] = options['params']
+    options['solver']['initialization']['system_bounds'] = options['model']['system_bounds']
 
     return options, help_options
 
@@ -61,6 +61,7 @@ class Quality(object):
         results = quality_funcs.test_variables(trial, test_param_dict, results)
         results = quality_funcs.test_numerics(trial, test_param_dict, results)
         results = quality_funcs.test_power_balance(trial, test_param_dict, results)
+        results = quality_funcs.test_reintegration(trial, test_param_dict, results)
 
         # save test results
         self.__results = results
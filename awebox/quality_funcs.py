@@ -47,11 +47,11 @@ def test_numerics(trial, test_param_dict, results):
     else:
         results['t_f_min'] = True
 
-    # test if t_f/k_k ratio makes sense
+    # test if the longest control interval makes sense
     max_control_interval = test_param_dict['max_control_interval']
-    n_k = trial.nlp.n_k
-    if t_f / float(n_k) > max_control_interval:
-        logging.warning('t_f/n_k ratio is > ' + str(max_control_interval) + ' s for trial ' + trial.name)
+    control_interval = np.max(np.diff(np.array(trial.optimization.time_grids['x']).flatten()))
+    if control_interval > max_control_interval:
+        logging.warning('longest control interval is > ' + str(max_control_interval) + ' s for trial ' + trial.name)
         results['max_control_interval'] = False
     else:
         results['max_control_interval'] = True
@@ -126,12 +126,16 @@ def test_outputs(trial, test_param_dict, results):
     # get discretization
     discretization = trial.options['nlp']['discretization']
 
+    # only evaluate the performance outputs
+    [performance_struct, performance_fun] = trial.nlp.get_output_group('performance')
+    performance_outputs = performance_struct(performance_fun(trial.optimization.V_opt, trial.optimization.p_fix_num))
+
     # check if loyd factor is sensible
     max_loyd_factor = test_param_dict['max_loyd_factor']
     if discretization == 'direct_collocation':
-        loyd_factor = np.array(trial.optimization.output_vals[1]['coll_outputs', :, :, 'performance', 'loyd_factor'])
+        loyd_factor = np.array(performance_outputs['coll_outputs', :, :, 'performance', 'loyd_factor'])
     elif discretization == 'multiple_shooting':
-        loyd_factor = np.array(trial.optimization.output_vals[1]['outputs', :, 'performance', 'loyd_factor'])
+        loyd_factor = np.array(performance_outputs['outputs', :, 'performance', 'loyd_factor'])
     avg_loyd_factor = np.average(loyd_factor)
     if avg_loyd_factor > max_loyd_factor:
         logging.warning('Average Loyd factor > ' + str(max_loyd_factor) + ' for trial ' + trial.name)
@@ -142,9 +146,9 @@ def test_outputs(trial, test_param_dict, results):
     # check if loyd factor is sensible
     max_power_harvesting_factor = test_param_dict['max_power_harvesting_factor']
     if discretization == 'direct_collocation':
-        power_harvesting_factor = np.array(trial.optimization.output_vals[1]['coll_outputs', :, :, 'performance', 'phf'])
+        power_harvesting_factor = np.array(performance_outputs['coll_outputs', :, :, 'performance', 'phf'])
     elif discretization == 'multiple_shooting':
-        power_harvesting_factor = np.array(trial.optimization.output_vals[1]['outputs', :, 'performance', 'phf'])
+        power_harvesting_factor = np.array(performance_outputs['outputs', :, 'performance', 'phf'])
     avg_power_harvesting_factor = np.average(power_harvesting_factor)
     if avg_power_harvesting_factor > max_power_harvesting_factor:
         logging.warning('Average power harvesting factor > ' + str(max_loyd_factor) + ' for trial ' + trial.name)
@@ -258,6 +262,30 @@ def test_power_balance(trial, test_param_dict, results):
 
     return results
 
+def test_reintegration(trial, test_param_dict, results):
+    """Test whether the re-integrated control intervals match the solution at the next node.
+    :return: test results
+    """
+
+    if not test_param_dict['reintegration']['include']:
+        return results
+
+    validation = trial.validate_trajectory()
+
+    if validation['max_drift'] > test_param_dict['max_reintegration_drift']:
+        logging.warning('Re-integration drift of trial ' + trial.name + ' in interval ' + str(np.argmax(validation['drift'])) + ' is ' + str(validation['max_drift']) + ' > ' + str(test_param_dict['max_reintegration_drift']))
+        results['reintegration_drift'] = False
+    else:
+        results['reintegration_drift'] = True
+
+    if validation['max_energy_error'] > test_param_dict['max_energy_error']:
+        logging.warning('Re-integration energy error of trial ' + trial.name + ' in interval ' + str(np.argmax(validation['energy_error'])) + ' is ' + str(validation['max_energy_error']) + ' > ' + str(test_param_dict['max_energy_error']))
+        results['reintegration_energy'] = False
+    else:
+        results['reintegration_energy'] = True
+
+    return results
+
 def generate_test_param_dict(options):
     """
     Set parameters relevant for testing
@@ -275,6 +303,9 @@ def generate_test_param_dict(options):
     test_param_dict['t_f_min'] = options['test_param']['t_f_min']
     test_param_dict['max_control_interval'] = options['test_param']['max_control_interval']
     test_param_dict['power_balance_tresh'] = options['test_param']['power_balance_tresh']
+    test_param_dict['max_reintegration_drift'] = options['test_param']['max_reintegration_drift']
+    test_param_dict['max_energy_error'] = options['test_param']['max_energy_error']
+    test_param_dict['reintegration'] = options['reintegration']
 
     return test_param_dict
 
@@ -28,6 +28,8 @@
 
 import awebox.tools.struct_operations as struct_op
 import casadi.tools as cas
+import numpy as np
+import logging
 
 class Simulation:
     def __init__(self, options):
@@ -38,16 +40,21 @@ class Simulation:
         self.__outputs = None
 
     def build_integrator(self, options, model):
-        print('Building integrator...')
+        logging.info('Building integrator...')
 
         # get model variables
         variables = model.variables
         # construct the DAE variables
         x = cas.struct_SX([cas.entry('xd', expr = variables['xd'])]) # differential states
-        z = cas.struct_SX([cas.entry('xddot', expr = variables['xddot']), # state derivatives
-                       cas.entry('xa', expr = variables['xa']), # algebraic variables
-                       cas.entry('xl', expr = variables['xl']), # lifted variables
-                      ])
+        if 'xl' in list(variables.keys()):
+            z = cas.struct_SX([cas.entry('xddot', expr = variables['xddot']), # state derivatives
+                           cas.entry('xa', expr = variables['xa']), # algebraic variables
+                           cas.entry('xl', expr = variables['xl']), # lifted variables
+                          ])
+        else:
+            z = cas.struct_SX([cas.entry('xddot', expr = variables['xddot']), # state derivatives
+                           cas.entry('xa', expr = variables['xa']), # algebraic variables
+                          ])
         p = cas.struct_SX([cas.entry('u', expr = variables['u']), # dae parameters
                        cas.entry('theta', expr = variables['theta']),
                        cas.entry('phi', expr = model.parameters)])
@@ -83,6 +90,29 @@ class Simulation:
             self.__z = z
             self.__p = p
 
+            # integrate one control interval in a single call
+            self.__interval = self.__build_interval_function()
+
+    def __build_interval_function(self):
+        """Accumulate all integrator steps of one control interval with mapaccum.
+
+        @return Function (xz0, p) -> (xz_end, XZ) of the stacked states and algebraic variables
+        """
+
+        nx = self.__x.cat.shape[0]
+
+        xz0 = cas.MX.sym('xz0', nx + self.__z.cat.shape[0])
+        p_sim = cas.MX.sym('p', self.__p.cat.shape[0])
+
+        # all N_sim integrator steps of 1/N_sim cover the full interval (earlier versions stopped after N_sim-1 steps)
+        # the algebraic variables of one step serve as initial guess for the next one
+        res = self.__integrator(x0 = xz0[:nx], p = p_sim, z0 = xz0[nx:])
+        step_fun = cas.Function('step_fun', [xz0, p_sim], [cas.vertcat(res['xf'], res['zf'])])
+
+        XZ = step_fun.mapaccum('step_acc', self.__N_sim)(xz0, cas.repmat(p_sim, 1, self.__N_sim))
+
+        return cas.Function('interval', [xz0, p_sim], [XZ[:, -1], XZ], ['xz0', 'p'], ['xz_end', 'XZ'])
+
     def run(self, x0, u_sim, theta_sim, phi_sim):
         # check consistency of initial conditions:
         # to do: check values of g, gdot...
@@ -92,83 +122,72 @@ class Simulation:
         else:
             # horizon length
             N = len(u_sim)
+            N_sim = self.__N_sim
+            nx = self.__x.cat.shape[0]
 
-            # V_sim / simulation output structure
-            V_sim = cas.struct_symMX([
-            (
-                cas.entry('xd', repeat=[N, self.__N_sim],   struct=self.__variables_dict['xd']),
-                cas.entry('xa', repeat=[N, self.__N_sim-1], struct=self.__variables_dict['xa']),
-                cas.entry('xl', repeat=[N, self.__N_sim-1], struct=self.__variables_dict['xl']),
-                cas.entry('u', repeat=[N], struct=self.__variables_dict['u']),
-            ),
-            cas.entry('theta', struct=self.__variables_dict['theta']),
-            cas.entry('phi', struct=self.__phi)
-            ])
-
-            # initialize solution vector
-            V0 = V_sim(0.)
-
-            # fill in controls and parameters
-            for i in range(N):
-                for name in list(self.__variables_dict['u'].keys()):
-                    V0['u',i,name] = self.__variables_dict['u'](u_sim[i])[name]
-            V0['theta'] = theta_sim
             # adjust time-scaling factor for integrator step size
-            V0['theta','t_f'] = V0['theta','t_f'] / N
-            V0['phi'] = phi_sim
-
-            # integrate / fill in states and alg vars
+            theta = self.__variables_dict['theta'](theta_sim)
+            t_f = float(theta['t_f'])
+            theta['t_f'] = theta['t_f'] / N
 
-            # initial state
-            x_sim = self.__x(x0)['xd']
-            z_sim = self.__z(0.0)
+            # dae parameters of all control intervals
+            P = cas.DM.zeros(self.__p.cat.shape[0], N)
             for i in range(N):
-
-                # dae parameters for this time step
                 p_sim = self.__p(0.)
                 p_sim['u'] = u_sim[i]
-                p_sim['theta'] = V0['theta']
-                p_sim['phi'] = V0['phi']
-
-                # state on initial time of shooting node
-                for name in list(self.__variables_dict['xd'].keys()):
-                    V0['xd',i,0,name] = self.__variables_dict['xd'](x_sim)[name]
+                p_sim['theta'] = theta.cat
+                p_sim['phi'] = phi_sim
+                P[:, i] = p_sim.cat
+
+            # integrate all control intervals in one call
+            horizon = self.__interval.mapaccum('horizon', N)
+            xz0 = cas.vertcat(self.__x(x0)['xd'], self.__z(0.0).cat)
+            XZ = horizon(xz0, P)[1].full()
+
+            # fill in preallocated states and alg vars
+            results = {}
+            results['time'] = np.linspace(0., t_f, N * N_sim + 1)
+            results['xd'] = np.zeros((nx, N * N_sim + 1))
+            results['xd'][:, 0] = np.array(self.__x(x0)['xd']).flatten()
+            results['xd'][:, 1:] = XZ[:nx, :]
+            for name in list(self.__z.keys()):
+                results[name] = XZ[nx + np.array(self.__z.f[name], dtype=int), :]
+            results['u'] = np.array(cas.horzcat(*u_sim))
+            results['p'] = P.full()
 
-                # integrate up to (including) the final time of the shooting node
-                for j in range(self.__N_sim-1):
-                    print(j)
-                    ### TESTING
-                    # [ode_test, alg_test] = self.__f(x_sim,0.,p_sim.cat)
-                    # z_test = self.__rootfinder(0.,x_sim,p_sim.cat)
-                    # xddot_test = self.__variables_dict['xddot'](self.__z(z_test)['xddot'])
+            self.__status = 'I am a simulation.'
+            self.__results = results
+            self.__theta_sim = theta
+            self.__phi_sim = phi_sim
+            logging.info('Simulation solved.')
 
-                    # perform integration
-                    res = self.__integrator(x0= x_sim, p = p_sim.cat, z0 = z_sim.cat)
+            return None
 
-                    # set new initial guess for algebraic variable
-                    z_sim = self.__z(res['zf'])
 
-                    # set algebraic variables
-                    for name in list(self.__variables_dict['xa'].keys()):
-                        V0['xa',i,j,name] = self.__variables_dict['xa'](z_sim['xa'])[name]
-                    # set lifted variables
-                    for name in list(self.__variables_dict['xl'].keys()):
-                        V0['xl',i,j,name] = self.__variables_dict['xl'](z_sim['xl'])[name]
+    def step(self, x0, u, theta, phi, z0 = None):
+        """Integrate the system over one control interval, whose duration is given by theta['t_f'].
 
-                    # set-up next state
-                    x_sim = self.__x(res['xf'])['xd']
+        @param x0 differential states at the start of the interval
+        @param u controls applied over the interval
+        @param theta free parameters of the model
+        @param phi model parameters
+        @param z0 initial guess for the algebraic variables
+        @return differential states and algebraic variables at the end of the interval
+        """
 
-                    # set differential states
-                    for name in list(self.__variables_dict['xd'].keys()):
-                        V0['xd',i,j+1,name] = self.__variables_dict['xd'](x_sim)[name]
+        # dae parameters for this interval
+        p_sim = self.__p(0.)
+        p_sim['u'] = u
+        p_sim['theta'] = theta
+        p_sim['phi'] = phi
 
+        if z0 is None:
+            z0 = self.__z(0.).cat
 
-            self.__status = 'I am a simulation.'
-            self.__V0 = V0
-            print('Simulation solved.')
-
-            return None
+        nx = self.__x.cat.shape[0]
+        xz_end = self.__interval(cas.vertcat(x0, z0), p_sim.cat)[0]
 
+        return xz_end[:nx], xz_end[nx:]
 
     @property
     def status(self):
@@ -178,14 +197,59 @@ class Simulation:
     def status(self, value):
         print('Cannot set status object.')
 
+    def __build_V0(self):
+        """Fill the simulation results into the symbolic output structure of earlier versions.
+
+        @return V0 structure with differential states at the start of every integrator step and algebraic
+                variables at the end of all but the last integrator step of every control interval
+        """
+
+        N = self.__results['u'].shape[1]
+        N_sim = self.__N_sim
+
+        entries = [cas.entry('xd', repeat=[N, N_sim], struct=self.__variables_dict['xd'])]
+        for name in ['xa', 'xl']:
+            if name in list(self.__z.keys()):
+                entries += [cas.entry(name, repeat=[N, N_sim-1], struct=self.__variables_dict[name])]
+        entries += [cas.entry('u', repeat=[N], struct=self.__variables_dict['u'])]
+
+        V_sim = cas.struct_symMX([
+            tuple(entries),
+            cas.entry('theta', struct=self.__variables_dict['theta']),
+            cas.entry('phi', struct=self.__phi)
+            ])
+
+        V0 = V_sim(0.)
+        for i in range(N):
+            V0['u', i] = self.__results['u'][:, i]
+            for j in range(N_sim):
+                V0['xd', i, j] = self.__results['xd'][:, i * N_sim + j]
+            for j in range(N_sim-1):
+                for name in ['xa', 'xl']:
+                    if name in list(self.__z.keys()):
+                        V0[name, i, j] = self.__results[name][:, i * N_sim + j]
+        V0['theta'] = self.__theta_sim
+        V0['phi'] = self.__phi_sim
+
+        return V0
+
     @property
     def V0(self):
-        return self.__V0
+        logging.warning('Simulation.V0 is deprecated, use Simulation.results instead.')
+        return self.__build_V0()
 
     @V0.setter
     def V0(self, value):
         print('Cannot set V0 object')
 
+    @property
+    def results(self):
+        return self.__results
+
+    @results.setter
+    def results(self, value):
+        print('Cannot set results object')
+
     @property
     def f(self):
         return self.__f
@@ -244,7 +308,8 @@ class Simulation:
 
 def scale_xddot(variables):
 
-    time_scaled_variables = variables(variables.cat)
+    # copy the expression, so that the model variables are not modified in place
+    time_scaled_variables = variables(cas.SX(variables.cat))
     for name in struct_op.subkeys(variables, 'xddot'):
         time_scaled_variables['xddot',name] = variables['xddot',name]/variables['theta','t_f']
 
@@ -0,0 +1,98 @@
+#
+#    This file is part of awebox.
+#
+#    awebox -- A modeling and optimization framework for multi-kite AWE systems.
+#    Copyright (C) 2017-2019 Jochem De Schutter, Rachel Leuthold, Moritz Diehl,
+#                            ALU Freiburg.
+#    Copyright (C) 2018-2019 Thilo Bronnenmeyer, Kiteswarms Ltd.
+#    Copyright (C) 2016      Elena Malz, Sebastien Gros, Chalmers UT.
+#
+#    awebox is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 3 of the License, or (at your option) any later version.
+#
+#    awebox is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with awebox; if not, write to the Free Software Foundation,
+#    Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+'''
+file to provide code generation operations to the awebox,
+compiled functions are cached on disk and shared between trials
+_python-3.5 / casadi-3.4.5
+'''
+
+import casadi.tools as cas
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+
+def get_cache_directory(options):
+
+    cache_dir = options['cache_dir']
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'awebox_codegen')
+
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+
+    return cache_dir
+
+def get_compiled_function(fun, options):
+    """Load a function from a compiled shared library, that is generated and compiled on first use.
+
+    The library is keyed by a hash of the generated source of the function, so that every later trial
+    with identical model functions loads the library without compilation. Besides the function itself,
+    the library contains its first and second order derivatives, as required by the nlp solver.
+
+    @param fun casadi function to be compiled
+    @param options code generation options
+    @return external function
+    """
+
+    name = fun.name()
+
+    # the derivatives follow from the function, so the nominal source identifies the library
+    codegen = cas.CodeGenerator(name + '.c')
+    codegen.add(fun)
+    source = codegen.dump()
+
+    key = hashlib.sha1((source + options['compiler'] + options['flags']).encode()).hexdigest()
+    cache_dir = get_cache_directory(options)
+    library = os.path.join(cache_dir, name + '_' + key[:16] + '.so')
+
+    if os.path.isfile(library):
+        logging.info('load compiled function ' + name + ' from cache...')
+    else:
+        logging.info('compile function ' + name + '...')
+
+        jacobian = fun.jacobian()
+        codegen = cas.CodeGenerator(name + '.c')
+        codegen.add(fun)
+        codegen.add(jacobian)
+        codegen.add(jacobian.jacobian())
+
+        # compile into a process-specific file first, so that parallel sweep workers do not load half-written libraries
+        stem = os.path.join(cache_dir, name + '_' + key[:16] + '_' + str(os.getpid()))
+        with open(stem + '.c', 'w') as source_file:
+            source_file.write(codegen.dump())
+
+        command = [options['compiler']] + options['flags'].split() + ['-fPIC', '-shared', stem + '.c', '-o', stem + '.so']
+        try:
+            subprocess.check_call(command)
+        except (OSError, subprocess.CalledProcessError) as error:
+            raise RuntimeError('compilation of function ' + name + ' failed: ' + str(error))
+        finally:
+            os.remove(stem + '.c')
+
+        os.replace(stem + '.so', library)
+
+    return cas.external(name, library)
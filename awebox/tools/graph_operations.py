@@ -0,0 +1,171 @@
+#
+#    This file is part of awebox.
+#
+#    awebox -- A modeling and optimization framework for multi-kite AWE systems.
+#    Copyright (C) 2017-2019 Jochem De Schutter, Rachel Leuthold, Moritz Diehl,
+#                            ALU Freiburg.
+#    Copyright (C) 2018-2019 Thilo Bronnenmeyer, Kiteswarms Ltd.
+#    Copyright (C) 2016      Elena Malz, Sebastien Gros, Chalmers UT.
+#
+#    awebox is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 3 of the License, or (at your option) any later version.
+#
+#    awebox is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with awebox; if not, write to the Free Software Foundation,
+#    Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+#
+#
+'''
+file to provide expression graph operations to the awebox,
+i.e. simplification and size/timing statistics of casadi functions
+_python-3.5 / casadi-3.4.5
+'''
+
+import casadi.tools as cas
+import logging
+import time
+
+def eliminate_common_subexpressions(fun):
+    """Rebuild an SX function such that every distinct operation on the same arguments is computed only once.
+
+    The algorithm of the function is replayed instruction by instruction, and every new operation is looked up
+    in a table of the operations built so far (hash-consing), bottom-up. Repeated computations of e.g. norms,
+    rotations or apparent velocities in several output categories are thereby merged.
+
+    @param fun SX function
+    @return SX function with the same inputs and outputs
+    """
+
+    commutative = [cas.OP_ADD, cas.OP_MUL]
+
+    inputs = fun.sx_in()
+    outputs = [cas.SX(fun.sparsity_out(idx)) for idx in range(fun.n_out())]
+
+    work = {}
+    table = {}
+    for k in range(fun.n_instructions()):
+        op = fun.instruction_id(k)
+        arg = fun.instruction_input(k)
+        res = fun.instruction_output(k)
+
+        if op == cas.OP_INPUT:
+            work[res[0]] = inputs[arg[0]].nz[arg[1]]
+
+        elif op == cas.OP_OUTPUT:
+            outputs[res[0]].nz[res[1]] = work[arg[0]]
+
+        elif op == cas.OP_CONST:
+            value = fun.instruction_constant(k)
+            key = (op, value)
+            if key not in table:
+                table[key] = cas.SX(value)
+            work[res[0]] = table[key]
+
+        else:
+            deps = [work[idx] for idx in arg]
+            hashes = [dep.element_hash() for dep in deps]
+            if op in commutative:
+                hashes = sorted(hashes)
+            key = (op,) + tuple(hashes)
+            if key not in table:
+                if len(deps) == 1:
+                    table[key] = cas.SX.unary(op, deps[0])
+                else:
+                    table[key] = cas.SX.binary(op, deps[0], deps[1])
+            work[res[0]] = table[key]
+
+    return cas.Function(fun.name(), inputs, outputs, fun.name_in(), fun.name_out())
+
+def simplify_function(fun, expand = True, n_eval = 10):
+    """Expand a function to SX (where possible and faster) and eliminate common subexpressions.
+
+    @param fun casadi function
+    @param expand try to expand MX functions to SX
+    @param n_eval number of evaluations to compare the evaluation time of the expanded function over
+    @return simplified function, or the original function if it can not be simplified
+    """
+
+    if fun.is_a('SXFunction'):
+        return eliminate_common_subexpressions(fun)
+
+    if not expand:
+        return fun
+
+    try:
+        expanded = eliminate_common_subexpressions(fun.expand())
+    except RuntimeError:
+        # e.g. integrators or compiled functions do not support eval_sx
+        logging.info('function ' + fun.name() + ' can not be expanded to SX.')
+        return fun
+
+    if get_evaluation_time(expanded, n_eval) < get_evaluation_time(fun, n_eval):
+        return expanded
+    else:
+        return fun
+
+def get_evaluation_time(fun, n_eval = 10):
+    """Average wall time of a numerical evaluation of a function.
+    """
+
+    args = [cas.DM.ones(fun.sparsity_in(idx)) for idx in range(fun.n_in())]
+
+    fun(*args)
+    timer = time.time()
+    for _ in range(n_eval):
+        fun(*args)
+
+    return (time.time() - timer) / n_eval
+
+def get_function_statistics(fun, n_eval = 10):
+    """Graph size and evaluation time of a function.
+
+    @param fun casadi function
+    @param n_eval number of evaluations to average the evaluation time over
+    @return dict of node count, instruction count and evaluation time
+    """
+
+    statistics = {}
+    statistics['n_nodes'] = fun.n_nodes()
+    statistics['n_instructions'] = fun.n_instructions()
+    statistics['t_eval'] = get_evaluation_time(fun, n_eval)
+
+    return statistics
+
+def simplify_functions(functions, expand = True, n_eval = 10):
+    """Simplify a dict of functions and report their statistics before and after.
+
+    @param functions dict of casadi functions
+    @param expand try to expand MX functions to SX
+    @param n_eval number of evaluations to average the evaluation time over
+    @return dict of simplified functions and dict of statistics ('before' and 'after') per function
+    """
+
+    simplified = {}
+    statistics = {}
+    for name in list(functions.keys()):
+        statistics[name] = {}
+        statistics[name]['before'] = get_function_statistics(functions[name], n_eval)
+        simplified[name] = simplify_function(functions[name], expand, n_eval)
+        statistics[name]['after'] = get_function_statistics(simplified[name], n_eval)
+
+    log_function_statistics(statistics)
+
+    return simplified, statistics
+
+def log_function_statistics(statistics):
+
+    logging.info('{:<32} {:>12} {:>12} {:>12} {:>12}'.format('function', 'nodes', 'instructions', 't_eval [ms]', 'change [%]'))
+    for name in list(statistics.keys()):
+        for stage in ['before', 'after']:
+            stats = statistics[name][stage]
+            change = 100. * (stats['n_instructions'] - statistics[name]['before']['n_instructions']) / max(statistics[name]['before']['n_instructions'], 1)
+            logging.info('{:<32} {:>12} {:>12} {:>12.4f} {:>12.1f}'.format(name + ' (' + stage + ')', stats['n_nodes'], stats['n_instructions'], 1e3 * stats['t_eval'], change))
+
+    return None
@@ -335,26 +335,30 @@ def calculate_tf(params, V, k):
 
     return tf
 
-def calculate_kdx(params, V, t):
+def get_interval_fractions(params):
 
     n_k = params['n_k']
 
-    if params['phase_fix'] == True:
-        k_reelout = round(n_k * params['phase_fix_reelout'])
-        t_reelout = k_reelout*V['theta','t_f',0]/n_k
-        if t <= t_reelout:
-            kdx = int(n_k * t / V['theta','t_f',0])
-            tau = t / V['theta', 't_f',0]*n_k - kdx
-        else:
-            kdx = int(k_reelout + int(n_k * (t - t_reelout) / V['theta','t_f',1]))
-            tau = (t - t_reelout)/ V['theta','t_f',1]*n_k - (kdx-k_reelout)
+    # each interval lasts its fraction times the time constant of its phase
+    if params['interval_fractions'] is None:
+        fractions = np.ones(n_k) / float(n_k)
     else:
-        kdx = int(n_k * t / V['theta','t_f'])
-        tau = t / V['theta', 't_f']*n_k - kdx
+        fractions = np.array(params['interval_fractions'], dtype=float).flatten()
+
+    return fractions
+
+def calculate_kdx(params, V, t):
+
+    n_k = params['n_k']
+    fractions = get_interval_fractions(params)
+
+    # interval durations and node times of the (possibly non-uniform) grid
+    durations = np.array([fractions[k] * float(calculate_tf(params, V, k)) for k in range(n_k)])
+    t_nodes = np.append(0., np.cumsum(durations))
 
-    if kdx == n_k:
-        kdx = n_k - 1
-        tau = 1.0
+    kdx = int(np.searchsorted(t_nodes, t, side='right')) - 1
+    kdx = min(max(kdx, 0), n_k - 1)
+    tau = (t - t_nodes[kdx]) / durations[kdx]
 
     return kdx, tau
 
@@ -480,6 +484,20 @@ def get_node_variable_name(name):
 
     return var_name
 
+def get_permuted_variable_name(name, permutation, parent_map):
+    """Name of the same variable on the node that the node permutation maps the node of the variable onto.
+    Variables that do not belong to a permuted node keep their name.
+    """
+
+    var_name = get_node_variable_name(name)
+    node_str = name[len(var_name):]
+
+    for node in list(permutation.keys()):
+        if node_str == str(node) + str(parent_map[node]):
+            return var_name + str(permutation[node]) + str(parent_map[node])
+
+    return name
+
 def get_scaling_name(scaling_options, variable_type, name):
 
     scaling_name = name
@@ -784,11 +802,14 @@ def strip_of_contents(d):
     
     return stripped_d
 
-def evaluate_cost_dict(cost_fun, V_plot, p_fix_num):
+def evaluate_cost_dict(cost_fun, cost_struct, V_plot, p_fix_num):
+
+    # single evaluation of the fused component cost function
+    cost_vals = cost_struct(cost_fun(V_plot, p_fix_num))
 
     cost = {}
-    for name in list(cost_fun.keys()):
+    for name in list(cost_struct.keys()):
         if 'problem' not in name and 'objective' not in name:
-            cost[name[:-4]] = cost_fun[name](V_plot, p_fix_num)
+            cost[name] = cost_vals[name]
 
     return cost
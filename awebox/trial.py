@@ -31,6 +31,7 @@ import awebox.tools.print_operations as print_op
 import awebox.trial_funcs as trial_funcs
 import awebox.ocp.nlp as nlp
 import awebox.opti.optimization as optimization
+import awebox.opti.solution_library as solution_library
 import awebox.sim as sim
 import awebox.mdl.model as model
 import awebox.mdl.architecture as archi
@@ -40,8 +41,10 @@ import awebox.quality as quality
 import awebox.tools.data_saving as data_tools
 import awebox.opts.options as options
 import awebox.tools.struct_operations as struct_op
+import casadi.tools as cas
 import logging
 import copy
+import multiprocessing
 
 class Trial(object):
     __isfrozen = False
@@ -82,6 +85,8 @@ class Trial(object):
             self.__timings        = {}
             self.__solution_dict  = {}
             self.__save_flag      = False
+            self.__multi_start_summary = None
+            self.__validation     = None
 
             self.__return_status_numeric = -1
 
@@ -112,17 +117,24 @@ class Trial(object):
 
     def optimize(self, options = [], final_homotopy_step = 'final',
                  warmstart_file = None, debug_flags = [],
-                 debug_locations = [], save_flag = False):
+                 debug_locations = [], save_flag = False, multi_start = False):
 
         if not options:
             options = self.__options
 
+        if multi_start:
+            self.__optimize_multi_start(options, final_homotopy_step, save_flag)
+            return None
+
         # get save_flag
         self.__save_flag = save_flag
 
         logging.info('Optimizing trial (%s) ...', self.__name)
         logging.info('')
 
+        # the re-integration of a previous solution is outdated
+        self.__validation = None
+
         self.__optimization.solve(options['solver'], self.__nlp, self.__model,
                                   self.__formulation, self.__visualization,
                                   final_homotopy_step, warmstart_file,
@@ -142,8 +154,8 @@ class Trial(object):
 
             logging.info('WARNING: Optimization of Trial (%s) failed.', self.__name)
 
-        cost_fun = self.nlp.cost_components[0]
-        cost = struct_op.evaluate_cost_dict(cost_fun, self.optimization.V_opt, self.optimization.p_fix_num)
+        [cost_fun, cost_struct] = self.nlp.cost_components
+        cost = struct_op.evaluate_cost_dict(cost_fun, cost_struct, self.optimization.V_opt, self.optimization.p_fix_num)
         self.visualization.recalibrate(self.optimization.V_opt, self.visualization.plot_dict, self.optimization.output_vals, self.optimization.integral_outputs_final, self.options, self.optimization.time_grids, cost, self.name)
 
         # perform quality check
@@ -155,6 +167,73 @@ class Trial(object):
 
         logging.info('')
 
+    def __optimize_multi_start(self, options, final_homotopy_step, save_flag):
+        """Solve the homotopy for initial guesses from a grid of initialization parameters,
+        concurrently in forked processes, and keep the converged solution with the best objective.
+
+        @param options trial options, whose multi-start options define the parameter grid
+        @param final_homotopy_step final homotopy step of all attempts
+        @param save_flag save the trial after the optimization
+        """
+
+        multi_start_options = options['solver']['multi_start']
+        grid = trial_funcs.generate_multi_start_grid(multi_start_options)
+        attempts = [(idx, attempt, trial_funcs.set_multi_start_options(options, attempt), final_homotopy_step)
+                    for idx, attempt in enumerate(grid)]
+
+        logging.info('Multi-start optimization of trial (%s) with %s attempts ...', self.__name, len(attempts))
+        logging.info('')
+
+        n_processes = min(multi_start_options['n_processes'], len(attempts))
+        if n_processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning('Concurrent multi-start attempts require forked processes: solving attempts sequentially.')
+            n_processes = 1
+
+        def enough_converged(results):
+            n_converged = len([summary for [summary, warmstart_solution] in results if summary['status'] == 'converged'])
+            return n_converged >= multi_start_options['n_converged']
+
+        # the attempts use the built trial, which the forked processes receive from the pool initializer
+        results = []
+        if n_processes > 1:
+            pool = multiprocessing.get_context('fork').Pool(n_processes, initializer = trial_funcs.initialize_multi_start_worker, initargs = (self,))
+            for result in pool.imap_unordered(trial_funcs.solve_multi_start_attempt_in_worker, attempts):
+                results += [result]
+                if enough_converged(results):
+                    break
+            # cancel the attempts that are still running or waiting
+            pool.terminate()
+            pool.join()
+        else:
+            for attempt in attempts:
+                results += [trial_funcs.solve_multi_start_attempt(self, attempt)]
+                if enough_converged(results):
+                    break
+
+        # summary of all attempts, including the cancelled ones
+        summary = [{'attempt': idx, 'parameters': attempt, 'status': 'cancelled'} for (idx, attempt, attempt_options, step) in attempts]
+        for [attempt_summary, warmstart_solution] in results:
+            summary[attempt_summary['attempt']] = attempt_summary
+        self.__multi_start_summary = summary
+
+        for attempt_summary in summary:
+            logging.info('Multi-start attempt %s %s: %s', attempt_summary['attempt'], attempt_summary['parameters'], attempt_summary['status'])
+
+        converged = [[attempt_summary, warmstart_solution] for [attempt_summary, warmstart_solution] in results
+                     if warmstart_solution is not None]
+
+        if converged:
+            # re-solve the best attempt from its solution, so that this trial holds it
+            [best_summary, best_solution] = min(converged, key = lambda result: result[0]['objective'])
+            logging.info('Best multi-start attempt: %s (objective: %s)', best_summary['attempt'], best_summary['objective'])
+            self.optimize(options = best_solution['options'], final_homotopy_step = final_homotopy_step,
+                          warmstart_file = best_solution, save_flag = save_flag)
+        else:
+            logging.warning('No multi-start attempt of trial ' + self.__name + ' converged: solving the first attempt.')
+            self.optimize(options = attempts[0][2], final_homotopy_step = final_homotopy_step, save_flag = save_flag)
+
+        return None
+
     def plot(self, flags, V_plot=None, cost=None, parametric_options=None, output_vals=None, sweep_toggle=False, fig_num = None):
 
         if V_plot is None:
@@ -260,8 +339,8 @@ class Trial(object):
         solution_dict['stats'] = self.__optimization.stats
         solution_dict['iterations'] = self.__optimization.iterations
         solution_dict['timings'] = self.__optimization.timings
-        cost_fun = self.__nlp.cost_components[0]
-        cost = struct_op.evaluate_cost_dict(cost_fun, self.__optimization.V_opt, self.__optimization.p_fix_num)
+        [cost_fun, cost_struct] = self.__nlp.cost_components
+        cost = struct_op.evaluate_cost_dict(cost_fun, cost_struct, self.__optimization.V_opt, self.__optimization.p_fix_num)
         solution_dict['cost'] = cost
 
         # warmstart data
@@ -272,6 +351,19 @@ class Trial(object):
 
         return solution_dict
 
+    def add_to_library(self, directory = None):
+        """Store the solution in a solution library, from which the library
+        initialization warm starts later trials.
+
+        @param directory directory of the solution library (default: from initialization options)
+        @return name of the stored solution
+        """
+
+        if directory is None:
+            directory = self.__options['solver']['initialization']['library']['directory']
+
+        return solution_library.SolutionLibrary(directory).add(self)
+
     def write_to_csv(self, file_name=None, frequency=30., rotation_representation='euler'):
 
         if file_name is None:
@@ -283,6 +375,182 @@ class Trial(object):
     def generate_optimal_model(self):
         return trial_funcs.generate_optimal_model(self)
 
+    def validate_trajectory(self):
+        self.__validation = trial_funcs.validate_trajectory(self, self.__options['quality']['reintegration'])
+        return self.__validation
+
+    def refine_mesh(self, final_homotopy_step = 'final'):
+        """Adaptively refine the control intervals of the solved trial: intervals whose
+        re-integration drift exceeds the tolerance are split, neighbouring intervals with
+        a tiny drift are merged, and the trial is re-solved on the new mesh from the
+        interpolated previous solution until the tolerance is met.
+
+        @param final_homotopy_step final homotopy step of the re-solved trials
+        @return list with the number of intervals and maximum drift of every iteration
+        """
+
+        refinement_options = self.__options['nlp']['mesh_refinement']
+        if self.__options['nlp']['discretization'] != 'direct_collocation':
+            raise ValueError('Mesh refinement is only supported for direct collocation.')
+
+        history = []
+        for iteration in range(refinement_options['max_iter'] + 1):
+
+            # re-use the re-integration of the quality check of this solution, if any
+            nlp_options = self.__options['nlp']
+            if self.__validation is not None:
+                validation = self.__validation
+            else:
+                validation = self.validate_trajectory()
+            history += [{'n_k': nlp_options['n_k'], 'max_drift': validation['max_drift']}]
+            logging.info('Mesh refinement iteration %s: n_k = %s, maximum drift = %s', iteration, nlp_options['n_k'], validation['max_drift'])
+
+            if validation['max_drift'] <= refinement_options['tol'] or iteration == refinement_options['max_iter']:
+                break
+
+            fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, validation['drift'], refinement_options)
+            if fractions is None:
+                logging.warning('Mesh refinement of trial ' + self.__name + ' stopped: refined mesh would exceed ' + str(refinement_options['n_k_max']) + ' intervals.')
+                break
+
+            # solution on the previous mesh
+            V_old = self.__optimization.V_opt
+            time_grids_old = self.__optimization.time_grids
+            t_f = self.__optimization.V_final['theta', 't_f']
+
+            # rebuild the discretization on the refined mesh with a copy of the options, model and formulation are kept
+            refined_options = copy.deepcopy(self.__options)
+            refined_options['nlp']['n_k'] = len(fractions)
+            refined_options['nlp']['interval_fractions'] = fractions
+            if nlp_options['phase_fix']:
+                refined_options['nlp']['phase_fix_reelout'] = n_k_reelout / float(len(fractions))
+            self.__options = refined_options
+            self.__nlp = nlp.NLP()
+            self.__optimization = optimization.Optimization()
+            self.__visualization = visualization.Visualization()
+            self.build(is_standalone_trial = False)
+
+            # warmstart from the interpolated previous solution
+            time_grids_new = {}
+            for grid in list(self.__nlp.time_grids.keys()):
+                time_grids_new[grid] = self.__nlp.time_grids[grid](t_f)
+            warmstart_solution = {}
+            warmstart_solution['options'] = self.__options
+            warmstart_solution['final_homotopy_step'] = final_homotopy_step
+            warmstart_solution['V_opt'] = trial_funcs.interpolate_solution(V_old, time_grids_old, self.__nlp, time_grids_new)
+            warmstart_solution['opt_arg'] = {'lam_x0': cas.DM.zeros(self.__nlp.V.cat.shape),
+                                             'lam_g0': cas.DM.zeros(self.__nlp.g.shape)}
+
+            self.optimize(final_homotopy_step = final_homotopy_step, warmstart_file = warmstart_solution)
+
+        return history
+
+    def verify_anticollision(self, final_homotopy_step = 'final'):
+        """Check the anticollision inequalities of the kite pairs that were left out of the model
+        (see model_bounds anticollision pair_selection) on the solution. Violated pairs are added to
+        the model, and the rebuilt trial is re-solved from the previous solution, until no left out pair is violated.
+
+        @param final_homotopy_step final homotopy step of the re-solved trials
+        @return list of the kite pairs added to the model
+        """
+
+        anticollision_options = self.__options['model']['model_bounds']['anticollision']
+
+        added_pairs = []
+        if not anticollision_options['include']:
+            logging.info('Anticollision verification of trial (%s): anticollision is not included in the model.', self.__name)
+            return added_pairs
+
+        violated_pairs = trial_funcs.find_violated_anticollision_pairs(self)
+        while violated_pairs:
+
+            logging.info('Anticollision verification of trial (%s): adding kite pairs %s', self.__name, violated_pairs)
+            added_pairs += violated_pairs
+            anticollision_options['added_pairs'] = list(anticollision_options['added_pairs']) + violated_pairs
+
+            # rebuild with the added inequalities, the variables are unchanged
+            V_old = self.__optimization.V_opt
+            self.__model = model.Model()
+            self.__formulation = formulation.Formulation()
+            self.__nlp = nlp.NLP()
+            self.__optimization = optimization.Optimization()
+            self.__visualization = visualization.Visualization()
+            self.build(is_standalone_trial = False)
+
+            # warmstart from the previous solution
+            V_init = self.__nlp.V(0.)
+            for name in list(V_old.keys()):
+                if name != 'us':
+                    V_init[name] = V_old[name]
+            warmstart_solution = {}
+            warmstart_solution['options'] = self.__options
+            warmstart_solution['final_homotopy_step'] = final_homotopy_step
+            warmstart_solution['V_opt'] = V_init
+            warmstart_solution['opt_arg'] = {'lam_x0': cas.DM.zeros(self.__nlp.V.cat.shape),
+                                             'lam_g0': cas.DM.zeros(self.__nlp.g.shape)}
+
+            self.optimize(final_homotopy_step = final_homotopy_step, warmstart_file = warmstart_solution)
+
+            violated_pairs = trial_funcs.find_violated_anticollision_pairs(self)
+
+        return added_pairs
+
+    def expand_symmetry(self, final_homotopy_step = 'initial_guess'):
+        """Expand the solution of a trial with sibling symmetry (see lift_mode sibling_symmetry), which
+        covers one of several equal parts of the period, to the full period. The trial is rebuilt for
+        the full period, with the expanded solution as its solution, so that it can be visualized and
+        exported as usual. Optionally, the full period problem is re-solved from the expanded solution.
+
+        @param final_homotopy_step final homotopy step of the re-solved trial ('initial_guess': no re-solve)
+        @return None
+        """
+
+        symmetry_options = copy.deepcopy(self.__options['formulation']['symmetry'])
+        if not symmetry_options['include']:
+            raise ValueError('Trial ' + self.__name + ' does not use sibling symmetry.')
+
+        copies = symmetry_options['copies']
+        V_part = self.__optimization.V_opt
+        part_homotopy_step = self.__optimization.final_homotopy_step
+
+        # the full period consists of all parts, closed by the usual periodicity condition
+        expanded_options = copy.deepcopy(self.__options)
+        lift_mode_options = expanded_options['user_options']['trajectory']['lift_mode']
+        lift_mode_options['sibling_symmetry'] = False
+        lift_mode_options['phase_fix'] = False
+        nlp_options = expanded_options['nlp']
+        nlp_options['n_k'] = copies * nlp_options['n_k']
+        if nlp_options['interval_fractions'] is not None:
+            nlp_options['interval_fractions'] = list(nlp_options['interval_fractions']) * copies
+        self.__options = expanded_options
+
+        # rebuild the formulation and discretization, the model is kept
+        self.__formulation = formulation.Formulation()
+        self.__nlp = nlp.NLP()
+        self.__optimization = optimization.Optimization()
+        self.__visualization = visualization.Visualization()
+        self.build(is_standalone_trial = False)
+
+        # the expanded solution serves as solution, or as warmstart of the re-solve
+        warmstart_solution = {}
+        warmstart_solution['options'] = self.__options
+        warmstart_solution['final_homotopy_step'] = part_homotopy_step
+        warmstart_solution['V_opt'] = trial_funcs.expand_symmetric_solution(V_part, self.__nlp, self.__model, symmetry_options)
+        warmstart_solution['opt_arg'] = {'lam_x0': cas.DM.zeros(self.__nlp.V.cat.shape),
+                                         'lam_g0': cas.DM.zeros(self.__nlp.g.shape)}
+
+        self.optimize(final_homotopy_step = final_homotopy_step, warmstart_file = warmstart_solution)
+
+        return None
+
+    @property
+    def multi_start_summary(self):
+        return self.__multi_start_summary
+
+    @multi_start_summary.setter
+    def multi_start_summary(self, value):
+        print('Cannot set multi_start_summary object.')
+
     @property
     def options(self):
         return self.__options
@@ -32,9 +32,14 @@ python version 3.5 / casadi 3.4.5
 
 import csv
 import collections
+import copy
+import itertools
+import time
 import awebox.tools.vector_operations as vect_op
 import awebox.tools.struct_operations as struct_op
 import awebox.viz.tools as tools
+import awebox.mdl.wind as wind
+import awebox.mdl.dynamics as dynamics
 import casadi.tools as cas
 import numpy as np
 import awebox.tools.struct_operations as struct_op
@@ -115,8 +120,8 @@ def interpolate_data(trial, freq):
     output_vals = trial.optimization.output_vals
     time_grids = trial.optimization.time_grids
     integral_outputs_final = trial.optimization.integral_outputs_final
-    cost_fun = trial.nlp.cost_components[0]
-    cost = struct_op.evaluate_cost_dict(cost_fun, V_plot, p_fix_num)
+    [cost_fun, cost_struct] = trial.nlp.cost_components
+    cost = struct_op.evaluate_cost_dict(cost_fun, cost_struct, V_plot, p_fix_num)
     name = trial.name
     parametric_options = trial.options
     plot_dict = tools.recalibrate_visualization(V_plot, plot_dict, output_vals, integral_outputs_final, parametric_options, time_grids, cost, name, N=N)
@@ -194,7 +199,9 @@ def generate_optimal_model(trial):
                         t_f = trial.optimization.V_opt['theta','t_f']
                         variables.append(cas.SX(t_f))
                     else:
-                        t_f = trial.visualization.plot_dict['output_vals'][1]['final', 'time_period', 'val']
+                        [final_struct, final_fun] = trial.nlp.get_output_group('final')
+                        final_outputs = final_struct(final_fun(trial.optimization.V_opt, trial.optimization.p_fix_num))
+                        t_f = final_outputs['final', 'time_period', 'val']
                         variables.append(cas.SX(t_f))
     variables = trial.model.variables(cas.vertcat(*variables))
 
@@ -279,3 +286,466 @@ def generate_var_bounds_fun(model):
 
     return cas.Function('var_bounds', [model.variables], [cas.vertcat(*var_constraints)])
 
+def evaluate_tether_drag_diagnostics(trial):
+    """
+    Evaluate all tether drag models on the shooting nodes of the optimal trajectory,
+    including the models that are not part of the dynamics.
+    :param trial: trial containing OCP solution and model information
+    :return: dict with the drag forces [N] and reynolds numbers of every tether segment, one column per node
+    """
+
+    nlp = trial.nlp
+    model = trial.model
+    V_opt = trial.optimization.V_opt
+    p_fix_num = trial.optimization.p_fix_num
+
+    diagnostics_fun = model.get_tether_drag_diagnostics_fun()
+    parameters = model.parameters(cas.vertcat(p_fix_num['theta0'], V_opt['phi']))
+    Xdot_opt = nlp.Xdot(nlp.Xdot_fun(V_opt))
+
+    diagnostics = {}
+    for kdx in range(nlp.n_k):
+        variables = struct_op.get_variables_at_time(nlp.options, V_opt, Xdot_opt, model, kdx)
+        node_diagnostics = diagnostics_fun(variables = variables, parameters = parameters)
+        for name in list(node_diagnostics.keys()):
+            if name not in list(diagnostics.keys()):
+                diagnostics[name] = []
+            diagnostics[name].append(node_diagnostics[name])
+
+    for name in list(diagnostics.keys()):
+        diagnostics[name] = np.array(cas.horzcat(*diagnostics[name]))
+
+    return diagnostics
+
+
+def find_violated_anticollision_pairs(trial):
+    """
+    Evaluate the anticollision inequalities of the kite pairs that were left out of the model on the solution.
+    :param trial: trial containing OCP solution and model information
+    :return: list of the left out kite pairs that come closer than the minimum distance
+    """
+
+    model = trial.model
+    architecture = model.architecture
+    V_opt = trial.optimization.V_opt
+    model_options = trial.options['model']
+
+    constrained_pairs = dynamics.get_anticollision_pairs(model_options, architecture)
+    dropped_pairs = [kite_pair for kite_pair in architecture.get_anticollision_pairs('all') if kite_pair not in constrained_pairs]
+    if not dropped_pairs:
+        return []
+
+    # kite positions on all interval and collocation nodes
+    positions = {}
+    for kite in architecture.kite_nodes:
+        name = 'q' + str(kite) + str(architecture.parent_map[kite])
+        q_nodes = V_opt['xd', :, name]
+        if 'coll_var' in list(V_opt.keys()):
+            for coll_nodes in V_opt['coll_var', :, :, 'xd', name]:
+                q_nodes = q_nodes + coll_nodes
+        positions[kite] = np.array(cas.horzcat(*q_nodes)) * model.scaling['xd'][name]
+
+    safety_factor = model_options['model_bounds']['anticollision']['safety_factor']
+    dist_min = safety_factor * float(trial.optimization.p_fix_num['theta0', 'geometry', 'b_ref'])
+
+    violated_pairs = []
+    for kite_pair in dropped_pairs:
+        dist = np.linalg.norm(positions[kite_pair[0]] - positions[kite_pair[1]], axis=0)
+        if np.min(dist) < dist_min:
+            violated_pairs += [kite_pair]
+
+    return violated_pairs
+
+def validate_trajectory(trial, options):
+    """
+    Re-integrate every control interval of the optimal trajectory, starting
+    from the node states, and compare the result with the next node.
+    :param trial: trial containing OCP solution and model information
+    :param options: integrator options
+    :return: dict containing the per-interval state drift and energy balance error
+    """
+
+    model = trial.model
+    nlp = trial.nlp
+    V_opt = trial.optimization.V_opt
+    p_fix_num = trial.optimization.p_fix_num
+    n_k = nlp.n_k
+
+    # the dynamics are those of generate_optimal_model, but theta and the model parameters are passed as
+    # dae parameters: so every interval gets its own duration (phase fix, non-uniform grids) and the
+    # parameters of the solution (incl. homotopy parameters) are used. One integration lasts theta['t_f']
+    model_dae = model.get_dae()
+    integrator = model_dae.build_integrator(options, 1.)
+    integrator_map = integrator.map('reintegration_map', options['parallelization'], n_k, [], [])
+
+    # interval durations of the (possibly non-uniform) time grid
+    tgrid_u = np.array(trial.optimization.time_grids['u']).flatten()
+    t_f = np.array(trial.optimization.time_grids['x']).flatten()[-1]
+    dt = np.diff(np.append(tgrid_u, t_f))
+
+    # initial states, algebraic variables and dae parameters of all intervals
+    parameters = model.parameters(cas.vertcat(p_fix_num['theta0'], V_opt['phi']))
+    Xdot_opt = nlp.Xdot(nlp.Xdot_fun(V_opt))
+    X0 = []
+    Z0 = []
+    P = []
+    for kdx in range(n_k):
+        var_at_time = struct_op.get_variables_at_time(nlp.options, V_opt, Xdot_opt, model, kdx)
+        var_at_time['theta', 't_f'] = dt[kdx] / model.scaling['theta']['t_f']
+        x, z, p = model_dae.fill_in_dae_variables(var_at_time, parameters)
+        X0 += [x.cat]
+        Z0 += [z.cat]
+        P += [p.cat]
+
+    res = integrator_map(x0 = cas.horzcat(*X0), z0 = cas.horzcat(*Z0), p = cas.horzcat(*P))
+    X_f = res['xf'].full()
+    X_nodes = np.array(cas.horzcat(*[V_opt['xd', kdx] for kdx in range(1, n_k+1)]))
+
+    # state drift at the end of every interval, relative to the magnitude of each scaled state
+    X_all = np.array(cas.horzcat(*V_opt['xd']))
+    state_magnitude = np.maximum(np.max(np.abs(X_all), axis=1), 1.)
+    drift = np.max(np.abs(X_f - X_nodes) / state_magnitude[:, None], axis=0)
+
+    # energy harvested in every interval
+    if 'e' in list(model.integral_outputs.keys()):
+        e_idx = model.integral_outputs.f['e'][0]
+        int_out = trial.optimization.integral_outputs_opt
+        energy_reint = res['qf'].full()[e_idx, :]
+        energy_opt = np.array([float(int_out['int_out', kdx+1, 'e'] - int_out['int_out', kdx, 'e']) for kdx in range(n_k)])
+        energy_scaling = model.integral_scaling['e']
+    else:
+        e_idx = model.variables_dict['xd'].f['e'][0]
+        X_start = np.array(cas.horzcat(*X0))
+        energy_reint = X_f[e_idx, :] - X_start[e_idx, :]
+        energy_opt = X_nodes[e_idx, :] - X_start[e_idx, :]
+        energy_scaling = model.scaling['xd']['e']
+
+    # energy error relative to the largest (scaled) energy contribution of one interval, at least one
+    energy_magnitude = max(np.max(np.abs(energy_opt)), 1.)
+    energy_error = np.abs(energy_reint - energy_opt) / energy_magnitude
+
+    validation = {}
+    validation['drift'] = drift
+    validation['max_drift'] = np.max(drift)
+    validation['energy'] = energy_reint * energy_scaling
+    validation['energy_error'] = energy_error
+    validation['max_energy_error'] = np.max(energy_error)
+    validation['xf'] = X_f
+
+    return validation
+
+def refine_interval_fractions(nlp_options, drift, options):
+    """
+    Split the control intervals with a large drift and merge neighbouring intervals with a tiny drift.
+    :param nlp_options: nlp options of the current mesh
+    :param drift: re-integration drift of every interval
+    :param options: mesh refinement options
+    :return: interval fractions of the refined mesh and its number of reel-out intervals,
+             None if the refined mesh would exceed the maximum number of intervals
+    """
+
+    n_k = nlp_options['n_k']
+    d = nlp_options['collocation']['d']
+    fractions = struct_op.get_interval_fractions(nlp_options)
+
+    # intervals of different phases are never merged
+    if nlp_options['phase_fix']:
+        n_k_reelout = round(n_k * nlp_options['phase_fix_reelout'])
+    else:
+        n_k_reelout = n_k
+
+    refined_fractions = []
+    refined_n_k_reelout = 0
+    kdx = 0
+    while kdx < n_k:
+
+        same_phase = (kdx + 1 < n_k) and ((kdx < n_k_reelout) == (kdx + 1 < n_k_reelout))
+        if same_phase and max(drift[kdx], drift[kdx + 1]) < options['coarsen_factor'] * options['tol']:
+            pieces = [fractions[kdx] + fractions[kdx + 1]]
+            n_merged = 2
+        elif drift[kdx] > options['tol']:
+            # the local error of the collocation polynomial scales with h^(d+1)
+            n_split = int(np.ceil((drift[kdx] / options['tol']) ** (1. / (d + 1))))
+            n_split = min(max(n_split, 2), options['max_split'])
+            pieces = [fractions[kdx] / n_split] * n_split
+            n_merged = 1
+        else:
+            pieces = [fractions[kdx]]
+            n_merged = 1
+
+        if kdx < n_k_reelout:
+            refined_n_k_reelout += len(pieces)
+        refined_fractions += [float(piece) for piece in pieces]
+        kdx += n_merged
+
+    if len(refined_fractions) > options['n_k_max']:
+        return None, None
+
+    return refined_fractions, refined_n_k_reelout
+
+def interpolate_solution(V_old, time_grids_old, nlp_new, time_grids_new):
+    """
+    Interpolate a direct collocation solution onto the time grids of another nlp.
+    :param V_old: solution on the previous mesh
+    :param time_grids_old: numerical time grids of the previous mesh
+    :param nlp_new: nlp on the new mesh
+    :param time_grids_new: numerical time grids of the new mesh
+    :return: decision variables of the new nlp
+    """
+
+    n_k_old = len(V_old['u'])
+    d = len(V_old['coll_var', 0])
+    n_k_new = nlp_new.n_k
+    V_new = nlp_new.V(0.)
+
+    for name in ['theta', 'phi', 'xi']:
+        if name in list(V_new.keys()):
+            V_new[name] = V_old[name]
+
+    tgrid_u_old = np.array(time_grids_old['u']).flatten()
+    tgrid_coll_old = np.array(time_grids_old['coll']).flatten()
+    tgrid_x_new = np.array(time_grids_new['x']).flatten()
+    tgrid_u_new = np.array(time_grids_new['u']).flatten()
+    tgrid_coll_new = np.array(time_grids_new['coll']).flatten()
+
+    def interpolate(t_new, t_old, values_old):
+        values_old = np.array(values_old)
+        return np.array([np.interp(t_new, t_old, values_old[idx, :]) for idx in range(values_old.shape[0])])
+
+    # differential states on interval and collocation nodes
+    tgrid_x_coll_old = np.array(time_grids_old['x_coll']).flatten()
+    xd_old = []
+    for kdx in range(n_k_old):
+        xd_old += [V_old['xd', kdx]] + [V_old['coll_var', kdx, jdx, 'xd'] for jdx in range(d)]
+    xd_old += [V_old['xd', -1]]
+    xd_old = cas.horzcat(*xd_old)
+    xd_new = interpolate(tgrid_x_new, tgrid_x_coll_old, xd_old)
+    xd_coll_new = interpolate(tgrid_coll_new, tgrid_x_coll_old, xd_old)
+    for kdx in range(n_k_new + 1):
+        V_new['xd', kdx] = xd_new[:, kdx]
+
+    # remaining collocation variables
+    for var_type in list(nlp_new.V.getStruct('coll_var').keys()):
+        if var_type == 'xd':
+            values_new = xd_coll_new
+        else:
+            values_old = cas.horzcat(*[V_old['coll_var', kdx, jdx, var_type] for kdx in range(n_k_old) for jdx in range(d)])
+            values_new = interpolate(tgrid_coll_new, tgrid_coll_old, values_old)
+        for kdx in range(n_k_new):
+            for jdx in range(d):
+                V_new['coll_var', kdx, jdx, var_type] = values_new[:, kdx * d + jdx]
+
+    # variables lifted on the interval nodes
+    for var_type in set(V_new.keys()) & set(['xddot', 'xa', 'xl']):
+        values_new = interpolate(tgrid_u_new, tgrid_u_old, cas.horzcat(*V_old[var_type]))
+        for kdx in range(n_k_new):
+            V_new[var_type, kdx] = values_new[:, kdx]
+
+    # piecewise constant controls
+    tgrid_mid_new = 0.5 * (tgrid_u_new + tgrid_x_new[1:])
+    for kdx in range(n_k_new):
+        kdx_old = min(max(int(np.searchsorted(tgrid_u_old, tgrid_mid_new[kdx], side='right')) - 1, 0), n_k_old - 1)
+        V_new['u', kdx] = V_old['u', kdx_old]
+
+    return V_new
+
+def expand_symmetric_solution(V_part, nlp_full, model, symmetry_options):
+    """
+    Expand a solution with sibling symmetry, which covers one of several equal parts of the period,
+    to the full period: during every following part, each kite follows the trajectory of the sibling
+    that the periodicity condition maps it onto.
+    :param V_part: solution of one part of the period
+    :param nlp_full: nlp of the full period
+    :param model: awebox model
+    :param symmetry_options: formulation symmetry options of the solution
+    :return: decision variables of the full period nlp
+    """
+
+    copies = symmetry_options['copies']
+    permutation = model.architecture.get_sibling_permutation(symmetry_options['shift'])
+    parent_map = model.architecture.parent_map
+    variables_dict = model.variables_dict
+
+    n_k = len(V_part['u'])
+    V_full = nlp_full.V(0.)
+
+    for name in ['theta', 'phi', 'xi']:
+        V_full[name] = V_part[name]
+    V_full['theta', 't_f'] = copies * V_part['theta', 't_f']
+
+    # the non-periodic states (e.g. the energy) accumulate over the parts
+    xd_increment = np.zeros(variables_dict['xd'].cat.shape[0])
+    for name in list(variables_dict['xd'].keys()):
+        if name[0] == 'e' or name[0] == 'w':
+            indices = variables_dict['xd'].f[name]
+            xd_increment[indices] = np.array(V_part['xd', -1] - V_part['xd', 0]).flatten()[indices]
+
+    # kites followed during the current part
+    node_map = {kite: kite for kite in list(permutation.keys())}
+    for part in range(copies):
+
+        # entry order of every variable type, such that each kite takes the values of the kite it follows
+        order = {}
+        for var_type in list(variables_dict.keys()):
+            order[var_type] = np.arange(variables_dict[var_type].cat.shape[0])
+            for name in list(variables_dict[var_type].keys()):
+                followed_name = struct_op.get_permuted_variable_name(name, node_map, parent_map)
+                order[var_type][variables_dict[var_type].f[name]] = variables_dict[var_type].f[followed_name]
+
+        offset = part * n_k
+        n_nodes = n_k + 1 if part == copies - 1 else n_k
+        for kdx in range(n_nodes):
+            V_full['xd', offset + kdx] = np.array(V_part['xd', kdx]).flatten()[order['xd']] + part * xd_increment
+
+        for var_type in set(V_full.keys()) & set(['u', 'xddot', 'xa', 'xl']):
+            for kdx in range(n_k):
+                V_full[var_type, offset + kdx] = np.array(V_part[var_type, kdx]).flatten()[order[var_type]]
+
+        # slack variables are named after the constraints and are repeated as they are
+        if 'us' in list(V_full.keys()):
+            for kdx in range(n_k):
+                V_full['us', offset + kdx] = V_part['us', kdx]
+
+        if 'coll_var' in list(V_full.keys()):
+            d = len(V_part['coll_var', 0])
+            for var_type in list(nlp_full.V.getStruct('coll_var').keys()):
+                for kdx in range(n_k):
+                    for jdx in range(d):
+                        values = np.array(V_part['coll_var', kdx, jdx, var_type]).flatten()[order[var_type]]
+                        if var_type == 'xd':
+                            values = values + part * xd_increment
+                        V_full['coll_var', offset + kdx, jdx, var_type] = values
+
+        node_map = {kite: permutation[node_map[kite]] for kite in list(node_map.keys())}
+
+    return V_full
+
+def generate_batch_parameters(trial, theta0_overrides):
+    """
+    Generate the parameter vectors of the solved trial for a batch of optimizations, e.g. for optimization.solve_batch
+    :param trial: trial with solved optimization
+    :param theta0_overrides: list of dicts, one per instance, that map the keys of a parameter below theta0
+                             (e.g. ('wind', 'u_ref')) onto its value in this instance
+    :return: list of parameter structures, one per instance
+    """
+
+    p_fix_num_batch = []
+    for overrides in theta0_overrides:
+        p_fix_num = trial.nlp.P(cas.DM(trial.optimization.p_fix_num))
+        for keys in list(overrides.keys()):
+            p_fix_num[('theta0',) + tuple(keys)] = overrides[keys]
+        p_fix_num_batch += [p_fix_num]
+
+    return p_fix_num_batch
+
+def generate_wind_datafile_parameters(trial, time_stamps):
+    """
+    Generate the parameter vectors of the solved trial for several time stamps of the wind data set,
+    e.g. to solve a whole year of wind profiles with optimization.solve_batch
+    :param trial: trial with datafile wind model and solved optimization
+    :param time_stamps: indices of the time stamps of the wind data set
+    :return: list of parameter structures, one per time stamp
+    """
+
+    wind_options = trial.options['user_options']['wind']
+    if wind_options['model'] != 'datafile':
+        raise ValueError('Wind parameters of time stamps are only available for the datafile wind model.')
+
+    heightsdata = wind_options['atmosphere_heightsdata']
+    featuresdata = wind_options['atmosphere_featuresdata']
+
+    theta0_overrides = []
+    for k in time_stamps:
+        profile = wind.get_datafile_profile(heightsdata, featuresdata, int(k))
+        theta0_overrides += [{('wind', 'datafile', name): profile[name] for name in ['heights', 'u_x', 'u_y']}]
+
+    return generate_batch_parameters(trial, theta0_overrides)
+
+def generate_multi_start_grid(options):
+    """
+    Generate the initial guess parameters of all attempts of a multi-start optimization
+    :param options: multi-start options
+    :return: list of dicts with the initial guess parameters of each attempt
+    """
+
+    names = [name for name in ['windings', 'l_t', 'cone_angle', 't_f'] if options[name] is not None]
+
+    # cartesian product of all specified parameter values (one nominal attempt if none are specified)
+    grid = []
+    for values in itertools.product(*[options[name] for name in names]):
+        grid += [dict(zip(names, values))]
+
+    return grid
+
+def set_multi_start_options(options, attempt):
+    """
+    Copy the options and insert the initial guess parameters of one multi-start attempt
+    :param options: trial options
+    :param attempt: initial guess parameters of the attempt
+    :return: options of the attempt
+    """
+
+    attempt_options = copy.deepcopy(options)
+    initialization = attempt_options['solver']['initialization']
+
+    if 'windings' in list(attempt.keys()):
+        initialization['windings'] = attempt['windings']
+    if 'l_t' in list(attempt.keys()):
+        initialization['xd']['l_t'] = attempt['l_t']
+    if 'cone_angle' in list(attempt.keys()):
+        initialization['max_cone_angle_single'] = attempt['cone_angle']
+        initialization['max_cone_angle_multi'] = attempt['cone_angle']
+    if 't_f' in list(attempt.keys()):
+        initialization['winding_period'] = attempt['t_f'] / float(initialization['windings'])
+
+    return attempt_options
+
+def solve_multi_start_attempt(trial, args):
+    """
+    Solve the homotopy of one multi-start attempt with a built trial
+    :param trial: built trial
+    :param args: index, initial guess parameters, options and final homotopy step of the attempt
+    :return: summary of the attempt and warmstart data of its solution
+    """
+
+    [idx, attempt, options, final_homotopy_step] = args
+
+    optimization = trial.optimization
+
+    summary = {'attempt': idx, 'parameters': attempt}
+    timer = time.time()
+    try:
+        optimization.solve(options['solver'], trial.nlp, trial.model, trial.formulation, trial.visualization, final_homotopy_step)
+    except Exception as error:
+        # a failing initial guess should not stop the other attempts
+        logging.warning('Multi-start attempt ' + str(idx) + ' raised an error: ' + str(error))
+        summary['status'] = 'error'
+        summary['time'] = time.time() - timer
+        return summary, None
+
+    summary['status'] = 'converged' if optimization.solve_succeeded else 'failed'
+    summary['return_status'] = optimization.stats['return_status']
+    summary['objective'] = float(optimization.solution['f'])
+    summary['iterations'] = optimization.iterations['optimization']
+    summary['time'] = time.time() - timer
+
+    warmstart_solution = None
+    if optimization.solve_succeeded:
+        warmstart_solution = {}
+        warmstart_solution['options'] = options
+        warmstart_solution['final_homotopy_step'] = final_homotopy_step
+        warmstart_solution['V_opt'] = trial.nlp.V(cas.DM(optimization.V_opt.cat))
+        warmstart_solution['opt_arg'] = {'lam_x0': optimization.solution['lam_x'],
+                                         'lam_g0': optimization.solution['lam_g']}
+
+    return summary, warmstart_solution
+
+# built trial of a multi-start pool process, handed over by the pool initializer
+worker_trial = None
+
+def initialize_multi_start_worker(trial):
+    global worker_trial
+    worker_trial = trial
+
+def solve_multi_start_attempt_in_worker(args):
+    return solve_multi_start_attempt(worker_trial, args)
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Test of the batch solve of an optimized trial for several parameter vectors
+"""
+
+import awebox as awe
+import awebox.opti.optimization as optimization
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import awebox.trial_funcs as trial_funcs
+import casadi as cas
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_solve_batch():
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['nlp']['n_k'] = 4
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['solver']['linear_solver'] = 'mumps'
+
+    trial = awe.Trial(options, 'batch')
+    trial.build()
+    trial.optimize(final_homotopy_step='initial')
+
+    # two instances with different reference wind speeds
+    u_ref = [5., 5.5]
+    p_fix_num_batch = trial_funcs.generate_batch_parameters(trial, [{('wind', 'u_ref'): value} for value in u_ref])
+    for idx in range(len(u_ref)):
+        assert float(p_fix_num_batch[idx]['theta0', 'wind', 'u_ref']) == u_ref[idx], 'reference wind speed of instance ' + str(idx)
+
+    objectives = {}
+    for parallelization in ['serial', 'process']:
+        batch_solution, batch_stats = trial.optimization.solve_batch(trial.options['solver'], trial.nlp, p_fix_num_batch,
+                                                                     parallelization = parallelization)
+
+        assert batch_stats['n_instances'] == 2, 'number of instances'
+        assert batch_stats['return_status'] == ['Solve_Succeeded', 'Solve_Succeeded'], 'return status of ' + parallelization + ' batch'
+        assert all(batch_stats['success']), 'success of ' + parallelization + ' batch'
+        assert max(batch_stats['constraint_violation']) < 1e-6, 'constraint violation of ' + parallelization + ' batch'
+        assert batch_solution['x'].shape == (trial.nlp.V.cat.shape[0], 2), 'solutions of ' + parallelization + ' batch'
+        objectives[parallelization] = np.array(batch_solution['f'])
+
+    assert np.allclose(objectives['serial'], objectives['process']), 'serial and process batch'
+
+def test_solve_batch_instance_in_worker():
+    """The instances of a process pool are solved with the solver of the pool initializer
+    """
+
+    x = cas.SX.sym('x')
+    p = cas.SX.sym('p')
+    solver = cas.nlpsol('solver', 'ipopt', {'x': x, 'p': p, 'f': (x - p)**2}, {'ipopt.print_level': 0, 'print_time': 0})
+
+    optimization.initialize_batch_worker(solver)
+    [instance_solution, instance_stats] = optimization.solve_batch_instance_in_worker({'x0': 0., 'p': 2.})
+
+    assert instance_stats['return_status'] == 'Solve_Succeeded', 'return status of instance'
+    assert abs(float(instance_solution['x']) - 2.) < 1e-6, 'solution of instance'
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Test of the initialization from the solution library
+"""
+
+import awebox as awe
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_library_initialization(tmp_path):
+    """Test that a trial with a compatible library solution skips the homotopy and needs fewer iterations,
+    and that a trial without one falls back to the default initial guess
+    """
+
+    directory = str(tmp_path)
+
+    trial = awe.Trial(generate_options(5., 'default', directory), 'library_entry')
+    trial.build()
+    trial.optimize()
+    trial.add_to_library()
+    iterations_homotopy = trial.optimization.iterations['optimization']
+
+    trial = awe.Trial(generate_options(6., 'library', directory), 'library_warmstart')
+    trial.build()
+    trial.optimize()
+    assert trial.optimization.solve_succeeded, 'convergence from the library solution'
+    assert list(trial.optimization.iterations.keys()) == ['optimization', 'final'], 'homotopy steps from the library solution'
+    assert trial.optimization.iterations['optimization'] < iterations_homotopy, 'iterations from the library solution'
+
+    # without a compatible solution, the homotopy starts from the default initial guess
+    trial = awe.Trial(generate_options(6., 'library', str(tmp_path / 'empty')), 'library_fallback')
+    trial.build()
+    trial.optimize(final_homotopy_step = 'initial')
+    assert trial.optimization.solve_succeeded, 'convergence without library solution'
+    assert 'initial' in list(trial.optimization.iterations.keys()), 'homotopy without library solution'
+
+def generate_options(u_ref, initialization_type, directory):
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['user_options']['wind']['u_ref'] = u_ref
+    options['nlp']['n_k'] = 10
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['solver']['linear_solver'] = 'mumps'
+    options['solver']['initialization']['initialization_type'] = initialization_type
+    options['solver']['initialization']['library']['directory'] = directory
+
+    return options
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""Test of the Monte Carlo simulation of perturbed closed-loop rollouts
+"""
+
+import awebox as awe
+import awebox.monte_carlo as monte_carlo
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_diverged_rollouts():
+    """Test that the statistics are reported, and not raised on, if all rollouts diverge
+    """
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['nlp']['n_k'] = 4
+    options['nlp']['integrator']['jit_overwrite'] = False
+
+    # initial states far off the trajectory
+    options['monte_carlo']['xd_std'] = 1e3
+    options['monte_carlo']['parallelization'] = 'serial'
+
+    trial = awe.Trial(options, 'monte_carlo')
+    trial.build()
+    trial.optimize(final_homotopy_step='initial_guess')
+
+    simulation = monte_carlo.MonteCarlo(trial.options['monte_carlo'])
+    simulation.build(trial)
+    results = simulation.run(N_samples = 3)
+
+    assert np.all(results['diverged']), 'diverged rollouts'
+    assert results['statistics']['diverged'] == 3, 'number of diverged rollouts'
+    for name in ['power', 'tether_force_max', 'constraint_violation']:
+        assert np.isnan(results['statistics'][name]['mean']), 'statistics of ' + name + ' without converged rollouts'
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""Test of the closed-loop tracking of a periodic reference with the MPC controller
+"""
+
+import awebox as awe
+import awebox.mpc as mpc
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_rti_closed_loop():
+    """Test that the real-time iterations succeed and keep the plant close to the reference
+    """
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['user_options']['trajectory']['lift_mode']['phase_fix'] = False
+    options['nlp']['n_k'] = 10
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['solver']['linear_solver'] = 'mumps'
+    options['mpc']['scheme'] = 'rti'
+
+    trial = awe.Trial(options, 'mpc')
+    trial.build()
+    trial.optimize()
+
+    controller = mpc.Mpc(trial.options['mpc'])
+    controller.build(trial)
+    results = controller.run(5)
+
+    assert len(results['return_status']) == 5, 'number of controller calls'
+    for return_status in results['return_status']:
+        assert return_status == 'Successful return.', 'qp status ' + return_status
+    assert results['tracking_error'][0] < 1e-8, 'initial state on the reference'
+    assert np.max(results['tracking_error']) < 0.1, 'closed-loop tracking error'
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Test of the multi-start optimization over a grid of initial guess parameters
+"""
+
+import awebox as awe
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_multi_start():
+    """Test that the trial keeps the converged attempt with the best objective,
+    both for sequential and concurrent attempts
+    """
+
+    for n_processes in [1, 2]:
+
+        options = awe.Options(True)
+        options['user_options']['system_model']['architecture'] = {1:0}
+        options['user_options']['system_model']['kite_dof'] = 3
+        options['user_options']['kite_standard'] = ampyx_data.data_dict()
+        options['user_options']['tether_drag_model'] = 'trivial'
+        options['user_options']['induction_model'] = 'not_in_use'
+        options['user_options']['trajectory']['lift_mode']['windings'] = 1
+        options['nlp']['n_k'] = 6
+        options['nlp']['integrator']['jit_overwrite'] = False
+        options['solver']['linear_solver'] = 'mumps'
+        options['solver']['multi_start']['l_t'] = [300., 500.]
+        options['solver']['multi_start']['n_processes'] = n_processes
+
+        trial = awe.Trial(options, 'multi_start')
+        trial.build()
+        trial.optimize(final_homotopy_step = 'initial', multi_start = True)
+
+        summary = trial.multi_start_summary
+        assert [attempt['parameters'] for attempt in summary] == [{'l_t': 300.}, {'l_t': 500.}], 'attempts of the grid'
+        assert all([attempt['status'] == 'converged' for attempt in summary]), 'status of the attempts'
+
+        best = min(summary, key = lambda attempt: attempt['objective'])
+        assert trial.optimization.solve_succeeded, 'convergence of the best attempt'
+        assert np.isclose(float(trial.optimization.solution['f']), best['objective'], rtol = 1e-3), 'objective of the kept solution'
+        assert trial.options['solver']['initialization']['xd']['l_t'] == best['parameters']['l_t'], 'initialization of the kept solution'
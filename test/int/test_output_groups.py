@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Test that the independently evaluated output groups match the full outputs of the nlp
+"""
+
+import awebox as awe
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_output_groups():
+
+    for discretization in ['direct_collocation', 'multiple_shooting']:
+
+        options = awe.Options(True)
+        options['user_options']['system_model']['architecture'] = {1:0}
+        options['user_options']['system_model']['kite_dof'] = 3
+        options['user_options']['kite_standard'] = ampyx_data.data_dict()
+        options['user_options']['tether_drag_model'] = 'trivial'
+        options['user_options']['induction_model'] = 'not_in_use'
+        options['user_options']['trajectory']['lift_mode']['windings'] = 1
+        options['nlp']['n_k'] = 4
+        options['nlp']['discretization'] = discretization
+        options['nlp']['integrator']['jit_overwrite'] = False
+
+        trial = awe.Trial(options, 'output_groups')
+        trial.build()
+        trial.optimize(final_homotopy_step='initial_guess')
+
+        # full outputs of the initial guess
+        outputs = trial.optimization.output_vals[0]
+        V_init = trial.nlp.V(trial.optimization.V_init)
+        p_fix_num = trial.optimization.p_fix_num
+
+        for group in ['performance', 'tether_length']:
+            [group_struct, group_fun] = trial.nlp.get_output_group(group)
+            group_outputs = group_struct(group_fun(V_init, p_fix_num))
+            for name in list(trial.model.outputs_dict[group].keys()):
+                if discretization == 'direct_collocation':
+                    expected = np.array(outputs['coll_outputs', :, :, group, name])
+                    values = np.array(group_outputs['coll_outputs', :, :, group, name])
+                else:
+                    expected = np.array(outputs['outputs', :, group, name])
+                    values = np.array(group_outputs['outputs', :, group, name])
+                assert np.allclose(values, expected), group + ' output ' + name + ' with ' + discretization
+
+        [final_struct, final_fun] = trial.nlp.get_output_group('final')
+        final_outputs = final_struct(final_fun(V_init, p_fix_num))
+        assert np.allclose(final_outputs['final'], outputs['final']), 'final outputs with ' + discretization
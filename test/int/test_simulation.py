@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""Test of the simulation of the initial guess with the system dynamics
+"""
+
+import awebox as awe
+import awebox.sim as sim
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_simulation(caplog):
+    """Test that integrating all control intervals at once matches integrating step by step,
+    and that the deprecated V0 structure holds the same results
+    """
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['user_options']['trajectory']['lift_mode']['phase_fix'] = False
+    options['nlp']['n_k'] = 4
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['simulation']['Nsim'] = 5
+
+    trial = awe.Trial(options, 'simulation')
+    trial.build()
+    trial.optimize(final_homotopy_step='initial_guess')
+
+    model = trial.model
+    V_init = trial.optimization.V_init
+    n_k = trial.nlp.n_k
+    u_sim = [V_init['u', k] for k in range(n_k)]
+    theta_sim = model.variables_dict['theta'](0.)
+    for name in list(model.variables_dict['theta'].keys()):
+        theta_sim[name] = V_init['theta', name]
+    phi_sim = model.parameters(np.concatenate([np.array(trial.optimization.p_fix_num['theta0']).flatten(), np.array(V_init['phi']).flatten()]))
+
+    simulation = sim.Simulation(trial.options['simulation'])
+    simulation.build_integrator(trial.options['simulation'], model)
+    simulation.run(V_init['xd', 0], u_sim, theta_sim, phi_sim)
+    results = simulation.results
+
+    N_sim = trial.options['simulation']['Nsim']
+    assert results['xd'].shape[1] == n_k * N_sim + 1, 'number of simulated states'
+    assert np.isclose(results['time'][-1], theta_sim['t_f']), 'simulated duration'
+    assert np.all(np.isfinite(results['xd'])), 'finite simulated states'
+
+    # N_sim integrator steps per control interval, the algebraic variables of every step initialize the next one
+    integrator = simulation._Simulation__integrator
+    x = results['xd'][:, 0]
+    z = np.zeros(results['xddot'].shape[0] + results['xa'].shape[0])
+    for k in range(n_k):
+        for j in range(N_sim):
+            res = integrator(x0 = x, z0 = z, p = results['p'][:, k])
+            x = np.array(res['xf']).flatten()
+            z = np.array(res['zf']).flatten()
+            assert np.allclose(results['xd'][:, k * N_sim + j + 1], x, rtol = 1e-6, atol = 1e-8), 'xd after step ' + str(j) + ' of interval ' + str(k)
+
+    with caplog.at_level(logging.WARNING):
+        V0 = simulation.V0
+    assert 'deprecated' in caplog.text, 'deprecation warning of V0'
+    for k in range(n_k):
+        assert np.allclose(np.array(V0['u', k]).flatten(), results['u'][:, k]), 'u of V0 in interval ' + str(k)
+        for j in range(N_sim):
+            assert np.allclose(np.array(V0['xd', k, j]).flatten(), results['xd'][:, k * N_sim + j]), 'xd of V0 in interval ' + str(k)
+        for j in range(N_sim - 1):
+            assert np.allclose(np.array(V0['xa', k, j]).flatten(), results['xa'][:, k * N_sim + j]), 'xa of V0 in interval ' + str(k)
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""Test of parametric sweeps that re-use the built trial
+"""
+
+import awebox as awe
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_bound_sweep():
+    """Test that sweeping over a system bound and the acceleration limit updates the variable bounds
+    and parameters of the nlp, without building another trial
+    """
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['nlp']['n_k'] = 4
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['solver']['linear_solver'] = 'mumps'
+
+    l_t_bounds = [[1.0e-2, 1.0e3], [1.0e-2, 800.]]
+    acc_max = [12., 8.]
+    sweep_opts = [(['model', 'system_bounds', 'xd', 'l_t'], l_t_bounds),
+                  (['model', 'model_bounds', 'acceleration', 'acc_max'], acc_max)]
+
+    sweep = awe.Sweep(name = 'bound_sweep', options = options, seed = sweep_opts)
+    sweep.run(final_homotopy_step = 'initial')
+
+    # both options are parametric: one trial is built and solved for all combinations
+    assert len(list(sweep.trial_dict.keys())) == 1, 'number of built trials'
+    trial_name = list(sweep.trial_dict.keys())[0]
+    single_trial = sweep.trial_dict[trial_name]
+    nlp = single_trial.nlp
+    l_t_scaling = float(single_trial.model.scaling['xd']['l_t'])
+    gravity = single_trial.options['model']['scaling']['other']['g']
+
+    assert len(list(sweep.sweep_dict[trial_name].keys())) == 4, 'number of parametric settings'
+    for param in list(sweep.param_dict.keys()):
+        param_values = dict([(tuple(keys), value) for [keys, value] in sweep.param_dict[param]])
+        l_t_bound = param_values[('model', 'system_bounds', 'xd', 'l_t')]
+        opt_arg = sweep.sweep_dict[trial_name][param]['opt_arg']
+
+        V_ub = nlp.V(opt_arg['ubx'])
+        V_lb = nlp.V(opt_arg['lbx'])
+        assert np.isclose(float(V_ub['xd', 1, 'l_t']), l_t_bound[1] / l_t_scaling), 'upper tether length bound of ' + param
+        assert np.isclose(float(V_lb['xd', 1, 'l_t']), l_t_bound[0] / l_t_scaling), 'lower tether length bound of ' + param
+
+        p_fix_num = nlp.P(opt_arg['p'])
+        expected_acc_max = param_values[('model', 'model_bounds', 'acceleration', 'acc_max')] * gravity
+        assert np.isclose(float(p_fix_num['theta0', 'model_bounds', 'acc_max']), expected_acc_max), 'acceleration limit of ' + param
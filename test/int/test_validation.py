@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Test of the re-integration of the optimal trajectory
+"""
+
+import awebox as awe
+import awebox.quality_funcs as quality_funcs
+import awebox.opts.kite_data.ampyx_data as ampyx_data
+import copy
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_validate_trajectory():
+    """Test that the re-integration of a converged trial drifts little, and that the quality test
+    only re-integrates if included
+    """
+
+    options = awe.Options(True)
+    options['user_options']['system_model']['architecture'] = {1:0}
+    options['user_options']['system_model']['kite_dof'] = 3
+    options['user_options']['kite_standard'] = ampyx_data.data_dict()
+    options['user_options']['tether_drag_model'] = 'trivial'
+    options['user_options']['induction_model'] = 'not_in_use'
+    options['user_options']['trajectory']['lift_mode']['windings'] = 1
+    options['nlp']['n_k'] = 10
+    options['nlp']['integrator']['jit_overwrite'] = False
+    options['solver']['linear_solver'] = 'mumps'
+
+    trial = awe.Trial(options, 'validation')
+    trial.build()
+    trial.optimize()
+    assert trial.optimization.stats['success'], 'convergence of the trial'
+
+    # the quality check does not re-integrate by default
+    assert not trial.options['quality']['reintegration']['include'], 'default of the re-integration test'
+    for name in ['reintegration_drift', 'reintegration_energy']:
+        assert name not in list(trial.quality.results.keys()), name + ' without re-integration'
+
+    validation = trial.validate_trajectory()
+    assert validation['drift'].shape[0] == trial.nlp.n_k, 'drift of every control interval'
+    assert validation['max_drift'] < trial.options['quality']['test_param']['max_reintegration_drift'], 'drift of the converged trial'
+    assert validation['max_energy_error'] < trial.options['quality']['test_param']['max_energy_error'], 'energy error of the converged trial'
+
+    test_param_dict = quality_funcs.generate_test_param_dict(trial.options['quality'])
+    assert quality_funcs.test_reintegration(trial, test_param_dict, {}) == {}, 'results of the excluded re-integration test'
+
+    test_param_dict['reintegration'] = copy.deepcopy(test_param_dict['reintegration'])
+    test_param_dict['reintegration']['include'] = True
+    results = quality_funcs.test_reintegration(trial, test_param_dict, {})
+    assert results['reintegration_drift'] and results['reintegration_energy'], 'results of the included re-integration test'
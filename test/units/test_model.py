@@ -7,6 +7,10 @@
 import awebox as awe
 import logging
 import awebox.mdl.architecture as archi
+import awebox.mdl.wind as wind
+import awebox.mdl.aero.tether_dir.tether_drag_coefficients as tether_drag_coefficients
+import casadi.tools as cas
+import numpy as np
 logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
 
 def test_architecture():
@@ -28,6 +32,100 @@ def test_architecture():
         assert test_archi.children_map    == architecture['children_map']   , 'children map of '+archi_name
         assert test_archi.kites_map       == architecture['kites_map']   , 'kite-children map of '+archi_name
 
+def test_anticollision_pairs():
+    """Test selection of the kite pairs that are subject to anticollision
+    """
+
+    all_pairs = {'single_kite': [],
+                 'dual_kites': [(2,3)],
+                 'three_layer_kites': [(2,3),(2,5),(2,7),(2,8),(3,5),(3,7),(3,8),(5,7),(5,8),(7,8)]}
+
+    # kites on the top and the bottom layer are separated by design
+    architecture_pairs = {'single_kite': [],
+                          'dual_kites': [(2,3)],
+                          'three_layer_kites': [(2,3),(2,5),(3,5),(5,7),(5,8),(7,8)]}
+
+    parent_maps = {'single_kite': {1:0},
+                   'dual_kites': {1:0, 2:1, 3:1},
+                   'three_layer_kites': {1:0, 2:1, 3:1, 4:1, 5:4, 6:4, 7:6, 8:6}}
+
+    for archi_name in list(parent_maps.keys()):
+
+        test_archi = archi.Architecture(parent_maps[archi_name])
+
+        assert test_archi.get_anticollision_pairs('all')          == all_pairs[archi_name]         , 'all anticollision pairs of '+archi_name
+        assert test_archi.get_anticollision_pairs('architecture') == architecture_pairs[archi_name], 'architecture anticollision pairs of '+archi_name
+
+def test_sibling_permutation():
+    """Test cyclic permutation of the sibling kites of every layer
+    """
+
+    parent_map = {1:0, 2:1, 3:1, 4:1, 5:1, 6:5, 7:5}
+    test_archi = archi.Architecture(parent_map)
+
+    assert test_archi.get_sibling_permutation(0) == {2:2, 3:3, 4:4, 6:6, 7:7}, 'sibling permutation without shift'
+    assert test_archi.get_sibling_permutation(1) == {2:3, 3:4, 4:2, 6:7, 7:6}, 'sibling permutation with shift 1'
+    assert test_archi.get_sibling_permutation(2) == {2:4, 3:2, 4:3, 6:6, 7:7}, 'sibling permutation with shift 2'
+
+    # kites without siblings are not permuted
+    test_archi = archi.Architecture({1:0})
+    assert test_archi.get_sibling_permutation(1) == {1:1}, 'sibling permutation of single kite'
+
+def test_datafile_spline():
+    """Test that the datafile wind spline reproduces the wind values at the heights of the pressure levels
+    """
+
+    np.random.seed(0)
+    heights = np.sort(100. + 1500. * np.random.rand(10))
+    values = 5. + np.random.randn(10)
+
+    spline_fun = wind.get_datafile_spline(heights.shape[0])
+
+    for height, value in zip(heights, values):
+        assert abs(float(spline_fun(height, heights, values)) - value) < 1e-8, 'spline value at height ' + str(height)
+
+    # linear extension above and below the height grid
+    lower = [float(spline_fun(heights[0] - delta, heights, values)) for delta in [10., 20.]]
+    upper = [float(spline_fun(heights[-1] + delta, heights, values)) for delta in [10., 20.]]
+    assert abs(2. * lower[0] - lower[1] - values[0]) < 1e-8, 'linear extension below the height grid'
+    assert abs(2. * upper[0] - upper[1] - values[-1]) < 1e-8, 'linear extension above the height grid'
+
+def test_tether_drag_spline():
+    """Test that the spline fit of the tether drag coefficient follows the achenbach datapoints,
+    and is held constant outside of the reynolds number range 1e2 < Re < 1e7
+    """
+
+    parameters = cas.struct_symSX([cas.entry('theta0', struct=cas.struct_symSX([
+        cas.entry('tether', struct=cas.struct_symSX([cas.entry('cd')]))]))])
+    model_options = {'tether': {'cd_model': 'spline', 'reynolds_smoothing': 1e-1}}
+    cd_tether_fun = tether_drag_coefficients.get_drag_coeff_equation(model_options, parameters)
+
+    def drag_coeff(reynolds):
+        return float(cd_tether_fun(reynolds, parameters(0.)))
+
+    [achenbach_re, achenbach_cd] = tether_drag_coefficients.get_achenbach_datapoints()
+    spline_cd = np.array([drag_coeff(reynolds) for reynolds in achenbach_re])
+
+    # the polynomial fit of the roshko relationship serves as comparison
+    model_options['tether']['cd_model'] = 'polyfit'
+    polyfit_fun = tether_drag_coefficients.get_drag_coeff_equation(model_options, parameters)
+    polyfit_cd = np.array([float(polyfit_fun(reynolds, parameters(0.))) for reynolds in achenbach_re])
+
+    spline_error = np.sqrt(np.mean((spline_cd - achenbach_cd)**2))
+    polyfit_error = np.sqrt(np.mean((polyfit_cd - achenbach_cd)**2))
+    assert spline_error < 0.1, 'rms error of the spline fit'
+    assert spline_error < 0.5 * polyfit_error, 'rms error of the spline fit compared to the polynomial fit'
+
+    reynolds_range = 10.**np.linspace(2., 7., 101)
+    cd_range = np.array([drag_coeff(reynolds) for reynolds in reynolds_range])
+    assert np.all(cd_range > 0.) and np.all(cd_range < 2.), 'drag coefficient within 1e2 < Re < 1e7'
+
+    for reynolds in [1., 1e1, 99.]:
+        assert np.isclose(drag_coeff(reynolds), drag_coeff(1e2)), 'drag coefficient below Re = 1e2'
+    for reynolds in [1.01e7, 1e8, 1e10]:
+        assert np.isclose(drag_coeff(reynolds), drag_coeff(1e7)), 'drag coefficient above Re = 1e7'
+    assert not np.isclose(drag_coeff(2e2), drag_coeff(1e2)) and not np.isclose(drag_coeff(5e6), drag_coeff(1e7)), 'drag coefficient inside of the range'
+
 def generate_architecture_dict():
     """Generate dict containing tree-structured architectures with built
     attributes to be tested
@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+"""Test to check simulation functions that do not require a solution of the optimization problem
+"""
+
+import awebox.sim as sim
+import casadi.tools as cas
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_scale_xddot():
+    """Test that the time scaling of the state derivatives leaves the model variables unchanged
+    """
+
+    variables = cas.struct_symSX([
+        cas.entry('xd', struct=cas.struct_symSX([cas.entry('q10', shape=(3, 1))])),
+        cas.entry('xddot', struct=cas.struct_symSX([cas.entry('dq10', shape=(3, 1))])),
+        cas.entry('theta', struct=cas.struct_symSX([cas.entry('t_f')]))])
+    variables_cat = cas.SX(variables.cat)
+
+    time_scaled_variables = sim.scale_xddot(variables)
+    assert cas.is_equal(variables.cat, variables_cat), 'model variables after scaling'
+
+    # scaling twice divides by the duration twice, not more
+    time_scaled_twice = sim.scale_xddot(variables)
+    assert cas.is_equal(time_scaled_twice.cat, time_scaled_variables.cat, 2), 'repeated scaling'
+
+    scaling_fun = cas.Function('scaling_fun', [variables], [time_scaled_variables])
+    values = variables(np.arange(1., variables.cat.shape[0] + 1.))
+    scaled_values = variables(scaling_fun(values))
+    assert np.allclose(scaled_values['xddot', 'dq10'], values['xddot', 'dq10'] / values['theta', 't_f']), 'scaled xddot'
+    assert np.allclose(scaled_values['xd', 'q10'], values['xd', 'q10']), 'unscaled xd'
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Test to check the lookup of solutions in the solution library
+"""
+
+import awebox.opti.solution_library as solution_library
+import casadi.tools as cas
+import numpy as np
+import collections
+import pickle
+import os
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_nearest_neighbour(tmp_path):
+    """Test that the library returns the closest solution among the compatible ones
+    """
+
+    directory = str(tmp_path)
+    nlp, model = generate_problem()
+
+    # a compatible solution at 5 m/s and 8 m/s, and an incompatible one at 7 m/s
+    compatibility = solution_library.get_compatibility_key(nlp, model, generate_options(7.))
+    incompatible_options = generate_options(7.)
+    incompatible_options['model']['architecture'] = {1:0, 2:1, 3:1}
+    entries = [{'name': 'slow', 'compatibility': compatibility, 'features': solution_library.get_feature_vector(generate_options(5.))},
+               {'name': 'fast', 'compatibility': compatibility, 'features': solution_library.get_feature_vector(generate_options(8.))},
+               {'name': 'other', 'compatibility': solution_library.get_compatibility_key(nlp, model, incompatible_options),
+                'features': solution_library.get_feature_vector(incompatible_options)}]
+    with open(os.path.join(directory, 'index.dict'), 'wb') as index_file:
+        pickle.dump(entries, index_file)
+    for entry in entries:
+        with open(os.path.join(directory, entry['name'] + '.dict'), 'wb') as solution_file:
+            pickle.dump({'t_f': 10.}, solution_file)
+
+    library = solution_library.SolutionLibrary(directory)
+    assert len(library.entries) == 3, 'number of library entries'
+
+    solution, distance = library.find(nlp, model, generate_options(7.))
+    assert solution['name'] == 'fast', 'closest compatible solution'
+    assert np.isclose(distance, 1. / 7.), 'relative distance of the closest solution'
+
+    solution, distance = library.find(nlp, model, generate_options(6.))
+    assert solution['name'] == 'slow', 'closest compatible solution'
+
+    # a solution with a different discretization is never returned
+    nlp_ms = collections.namedtuple('nlp', ['discretization', 'd', 'options'])('multiple_shooting', nlp.d, nlp.options)
+    assert library.find(nlp_ms, model, generate_options(7.)) == (None, None), 'no compatible solution'
+
+def generate_problem():
+    """Minimal nlp and model with the attributes of the compatibility key
+    """
+
+    variables = cas.struct_symSX([cas.entry('xd', struct=cas.struct_symSX([cas.entry('q10', shape=(3, 1)), cas.entry('l_t')]))])
+    nlp = collections.namedtuple('nlp', ['discretization', 'd', 'options'])('direct_collocation', 4, {'phase_fix': True})
+    model = collections.namedtuple('model', ['variables', 'kite_dof'])(variables, 3)
+
+    return nlp, model
+
+def generate_options(u_ref):
+    """Initialization options with the entries of the feature vector
+    """
+
+    params = {'wind': {'u_ref': u_ref, 'log_wind': {'z0_air': 0.1}},
+              'geometry': {'m_k': 36.8, 's_ref': 3., 'b_ref': 5.5}}
+
+    return {'model': {'architecture': {1:0}}, 'sys_params_num': params, 'xd': {'l_t': 500.}, 'windings': 1}
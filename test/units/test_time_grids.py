@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""Test to check the time grids of the discretization
+"""
+
+import awebox.ocp.discretization as discretization
+import numpy as np
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_time_grids():
+    """Test that the interval grid follows the interval fractions, and is uniform by default
+    """
+
+    t_f = 7.
+    for method in ['direct_collocation', 'multiple_shooting']:
+
+        nlp_options = {'n_k': 4, 'discretization': method, 'collocation': {'d': 3, 'scheme': 'radau'},
+                       'phase_fix': False, 'phase_fix_reelout': 0.5, 'interval_fractions': None}
+
+        time_grids = discretization.construct_time_grids(nlp_options)
+        tgrid_x = np.array(time_grids['x'](t_f)).flatten()
+        assert np.allclose(tgrid_x, np.linspace(0., t_f, 5)), 'uniform grid of ' + method
+        assert np.allclose(np.array(time_grids['u'](t_f)).flatten(), tgrid_x[:-1]), 'control grid of ' + method
+
+        nlp_options['interval_fractions'] = [0.1, 0.2, 0.3, 0.4]
+        time_grids = discretization.construct_time_grids(nlp_options)
+        tgrid_x = np.array(time_grids['x'](t_f)).flatten()
+        assert np.allclose(np.diff(tgrid_x), t_f * np.array([0.1, 0.2, 0.3, 0.4])), 'non-uniform grid of ' + method
+        assert np.allclose(np.array(time_grids['u'](t_f)).flatten(), tgrid_x[:-1]), 'non-uniform control grid of ' + method
+
+        if method == 'direct_collocation':
+            # the collocation points are scaled with the length of their interval
+            tgrid_coll = np.array(time_grids['coll'](t_f))
+            tau_root = (tgrid_coll[0, :] - tgrid_x[0]) / (tgrid_x[1] - tgrid_x[0])
+            for k in range(4):
+                assert np.allclose(tgrid_coll[k, :], tgrid_x[k] + tau_root * (tgrid_x[k+1] - tgrid_x[k])), 'collocation grid of interval ' + str(k)
+            assert np.allclose(np.array(time_grids['x_coll'](t_f)).flatten()[-1], t_f), 'end of the collocation grid'
+
+    # with phase fix, every interval lasts its fraction of the time constant of its phase
+    nlp_options['phase_fix'] = True
+    time_grids = discretization.construct_time_grids(nlp_options)
+    tgrid_x = np.array(time_grids['x']([t_f, 2. * t_f])).flatten()
+    assert np.allclose(np.diff(tgrid_x), np.array([0.1, 0.2, 0.3 * 2., 0.4 * 2.]) * t_f), 'non-uniform grid with phase fix'
+
+    nlp_options['interval_fractions'] = None
+    time_grids = discretization.construct_time_grids(nlp_options)
+    tgrid_x = np.array(time_grids['x']([t_f, 2. * t_f])).flatten()
+    assert np.allclose(np.diff(tgrid_x), np.array([1., 1., 2., 2.]) * t_f / 4.), 'uniform grid with phase fix'
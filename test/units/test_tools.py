@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Test to check tools functionality
+"""
+
+import awebox.tools.code_generation as code_generation
+import awebox.tools.graph_operations as graph_operations
+import casadi.tools as cas
+import numpy as np
+import os
+import shutil
+import tempfile
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_common_subexpression_elimination():
+    """Test that elimination of common subexpressions reduces the graph but keeps the outputs
+    """
+
+    x = cas.SX.sym('x', 3)
+    y = cas.SX.sym('y', 2)
+
+    # the norm and the products are built repeatedly, also in commuted order
+    norm_a = cas.sqrt(x[0]**2 + x[1]**2 + x[2]**2)
+    norm_b = cas.sqrt(x[0]**2 + x[1]**2 + x[2]**2)
+    out_a = cas.vertcat(norm_a * y[0], x[1] * y[1] + 2., cas.sin(x[2] * y[0]))
+    out_b = cas.vertcat(norm_b / y[1], y[1] * x[1] + 2., cas.sin(y[0] * x[2]), 3.)
+    fun = cas.Function('test_fun', [x, y], [out_a, out_b], ['x', 'y'], ['out_a', 'out_b'])
+
+    simplified = graph_operations.eliminate_common_subexpressions(fun)
+    assert simplified.n_instructions() < fun.n_instructions(), 'instructions after elimination'
+    assert simplified.name_in() == fun.name_in() and simplified.name_out() == fun.name_out(), 'inputs and outputs after elimination'
+
+    np.random.seed(0)
+    for _ in range(10):
+        args = [np.random.randn(3), np.random.rand(2) + 0.5]
+        expected = fun(*args)
+        result = simplified(*args)
+        for idx in range(fun.n_out()):
+            assert np.allclose(result[idx], expected[idx]), 'output ' + str(idx) + ' after elimination'
+
+def test_compiled_function_cache():
+    """Test that a compiled function, and the function loaded from the cache, evaluate to the original values
+    """
+
+    x = cas.SX.sym('x', 3)
+    y = cas.SX.sym('y', 2)
+    fun = cas.Function('test_fun', [x, y], [cas.sin(x) * y[0] + cas.exp(y[1]), cas.dot(x, x) * y])
+
+    cache_dir = tempfile.mkdtemp()
+    options = {'compiler': 'gcc', 'flags': '-O1', 'cache_dir': cache_dir}
+
+    np.random.seed(0)
+    args = [np.random.randn(3), np.random.randn(2)]
+    expected = fun(*args)
+
+    compiled_fun = code_generation.get_compiled_function(fun, options)
+    libraries = os.listdir(cache_dir)
+    assert len(libraries) == 1, 'compiled library in cache'
+
+    cached_fun = code_generation.get_compiled_function(fun, options)
+    assert os.listdir(cache_dir) == libraries, 'cache hit without new library'
+
+    for test_fun in [compiled_fun, cached_fun]:
+        result = test_fun(*args)
+        for idx in range(fun.n_out()):
+            assert np.allclose(result[idx], expected[idx]), 'output ' + str(idx) + ' of the compiled function'
+
+    shutil.rmtree(cache_dir)
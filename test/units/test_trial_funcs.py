@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+"""Test to check trial functions that do not require a solution of the optimization problem
+"""
+
+import awebox.mdl.architecture as archi
+import awebox.tools.struct_operations as struct_op
+import awebox.trial_funcs as trial_funcs
+import casadi.tools as cas
+import numpy as np
+import collections
+import logging
+logging.basicConfig(filemode='w',format='%(levelname)s:    %(message)s', level=logging.WARNING)
+
+def test_expand_symmetric_solution():
+    """Test that the expansion of a solution with sibling symmetry is continuous at the
+    boundaries of the parts and periodic over the full period
+    """
+
+    n_k = 3
+    d = 2
+    copies = 3
+    symmetry_options = {'include': True, 'copies': copies, 'shift': 1}
+
+    architecture = archi.Architecture({1:0, 2:1, 3:1, 4:1})
+    model = generate_symmetric_model(architecture)
+    V_part_struct = generate_decision_variables(model, n_k, d)
+    V_full_struct = generate_decision_variables(model, copies * n_k, d)
+    nlp_full = collections.namedtuple('nlp', ['V'])(V_full_struct)
+
+    permutation = architecture.get_sibling_permutation(symmetry_options['shift'])
+    parent_map = architecture.parent_map
+    periodic_names = [name for name in model.variables_dict['xd'].keys() if name[0] not in ['e', 'w']]
+
+    # random part solution that satisfies the periodicity condition with permuted siblings
+    np.random.seed(0)
+    V_part = V_part_struct(np.random.randn(V_part_struct.cat.shape[0]))
+    for name in periodic_names:
+        V_part['xd', -1, name] = V_part['xd', 0, struct_op.get_permuted_variable_name(name, permutation, parent_map)]
+
+    V_full = trial_funcs.expand_symmetric_solution(V_part, nlp_full, model, symmetry_options)
+
+    # kites followed during every part
+    node_maps = [{kite: kite for kite in architecture.kite_nodes}]
+    for part in range(1, copies):
+        node_maps += [{kite: permutation[node_maps[-1][kite]] for kite in architecture.kite_nodes}]
+
+    energy_increment = V_part['xd', -1, 'e'] - V_part['xd', 0, 'e']
+    for part in range(1, copies):
+
+        # every kite continues from where it was at the end of the previous part,
+        # on the trajectory of the sibling it is mapped onto
+        for name in periodic_names:
+            previous_name = struct_op.get_permuted_variable_name(name, node_maps[part - 1], parent_map)
+            followed_name = struct_op.get_permuted_variable_name(name, node_maps[part], parent_map)
+            assert np.allclose(V_full['xd', part * n_k, name], V_part['xd', -1, previous_name]), 'continuity of ' + name
+            assert np.allclose(V_full['xd', part * n_k + 1, name], V_part['xd', 1, followed_name]), 'xd of ' + name + ' in part ' + str(part)
+            assert np.allclose(V_full['coll_var', part * n_k, 0, 'xd', name], V_part['coll_var', 0, 0, 'xd', followed_name]), 'coll_var of ' + name + ' in part ' + str(part)
+
+        for name in list(model.variables_dict['u'].keys()):
+            followed_name = struct_op.get_permuted_variable_name(name, node_maps[part], parent_map)
+            assert np.allclose(V_full['u', part * n_k, name], V_part['u', 0, followed_name]), 'u of ' + name + ' in part ' + str(part)
+
+        # the energy accumulates over the parts
+        assert np.allclose(V_full['xd', part * n_k, 'e'], V_part['xd', 0, 'e'] + part * energy_increment), 'continuity of e'
+
+    for name in periodic_names:
+        assert np.allclose(V_full['xd', -1, name], V_full['xd', 0, name]), 'periodicity of ' + name
+    assert np.allclose(V_full['xd', -1, 'e'] - V_full['xd', 0, 'e'], copies * energy_increment), 'energy of the full period'
+    assert np.allclose(V_full['theta', 't_f'], copies * V_part['theta', 't_f']), 'duration of the full period'
+
+def test_refine_interval_fractions():
+    """Test that the mesh refinement splits intervals with a large drift, merges neighbouring intervals
+    with a tiny drift within the same phase and respects the maximum number of intervals
+    """
+
+    options = {'tol': 1e-3, 'coarsen_factor': 1e-2, 'max_split': 4, 'n_k_max': 200}
+    nlp_options = {'n_k': 4, 'collocation': {'d': 4}, 'phase_fix': False, 'phase_fix_reelout': 0.5, 'interval_fractions': None}
+
+    # split, keep, merge
+    drift = np.array([10., 0.5, 1e-3, 1e-3]) * options['tol']
+    fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, drift, options)
+    assert np.allclose(fractions, [0.125, 0.125, 0.25, 0.5]), 'refined fractions'
+    assert n_k_reelout == len(fractions), 'reel-out intervals without phase fix'
+
+    # the number of pieces grows with the drift, up to max_split
+    drift = np.array([1e6, 0.5, 0.5, 0.5]) * options['tol']
+    fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, drift, options)
+    assert np.allclose(fractions, [1./16] * 4 + [0.25] * 3), 'split into max_split pieces'
+
+    # non-uniform fractions keep summing up to one
+    nlp_options['interval_fractions'] = [0.1, 0.2, 0.3, 0.4]
+    drift = np.array([20., 1e-3, 1e-3, 5.]) * options['tol']
+    fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, drift, options)
+    assert np.allclose(fractions, [0.05, 0.05, 0.5, 0.2, 0.2]), 'refined non-uniform fractions'
+    assert np.isclose(np.sum(fractions), 1.), 'sum of the refined fractions'
+
+    # intervals of the reel-out and reel-in phase are never merged
+    nlp_options = {'n_k': 6, 'collocation': {'d': 4}, 'phase_fix': True, 'phase_fix_reelout': 0.5, 'interval_fractions': None}
+    drift = np.ones(6) * 1e-3 * options['tol']
+    fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, drift, options)
+    assert np.allclose(fractions, np.array([2., 1., 2., 1.]) / 6.), 'merged fractions with phase fix'
+    assert n_k_reelout == 2, 'reel-out intervals with phase fix'
+
+    # no refined mesh beyond the maximum number of intervals
+    options['n_k_max'] = 11
+    drift = np.ones(6) * 1e6 * options['tol']
+    fractions, n_k_reelout = trial_funcs.refine_interval_fractions(nlp_options, drift, options)
+    assert fractions is None and n_k_reelout is None, 'refined mesh beyond n_k_max'
+
+def test_multi_start_grid():
+    """Test that the multi-start grid covers all combinations of the specified parameters,
+    and that every attempt gets its own copy of the options
+    """
+
+    multi_start_options = {'windings': [1, 3], 'l_t': None, 'cone_angle': [20., 30., 40.], 't_f': None}
+    grid = trial_funcs.generate_multi_start_grid(multi_start_options)
+    assert len(grid) == 6, 'number of attempts'
+    assert grid[0] == {'windings': 1, 'cone_angle': 20.} and grid[-1] == {'windings': 3, 'cone_angle': 40.}, 'order of the attempts'
+    assert len(set([tuple(sorted(attempt.items())) for attempt in grid])) == 6, 'distinct attempts'
+
+    nominal_options = {'windings': None, 'l_t': None, 'cone_angle': None, 't_f': None}
+    assert trial_funcs.generate_multi_start_grid(nominal_options) == [{}], 'nominal attempt'
+
+    initialization = {'windings': 1, 'xd': {'l_t': 500.}, 'max_cone_angle_single': 30., 'max_cone_angle_multi': 50., 'winding_period': 10.}
+    options = {'solver': {'initialization': initialization}}
+    attempt_options = trial_funcs.set_multi_start_options(options, {'windings': 3, 'l_t': 300., 'cone_angle': 20., 't_f': 36.})
+    attempt_initialization = attempt_options['solver']['initialization']
+    assert attempt_initialization['windings'] == 3, 'windings of the attempt'
+    assert attempt_initialization['xd']['l_t'] == 300., 'tether length of the attempt'
+    assert attempt_initialization['max_cone_angle_single'] == 20. and attempt_initialization['max_cone_angle_multi'] == 20., 'cone angle of the attempt'
+    assert attempt_initialization['winding_period'] == 12., 'winding period of the attempt'
+    assert initialization == {'windings': 1, 'xd': {'l_t': 500.}, 'max_cone_angle_single': 30., 'max_cone_angle_multi': 50., 'winding_period': 10.}, 'nominal options'
+
+    assert trial_funcs.set_multi_start_options(options, {}) == options, 'options of the nominal attempt'
+
+def generate_symmetric_model(architecture):
+    """Minimal model with the variables of a layer of sibling kites
+    """
+
+    xd_entries = [cas.entry('q10', shape=(3, 1)), cas.entry('dq10', shape=(3, 1))]
+    u_entries = []
+    for kite in architecture.kite_nodes:
+        node = str(kite) + str(architecture.parent_map[kite])
+        xd_entries += [cas.entry('q' + node, shape=(3, 1)), cas.entry('dq' + node, shape=(3, 1)), cas.entry('coeff' + node, shape=(2, 1))]
+        u_entries += [cas.entry('dcoeff' + node, shape=(2, 1))]
+    xd_entries += [cas.entry('l_t'), cas.entry('dl_t'), cas.entry('e')]
+    u_entries += [cas.entry('ddl_t')]
+
+    variables_dict = {'xd': cas.struct_symSX(xd_entries),
+                      'u': cas.struct_symSX(u_entries),
+                      'theta': cas.struct_symSX([cas.entry('t_f')])}
+
+    return collections.namedtuple('model', ['architecture', 'variables_dict'])(architecture, variables_dict)
+
+def generate_decision_variables(model, n_k, d):
+
+    coll_var = cas.struct_symSX([cas.entry('xd', struct=model.variables_dict['xd'])])
+    V = cas.struct_symSX([
+        cas.entry('xd', repeat=[n_k + 1], struct=model.variables_dict['xd']),
+        cas.entry('u', repeat=[n_k], struct=model.variables_dict['u']),
+        cas.entry('coll_var', repeat=[n_k, d], struct=coll_var),
+        cas.entry('theta', struct=model.variables_dict['theta']),
+        cas.entry('phi', struct=cas.struct_symSX([cas.entry('gamma')])),
+        cas.entry('xi', struct=cas.struct_symSX([cas.entry('xi_0')]))])
+
+    return V